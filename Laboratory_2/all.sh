@@ -0,0 +1,4 @@
+#!/bin/sh
+# Запуск всех сервисов на Linux, замена all.bat. Параметры: python -m common.launcher --help
+# Пример: ./all.sh --reports 3 --shards 2 --replicas 1
+cd "$(dirname "$0")" && exec python3 -m common.launcher "$@"
@@ -0,0 +1,74 @@
+"""Время запуска CLI и задержка команды: отдельный процесс против `shell`.
+
+Поднимает UserService в этом процессе на unix-сокете и гоняет против него
+`login`. Запуск из Laboratory_2:
+    python -m benchmarks.bench_cli
+"""
+import os
+import re
+import hashlib
+import sys
+import time
+import tempfile
+import statistics
+import subprocess
+from concurrent import futures
+
+import grpc
+
+from generated import user_pb2_grpc
+from user_service.server import UserService
+
+RUNS = 10
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+# Что CLI раньше импортировал до разбора аргументов
+EAGER_IMPORTS = "import grpc, msgpack, common.clients, generated.user_pb2, generated.transaction_pb2, generated.report_pb2"
+
+
+def _run(args, env, cwd, stdin=None):
+    start = time.perf_counter()
+    subprocess.run([sys.executable] + args, env=env, cwd=cwd, input=stdin,
+                   stdout=subprocess.PIPE, stderr=subprocess.DEVNULL, text=True, check=True)
+    return (time.perf_counter() - start) * 1000
+
+
+def _median_ms(args, env, cwd):
+    return statistics.median(_run(args, env, cwd) for _ in range(RUNS))
+
+
+def main():
+    workdir = tempfile.mkdtemp(prefix='finance_cli_bench_')
+    target = f"unix:{os.path.join(workdir, 'user_service.sock')}"
+
+    service = UserService()
+    # Пользователь заводится напрямую, без RegisterUser
+    service.store.add({
+        'user_id': 'bench', 'username': 'bench', 'email': 'bench@example.com',
+        'password_hash': hashlib.sha256(b'secret').hexdigest(), 'created_at': ''
+    })
+    server = grpc.server(futures.ThreadPoolExecutor(max_workers=4))
+    user_pb2_grpc.add_UserServiceServicer_to_server(service, server)
+    server.add_insecure_port(target)
+    server.start()
+
+    env = {**os.environ, 'PYTHONPATH': ROOT, 'USER_SERVICE_TARGET': target}
+    login = ['-m', 'client.cli', 'login', '--email', 'bench@example.com', '--password', 'secret']
+
+    print(f"Запуск процесса, медиана из {RUNS}, ms")
+    print(f"{'python -c pass':>28} {_median_ms(['-c', 'pass'], env, workdir):>8.1f}")
+    print(f"{'прежние импорты CLI':>28} {_median_ms(['-c', EAGER_IMPORTS], env, workdir):>8.1f}")
+    print(f"{'cli --help':>28} {_median_ms(['-m', 'client.cli', '--help'], env, workdir):>8.1f}")
+    print(f"{'cli login (процесс)':>28} {_median_ms(login, env, workdir):>8.1f}")
+
+    # Те же команды в одном процессе `shell --timing`
+    commands = "\n".join(' '.join(login[2:]) for _ in range(RUNS + 1)) + "\n"
+    result = subprocess.run([sys.executable, '-m', 'client.cli', 'shell', '--timing'], env=env, cwd=workdir,
+                            input=commands, stdout=subprocess.PIPE, stderr=subprocess.DEVNULL, text=True, check=True)
+    timings = [float(ms) for ms in re.findall(r'\[([\d.]+) ms\]', result.stdout)]
+    print(f"\nlogin в shell, ms: первая {timings[0]:.1f}, медиана остальных {statistics.median(timings[1:]):.1f}")
+
+    server.stop(None)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,83 @@
+"""Память и время выборки: всё в памяти против закрытых месяцев в сегментах.
+
+Один пользователь с транзакциями за два года; сегменты пишутся во временный
+каталог. Память - куча Python по tracemalloc: страницы сегментов ОС держит
+в кеше файлов и может вытеснить. Запуск из Laboratory_2:
+    python -m benchmarks.bench_cold_storage
+"""
+import gc
+import time
+import tempfile
+import tracemalloc
+
+from generated import transaction_pb2
+from transaction_service.query import query_transactions
+from transaction_service.store import TransactionStore
+
+from .data import make_transactions
+
+PER_MONTH = 5_000
+MONTHS = [f'{year}-{month:02d}' for year in (2024, 2025) for month in range(1, 13)]
+
+
+def _timed(fn, repeat=5):
+    best = float('inf')
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = fn()
+        best = min(best, time.perf_counter() - start)
+    return result, best * 1000
+
+
+def _heap_mb():
+    gc.collect()
+    return tracemalloc.get_traced_memory()[0] / 1024 / 1024
+
+
+def _query(store, **fields):
+    request = transaction_pb2.GetTransactionsRequest(user_id='bench', **fields)
+    rows = store.get('bench', request.category, request.start_date, request.end_date)
+    return query_transactions(rows, request)[0]
+
+
+def _build(cold_dir):
+    store = TransactionStore(cold_dir=cold_dir)
+    for seed, month in enumerate(MONTHS):
+        store.add_many(make_transactions(PER_MONTH, user_id='bench', month=month, seed=seed))
+    return store
+
+
+def main():
+    queries = [
+        ('месяц', dict(start_date='2024-03-01', end_date='2024-03-31')),
+        ('месяц, категория', dict(start_date='2024-03-01', end_date='2024-03-31', category='rent')),
+        ('текущий месяц', dict(start_date='2025-12-01', end_date='2025-12-31')),
+        ('всё', dict()),
+    ]
+
+    # Память меряется отдельно: под tracemalloc всё заметно медленнее
+    tracemalloc.start()
+    base = _heap_mb()
+    store = _build(tempfile.mkdtemp(prefix='finance_cold_bench_'))
+    hot_mb = _heap_mb() - base
+    store.compact('2025-11')
+    cold_mb = _heap_mb() - base
+    tracemalloc.stop()
+    del store
+
+    store = _build(tempfile.mkdtemp(prefix='finance_cold_bench_'))
+    hot = [_timed(lambda: [t['wire'] for t in _query(store, **fields)]) for _, fields in queries]
+    _, compact_ms = _timed(lambda: store.compact('2025-11'), repeat=1)
+    cold = [_timed(lambda: [t['wire'] for t in _query(store, **fields)]) for _, fields in queries]
+
+    print(f"{len(MONTHS) * PER_MONTH} транзакций, в памяти остаются 2 месяца; перенос {compact_ms:.0f} ms")
+    print(f"куча Python, MB: всё в памяти {hot_mb:.1f}, с сегментами {cold_mb:.1f}\n")
+    print("Выборка и сборка ответа (поле 'wire' каждой строки), ms")
+    print(f"{'выборка':>18} {'строк':>7} {'память':>8} {'сегменты':>9}")
+    for (name, _), (rows, hot_ms), (cold_rows, cold_ms) in zip(queries, hot, cold):
+        assert rows == cold_rows
+        print(f"{name:>18} {len(rows):>7} {hot_ms:>8.2f} {cold_ms:>9.2f}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,64 @@
+"""Размер ответа на проводе и цена сжатия для отчётов разного размера.
+
+Запуск из Laboratory_2:
+    python -m benchmarks.bench_compression
+"""
+import json
+import time
+import zlib
+
+from .data import make_report
+
+SIZES = [100, 1_000, 10_000, 50_000]
+
+
+def _timed(fn, repeat=5):
+    best = float('inf')
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = fn()
+        best = min(best, time.perf_counter() - start)
+    return result, best * 1000
+
+
+def _gzip(data):
+    compressor = zlib.compressobj(wbits=31)
+    return compressor.compress(data) + compressor.flush()
+
+
+def bench_wire():
+    print("MonthlyReportResponse на проводе")
+    print(f"{'transactions':>12} {'raw, KB':>9} {'gzip, KB':>9} {'ratio':>6} "
+          f"{'gzip, ms':>9} {'gunzip, ms':>10} {'deflate, KB':>11} {'deflate, ms':>11}")
+    for size in SIZES:
+        raw = make_report(size).SerializeToString()
+        gz, gzip_ms = _timed(lambda: _gzip(raw))
+        _, gunzip_ms = _timed(lambda: zlib.decompress(gz, wbits=31))
+        deflated, deflate_ms = _timed(lambda: zlib.compress(raw))
+        print(f"{size:>12} {len(raw) / 1024:>9.1f} {len(gz) / 1024:>9.1f} {len(raw) / len(gz):>6.1f} "
+              f"{gzip_ms:>9.2f} {gunzip_ms:>10.2f} {len(deflated) / 1024:>11.1f} {deflate_ms:>11.2f}")
+
+
+def bench_json_export():
+    print("\nJSON-выгрузка: indent=2 против компактной")
+    print(f"{'transactions':>12} {'indent, KB':>10} {'compact, KB':>11} {'indent, ms':>10} {'compact, ms':>11}")
+    for size in SIZES:
+        report = make_report(size)
+        report_dict = {
+            'user_id': report.user_id,
+            'month': report.month,
+            'transactions': [
+                {'transaction_id': t.transaction_id, 'amount': t.amount, 'category': t.category,
+                 'type': t.type, 'date': t.date, 'description': t.description}
+                for t in report.transactions
+            ]
+        }
+        pretty, pretty_ms = _timed(lambda: json.dumps(report_dict, indent=2).encode('utf-8'))
+        compact, compact_ms = _timed(lambda: json.dumps(report_dict, separators=(',', ':')).encode('utf-8'))
+        print(f"{size:>12} {len(pretty) / 1024:>10.1f} {len(compact) / 1024:>11.1f} "
+              f"{pretty_ms:>10.2f} {compact_ms:>11.2f}")
+
+
+if __name__ == '__main__':
+    bench_wire()
+    bench_json_export()
@@ -0,0 +1,92 @@
+"""Пропускная способность шлюза GraphQL в зависимости от числа воркеров.
+
+Запускает python -m graphql_api.server --workers N и нагружает его
+запросом интроспекции: он не ходит в бэкенды, поэтому измеряется
+только разбор, валидация и исполнение GraphQL в самом шлюзе.
+
+Запуск из Laboratory_2:
+    python -m benchmarks.bench_gateway_workers --workers 1 2 4
+"""
+import os
+import sys
+import json
+import time
+import argparse
+import threading
+import subprocess
+import http.client
+
+from graphql import get_introspection_query
+
+from graphql_api.auth import AuthService
+
+
+def _wait_ready(port, timeout=30):
+    deadline = time.time() + timeout
+    while time.time() < deadline:
+        try:
+            connection = http.client.HTTPConnection('127.0.0.1', port, timeout=1)
+            connection.request('GET', '/health')
+            if connection.getresponse().status == 200:
+                return
+        except OSError:
+            time.sleep(0.2)
+    raise RuntimeError("gateway did not start")
+
+
+def _load(port, duration, concurrency):
+    body = json.dumps({"query": get_introspection_query()})
+    headers = {
+        "Content-Type": "application/json",
+        "Authorization": "Bearer " + AuthService.create_service_token("bench", "user_service", ["read"]),
+    }
+    counts = [0] * concurrency
+    stop_at = time.time() + duration
+
+    def worker(index):
+        connection = http.client.HTTPConnection('127.0.0.1', port)
+        while time.time() < stop_at:
+            connection.request('POST', '/graphql/', body=body, headers=headers)
+            response = connection.getresponse()
+            response.read()
+            if response.status == 200:
+                counts[index] += 1
+
+    threads = [threading.Thread(target=worker, args=(i,)) for i in range(concurrency)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    return sum(counts) / duration
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--workers', type=int, nargs='+', default=[1, 2, 4])
+    parser.add_argument('--duration', type=float, default=10)
+    parser.add_argument('--concurrency', type=int, default=16)
+    parser.add_argument('--port', type=int, default=8100)
+    args = parser.parse_args()
+
+    # Ограничитель запросов шлюза в бенчмарке не нужен
+    env = dict(os.environ, RATE_LIMIT_USER_RPS='1000000', RATE_LIMIT_USER_BURST='1000000')
+    print(f"{'workers':>7} {'req/s':>8} {'speedup':>8}")
+    baseline = None
+    for workers in args.workers:
+        process = subprocess.Popen(
+            [sys.executable, '-m', 'graphql_api.server', '--workers', str(workers), '--port', str(args.port)],
+            env=env, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL
+        )
+        try:
+            _wait_ready(args.port)
+            _load(args.port, 2, args.concurrency)  # прогрев
+            rps = _load(args.port, args.duration, args.concurrency)
+        finally:
+            process.terminate()
+            process.wait()
+        baseline = baseline or rps
+        print(f"{workers:>7} {rps:>8.1f} {rps / baseline:>7.2f}x")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,95 @@
+"""Задержка одного gRPC-перехода: TCP против unix-сокета, с mTLS и без.
+
+Поднимает TransactionService в этом же процессе и меряет GetTransactions
+на 10 транзакциях. Запуск из Laboratory_2:
+    python -m benchmarks.bench_local_socket
+"""
+import os
+import time
+import tempfile
+import statistics
+from concurrent import futures
+
+import grpc
+
+from common.channels import client_credentials, server_credentials
+from common.clients import ServiceToken
+from generated import transaction_pb2, transaction_pb2_grpc
+from transaction_service.server import TransactionService
+from transaction_service.wire import add_servicer_to_server
+
+from .data import make_transactions
+
+CALLS = 2000
+WARMUP = 200
+
+
+def _start_server(service, add_port):
+    server = grpc.server(futures.ThreadPoolExecutor(max_workers=4))
+    add_servicer_to_server(service, server)
+    add_port(server)
+    server.start()
+    return server
+
+
+def _secure_channel(target):
+    return grpc.secure_channel(target, client_credentials('report_service'), options=[
+        ('grpc.ssl_target_name_override', 'transaction_service'),
+        ('grpc.default_authority', 'transaction_service'),
+    ])
+
+
+def _measure(channel, metadata):
+    stub = transaction_pb2_grpc.TransactionServiceStub(channel)
+    request = transaction_pb2.GetTransactionsRequest(user_id='bench')
+    for _ in range(WARMUP):
+        stub.GetTransactions(request, metadata=metadata, timeout=5)
+    samples = []
+    for _ in range(CALLS):
+        start = time.perf_counter()
+        stub.GetTransactions(request, metadata=metadata, timeout=5)
+        samples.append((time.perf_counter() - start) * 1_000_000)
+    samples.sort()
+    return statistics.median(samples), samples[int(len(samples) * 0.99)]
+
+
+def main():
+    service = TransactionService()
+    for transaction in make_transactions(10, user_id='bench'):
+        service.store.add(transaction)
+    metadata = ServiceToken('bench', 'transaction_service', ['read', 'write']).metadata()
+
+    socket_dir = tempfile.mkdtemp(prefix='finance_bench_')
+    unix_plain = f"unix:{os.path.join(socket_dir, 'plain.sock')}"
+    unix_tls = f"unix:{os.path.join(socket_dir, 'tls.sock')}"
+
+    variants = [
+        ('TCP, без TLS', lambda s: s.add_insecure_port('localhost:0'), grpc.insecure_channel, 'tcp'),
+        ('TCP, mTLS', lambda s: s.add_secure_port('localhost:0', server_credentials('transaction_service')),
+         _secure_channel, 'tcp'),
+        ('unix, без TLS', lambda s: s.add_insecure_port(unix_plain), grpc.insecure_channel, unix_plain),
+        ('unix, mTLS', lambda s: s.add_secure_port(unix_tls, server_credentials('transaction_service')),
+         _secure_channel, unix_tls),
+    ]
+
+    print(f"GetTransactions, {CALLS} вызовов подряд, мкс")
+    print(f"{'вариант':>14} {'p50':>8} {'p99':>8}")
+    for name, add_port, make_channel, target in variants:
+        ports = []
+        server = _start_server(service, lambda s: ports.append(add_port(s)))
+        if target == 'tcp':
+            target = f'localhost:{ports[0]}'
+        channel = make_channel(target)
+        try:
+            p50, p99 = _measure(channel, metadata)
+            print(f"{name:>14} {p50:>8.0f} {p99:>8.0f}")
+        except grpc.RpcError as e:
+            # Например, истёкшие сертификаты в finance_pki
+            print(f"{name:>14} недоступно: {e.code().name} {e.details()}")
+        finally:
+            channel.close()
+            server.stop(None)
+
+
+if __name__ == '__main__':
+    main()
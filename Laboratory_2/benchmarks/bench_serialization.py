@@ -0,0 +1,98 @@
+"""Цена JSON-сериализации отчёта: конвертация protobuf -> dict и кодирование.
+
+Запуск из Laboratory_2:
+    python -m benchmarks.bench_serialization
+"""
+import json
+import time
+import tracemalloc
+
+from common import serialization
+from common.serialization import EXPORT_REPORT, EXPORT_TRANSACTION, GRAPHQL_TRANSACTION
+
+from .data import make_report
+
+SIZE = 50_000
+
+
+def _timed(fn, repeat=5):
+    best = float('inf')
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = fn()
+        best = min(best, time.perf_counter() - start)
+    return result, best * 1000
+
+
+def _peak_kb(fn):
+    tracemalloc.start()
+    fn()
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return peak / 1024
+
+
+def _field_by_field(report):
+    # Прежний вариант из ReportService.ExportReport
+    return {
+        'user_id': report.user_id,
+        'month': report.month,
+        'total_income': report.total_income,
+        'total_expenses': report.total_expenses,
+        'balance': report.balance,
+        'transactions': [
+            {'transaction_id': t.transaction_id, 'amount': t.amount, 'category': t.category,
+             'type': t.type, 'date': t.date, 'description': t.description}
+            for t in report.transactions
+        ]
+    }
+
+
+def _converter(report):
+    result = EXPORT_REPORT(report)
+    result['transactions'] = EXPORT_TRANSACTION.many(report.transactions)
+    return result
+
+
+def _stdlib_dumps(obj):
+    return json.dumps(obj, separators=(',', ':')).encode('utf-8')
+
+
+def _drain(chunks):
+    for _ in chunks:
+        pass
+
+
+def bench_convert(report):
+    print(f"protobuf -> dict, {SIZE} транзакций")
+    _, old_ms = _timed(lambda: _field_by_field(report))
+    _, new_ms = _timed(lambda: _converter(report))
+    _, graphql_ms = _timed(lambda: GRAPHQL_TRANSACTION.many(report.transactions))
+    print(f"{'по полям, ms':>16} {'конвертер, ms':>14} {'GraphQL, ms':>12}")
+    print(f"{old_ms:>16.1f} {new_ms:>14.1f} {graphql_ms:>12.1f}")
+
+
+def bench_encode(report):
+    print(f"\nКодирование JSON, {SIZE} транзакций")
+    report_dict = _converter(report)
+    print(f"{'вариант':>22} {'ms':>8} {'KB':>8} {'пик памяти, KB':>15}")
+    variants = [
+        ('json.dumps', lambda: _stdlib_dumps(report_dict)),
+        ('serialization.dumps', lambda: serialization.dumps(report_dict)),
+        ('json по полям', lambda: _stdlib_dumps(_field_by_field(report))),
+        ('потоковый', lambda: b''.join(serialization.iter_report_json(report))),
+    ]
+    for name, fn in variants:
+        data, ms = _timed(fn)
+        print(f"{name:>22} {ms:>8.1f} {len(data) / 1024:>8.1f} {_peak_kb(fn):>15.0f}")
+    # Потоковый вариант без склейки: так его использует запись файла выгрузки
+    _, ms = _timed(lambda: _drain(serialization.iter_report_json(report)))
+    peak = _peak_kb(lambda: _drain(serialization.iter_report_json(report)))
+    print(f"{'потоковый, в файл':>22} {ms:>8.1f} {'':>8} {peak:>15.0f}")
+
+
+if __name__ == '__main__':
+    print(f"orjson: {'да' if serialization.orjson else 'нет, стандартный json'}\n")
+    report = make_report(SIZE)
+    bench_convert(report)
+    bench_encode(report)
@@ -0,0 +1,90 @@
+"""Параллельные записи в TransactionStore и UserStore.
+
+Сравнивает блокировки по пользователю с одной общей блокировкой (так
+пришлось бы защищать прежние словари) и проверяет, что под нагрузкой не
+теряются транзакции и не появляются дубликаты email. На сборке с GIL потоки
+не дают прироста; на free-threaded Python (3.13t) разница видна по строкам
+"разные пользователи". Запуск из Laboratory_2:
+    python -m benchmarks.bench_store_contention
+"""
+import sys
+import time
+import threading
+
+from transaction_service.store import TransactionStore
+from user_service.store import UserStore
+
+from .data import make_transactions
+
+PER_THREAD = 20_000
+THREADS = [1, 2, 4, 8]
+
+
+class _GlobalLock:
+    """Одна блокировка на весь словарь, для сравнения."""
+
+    def __init__(self):
+        self._lock = threading.RLock()
+
+    def __call__(self, key):
+        return self._lock
+
+
+def _run_threads(count, target):
+    barrier = threading.Barrier(count)
+
+    def worker(index):
+        barrier.wait()
+        target(index)
+
+    threads = [threading.Thread(target=worker, args=(i,)) for i in range(count)]
+    start = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    return time.perf_counter() - start
+
+
+def bench_transactions():
+    batches = [make_transactions(PER_THREAD, user_id=f'user{i}', seed=i) for i in range(max(THREADS))]
+    # Как в AddTransaction: дата - время записи, поэтому записи одного
+    # пользователя идут в конец списка
+    shared = [[{**t, 'user_id': 'shared', 'date': '2025-04-01 12:00:00'} for t in batch] for batch in batches]
+
+    print(f"TransactionStore.add, {PER_THREAD} записей на поток, тыс. записей/с")
+    print(f"{'потоков':>8} {'блокировка':>12} {'разные пользователи':>20} {'один пользователь':>18}")
+    for threads in THREADS:
+        for name, make_lock in (('общая', _GlobalLock), ('по user_id', None)):
+            row = []
+            for data in (batches, shared):
+                store = TransactionStore()
+                if make_lock:
+                    store.lock = make_lock()
+                elapsed = _run_threads(threads, lambda i: [store.add(t) for t in data[i]])
+                stored = sum(len(rows) for rows in store.transactions.values())
+                assert stored == threads * PER_THREAD, f"lost writes: {stored}"
+                row.append(threads * PER_THREAD / elapsed / 1000)
+            print(f"{threads:>8} {name:>12} {row[0]:>20.0f} {row[1]:>18.0f}")
+
+
+def check_unique_emails(threads=8, attempts=2_000):
+    # Все потоки регистрируют одни и те же адреса; выиграть должен ровно один
+    store = UserStore()
+    wins = [0] * threads
+
+    def register(index):
+        for n in range(attempts):
+            user = {'user_id': f'{index}-{n}', 'email': f'user{n}@example.com'}
+            wins[index] += store.add(user)
+
+    _run_threads(threads, register)
+    print(f"\nUserStore: {threads} потоков x {attempts} email, успешных регистраций {sum(wins)} "
+          f"(ожидается {attempts}), записей {len(store.users)}")
+
+
+if __name__ == '__main__':
+    gil = getattr(sys, '_is_gil_enabled', lambda: True)()
+    print(f"Python {sys.version.split()[0]}, GIL {'включён' if gil else 'выключен'}\n")
+    bench_transactions()
+    check_unique_emails()
@@ -0,0 +1,60 @@
+"""Сборка ответа GetTransactions: сообщения на каждую строку против склейки байтов.
+
+Запуск из Laboratory_2:
+    python -m benchmarks.bench_wire_records
+"""
+import time
+
+from generated import transaction_pb2
+from transaction_service.store import TransactionStore
+from transaction_service.wire import encode_response
+
+from .data import make_transactions
+
+SIZES = [1_000, 10_000, 50_000]
+
+
+def _timed(fn, repeat=5):
+    best = float('inf')
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = fn()
+        best = min(best, time.perf_counter() - start)
+    return result, best * 1000
+
+
+def _build_messages(rows):
+    # Прежний вариант из TransactionService.GetTransactions
+    return transaction_pb2.TransactionsResponse(
+        next_cursor='',
+        transactions=[transaction_pb2.Transaction(
+            transaction_id=t['transaction_id'],
+            user_id=t['user_id'],
+            amount=t['amount'],
+            amount_minor=t['amount_minor'],
+            category=t['category'],
+            type=t['type'],
+            date=t['date'],
+            description=t['description']
+        ) for t in rows]
+    ).SerializeToString()
+
+
+def main():
+    print("Ответ GetTransactions до отправки в gRPC, ms")
+    print(f"{'строк':>8} {'сообщения':>10} {'байты':>8} {'запись в store':>15}")
+    for size in SIZES:
+        store = TransactionStore()
+        data = make_transactions(size, user_id='bench')
+        # Включает однократное кодирование записей
+        _, add_ms = _timed(lambda: store.add_many(data), repeat=1)
+        rows = store.transactions['bench']
+        expected, build_ms = _timed(lambda: _build_messages(rows))
+        result, join_ms = _timed(lambda: encode_response(transaction_pb2.TransactionsResponse(), rows))
+        assert transaction_pb2.TransactionsResponse.FromString(result) == \
+            transaction_pb2.TransactionsResponse.FromString(expected)
+        print(f"{size:>8} {build_ms:>10.1f} {join_ms:>8.1f} {add_ms:>15.1f}")
+
+
+if __name__ == '__main__':
+    main()
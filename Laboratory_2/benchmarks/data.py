@@ -0,0 +1,44 @@
+import random
+import uuid
+
+from common.money import from_minor
+from generated import report_pb2, transaction_pb2
+
+CATEGORIES = ['groceries', 'salary', 'rent', 'transport', 'restaurants', 'utilities', 'health', 'gifts']
+
+
+def make_transactions(count, user_id='973dfe463ec85785', month='2025-04', seed=42):
+    """Синтетические транзакции за месяц в том виде, в каком их хранит TransactionService."""
+    rng = random.Random(seed)
+    transactions = []
+    for _ in range(count):
+        kind = 'income' if rng.random() < 0.2 else 'expense'
+        transactions.append({
+            'transaction_id': str(uuid.UUID(int=rng.getrandbits(128))),
+            'user_id': user_id,
+            'amount_minor': rng.randint(100, 500000),
+            'category': rng.choice(CATEGORIES),
+            'type': kind,
+            'date': f"{month}-{rng.randint(1, 28):02d} {rng.randint(0, 23):02d}:{rng.randint(0, 59):02d}:00",
+            'description': rng.choice(['', 'card payment', 'monthly', 'cash withdrawal at ATM'])
+        })
+        transactions[-1]['amount'] = from_minor(transactions[-1]['amount_minor'])
+    transactions.sort(key=lambda t: t['date'])
+    return transactions
+
+
+def make_report(count, month='2025-04'):
+    transactions = make_transactions(count, month=month)
+    income = sum(t['amount_minor'] for t in transactions if t['type'] == 'income')
+    expenses = sum(t['amount_minor'] for t in transactions if t['type'] == 'expense')
+    return report_pb2.MonthlyReportResponse(
+        user_id=transactions[0]['user_id'] if transactions else '',
+        month=month,
+        total_income=from_minor(income),
+        total_expenses=from_minor(expenses),
+        balance=from_minor(income - expenses),
+        total_income_minor=income,
+        total_expenses_minor=expenses,
+        balance_minor=income - expenses,
+        transactions=[transaction_pb2.Transaction(**t) for t in transactions]
+    )
@@ -0,0 +1,139 @@
+import os
+import sqlite3
+import time
+
+from common.money import MINOR_UNITS
+
+# How long a synced copy answers reads without asking the server again
+CACHE_TTL_SECONDS = float(os.environ.get('FINANCE_CLI_CACHE_TTL', '30'))
+SYNC_PAGE_SIZE = 1000
+
+# amount_minor is last: caches created before it get the column appended by ALTER TABLE
+COLUMNS = ('transaction_id', 'user_id', 'amount', 'category', 'type', 'date', 'description', 'amount_minor')
+SORT_COLUMNS = {'date', 'amount'}
+
+
+class TransactionCache:
+    """Local SQLite copy of the user's transactions, kept in sync with GetChanges.
+
+    Only transactions added after the stored cursor are downloaded. Reads are
+    answered locally while the copy is younger than CACHE_TTL_SECONDS; if the
+    server cannot be reached, the last synced copy is used.
+    """
+
+    def __init__(self, path, ttl_seconds=CACHE_TTL_SECONDS):
+        self.ttl_seconds = ttl_seconds
+        self.db = sqlite3.connect(path)
+        self.db.executescript("""
+            CREATE TABLE IF NOT EXISTS transactions (
+                transaction_id TEXT PRIMARY KEY,
+                user_id TEXT NOT NULL,
+                amount REAL NOT NULL,
+                category TEXT NOT NULL,
+                type TEXT NOT NULL,
+                date TEXT NOT NULL,
+                description TEXT NOT NULL,
+                amount_minor INTEGER NOT NULL
+            );
+            CREATE INDEX IF NOT EXISTS transactions_user_date ON transactions (user_id, date);
+            CREATE TABLE IF NOT EXISTS sync_state (
+                user_id TEXT PRIMARY KEY,
+                cursor TEXT NOT NULL,
+                synced_at REAL NOT NULL
+            );
+        """)
+        self._migrate()
+
+    def _migrate(self):
+        columns = {row[1] for row in self.db.execute("PRAGMA table_info(transactions)")}
+        if 'amount_minor' not in columns:
+            with self.db:
+                self.db.execute("ALTER TABLE transactions ADD COLUMN amount_minor INTEGER NOT NULL DEFAULT 0")
+                self.db.execute("UPDATE transactions SET amount_minor = CAST(ROUND(amount * ?) AS INTEGER)",
+                                (MINOR_UNITS,))
+
+    def _state(self, user_id):
+        return self.db.execute(
+            "SELECT cursor, synced_at FROM sync_state WHERE user_id = ?", (user_id,)).fetchone()
+
+    def is_fresh(self, user_id):
+        state = self._state(user_id)
+        return state is not None and time.time() - state[1] < self.ttl_seconds
+
+    def _insert(self, transactions):
+        self.db.executemany(
+            f"INSERT OR REPLACE INTO transactions VALUES ({', '.join('?' * len(COLUMNS))})",
+            [tuple(getattr(t, column) for column in COLUMNS) for t in transactions]
+        )
+
+    def put(self, transactions):
+        # Own writes show up before the next sync
+        with self.db:
+            self._insert(transactions)
+
+    def sync(self, user_id, transaction_client):
+        """Download changes since the stored cursor; returns the number of new rows."""
+        from generated import transaction_pb2
+
+        state = self._state(user_id)
+        cursor = state[0] if state else ''
+        received = 0
+        with self.db:
+            while True:
+                response = transaction_client.get_changes(transaction_pb2.GetChangesRequest(
+                    user_id=user_id, cursor=cursor, limit=SYNC_PAGE_SIZE))
+                if response.reset:
+                    self.db.execute("DELETE FROM transactions WHERE user_id = ?", (user_id,))
+                self._insert(response.transactions)
+                received += len(response.transactions)
+                cursor = response.cursor
+                if not response.has_more:
+                    break
+            self.db.execute(
+                "INSERT OR REPLACE INTO sync_state VALUES (?, ?, ?)", (user_id, cursor, time.time()))
+        return received
+
+    def refresh(self, user_id, transaction_client, force=False):
+        """Sync unless the copy is fresh. Returns False when the cache is stale and the server is down."""
+        import grpc
+
+        if not force and self.is_fresh(user_id):
+            return True
+        try:
+            self.sync(user_id, transaction_client)
+            return True
+        except grpc.RpcError:
+            if self._state(user_id) is None:
+                raise
+            return False
+
+    def query(self, user_id, start_date=None, end_date=None, category=None, type=None,
+              min_amount=None, max_amount=None, sort_by='date', descending=False, limit=0):
+        # Same semantics as transaction_service.query: inclusive string date range,
+        # ties broken by transaction_id
+        if sort_by not in SORT_COLUMNS:
+            raise ValueError(f"Unsupported sort field: {sort_by}")
+        conditions, params = ["user_id = ?"], [user_id]
+        for clause, value in (("date >= ?", start_date), ("date <= ?", end_date),
+                              ("category = ?", category), ("type = ?", type),
+                              ("amount >= ?", min_amount), ("amount <= ?", max_amount)):
+            if value is not None and value != '':
+                conditions.append(clause)
+                params.append(value)
+        order = 'DESC' if descending else 'ASC'
+        sql = (f"SELECT {', '.join(COLUMNS)} FROM transactions WHERE {' AND '.join(conditions)} "
+               f"ORDER BY {sort_by} {order}, transaction_id {order}")
+        if limit:
+            sql += " LIMIT ?"
+            params.append(limit)
+        return [dict(zip(COLUMNS, row)) for row in self.db.execute(sql, params)]
+
+    def monthly_totals(self, user_id, month):
+        """(income, expenses) in minor units; integer SUM is exact, unlike summing the REAL column."""
+        income, expenses = self.db.execute(
+            "SELECT COALESCE(SUM(CASE WHEN type = 'income' THEN amount_minor END), 0),"
+            " COALESCE(SUM(CASE WHEN type = 'expense' THEN amount_minor END), 0)"
+            " FROM transactions WHERE user_id = ? AND date >= ? AND date <= ?",
+            (user_id, f"{month}-01", f"{month}-31")
+        ).fetchone()
+        return income, expenses
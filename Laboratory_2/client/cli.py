@@ -1,28 +1,48 @@
-import grpc
 import argparse
-import msgpack
 from datetime import datetime
+from functools import cached_property
 import json
 import os
-from generated import user_pb2, user_pb2_grpc
-from generated import transaction_pb2, transaction_pb2_grpc
-from generated import report_pb2, report_pb2_grpc
+import shlex
+import time
+
+# grpc, the generated stubs and the clients are imported inside the commands that
+# need them: `--help` and argument errors never load them, and each command opens
+# only the channel it uses
 
 class FinanceCLI:
     def __init__(self):
-        # Setup gRPC channels
-        self.user_channel = grpc.insecure_channel('localhost:50051')
-        self.user_stub = user_pb2_grpc.UserServiceStub(self.user_channel)
-        
-        self.transaction_channel = grpc.insecure_channel('localhost:50052')
-        self.transaction_stub = transaction_pb2_grpc.TransactionServiceStub(self.transaction_channel)
-        
-        self.report_channel = grpc.insecure_channel('localhost:50053')
-        self.report_stub = report_pb2_grpc.ReportServiceStub(self.report_channel)
-        
         self.session_file = "finance_cli_session.json"
         self.current_user = self._load_session()
 
+    # Clients are built on first use (deadlines, retries and circuit breaking live in common.resilience)
+    @cached_property
+    def user_client(self):
+        from common.clients import UserClient
+        return UserClient("finance_cli")
+
+    @cached_property
+    def transaction_client(self):
+        # Transactions are sharded by user_id, the client picks the shard
+        from common.clients import TransactionClient
+        return TransactionClient("finance_cli")
+
+    @cached_property
+    def report_client(self):
+        from common.clients import ReportClient
+        return ReportClient("finance_cli")
+
+    @cached_property
+    def cache(self):
+        # Local copy of the user's transactions, next to the session file
+        from .cache import TransactionCache
+        directory = os.path.dirname(os.path.abspath(self.session_file))
+        return TransactionCache(os.path.join(directory, "finance_cli_cache.sqlite3"))
+
+    def _refresh_cache(self, force=False):
+        if not self.cache.refresh(self.current_user['user_id'], self.transaction_client, force):
+            print("Server unavailable, showing cached data")
+
     def _load_session(self):
         if os.path.exists(self.session_file):
             with open(self.session_file, 'r') as f:
@@ -34,7 +54,8 @@ class FinanceCLI:
             json.dump(self.current_user, f)
 
     def register(self, username, email, password):
-        response = self.user_stub.RegisterUser(
+        from generated import user_pb2
+        response = self.user_client.register_user(
             user_pb2.RegisterRequest(
                 username=username,
                 email=email,
@@ -47,7 +68,8 @@ class FinanceCLI:
         return False
 
     def login(self, email, password):
-        response = self.user_stub.LoginUser(
+        from generated import user_pb2
+        response = self.user_client.login_user(
             user_pb2.LoginRequest(email=email, password=password)
         )
         if response.user_id:
@@ -67,7 +89,8 @@ class FinanceCLI:
             print("Please login first")
             return
             
-        response = self.transaction_stub.AddTransaction(
+        from generated import transaction_pb2
+        response = self.transaction_client.add_transaction(
             transaction_pb2.AddTransactionRequest(
                 user_id=self.current_user['user_id'],
                 amount=amount,
@@ -78,28 +101,30 @@ class FinanceCLI:
         )
         
         if response.transaction.transaction_id:
+            self.cache.put([response.transaction])
             print(f"Transaction added: {response.transaction}")
             return True
         return False
 
-    def get_transactions(self, start_date=None, end_date=None):
+    def get_transactions(self, start_date=None, end_date=None, category=None, type=None,
+                         min_amount=None, max_amount=None, sort_by='date', descending=False, limit=0,
+                         refresh=False):
         if not self.current_user:
             print("Please login first")
             return
             
-        response = self.transaction_stub.GetTransactions(
-            transaction_pb2.GetTransactionsRequest(
-                user_id=self.current_user['user_id'],
-                start_date=start_date,
-                end_date=end_date
-            )
+        # Answered from the local cache; only changes since the last sync are downloaded
+        self._refresh_cache(refresh)
+        transactions = self.cache.query(
+            self.current_user['user_id'], start_date, end_date, category, type,
+            min_amount, max_amount, sort_by, descending, limit
         )
         
         print(f"Transactions for {self.current_user['username']}:")
-        for t in response.transactions:
-            print(f"{t.date} - {t.type.upper()}: {t.amount} ({t.category}) - {t.description}")
+        for t in transactions:
+            print(f"{t['date']} - {t['type'].upper()}: {t['amount']} ({t['category']}) - {t['description']}")
 
-    def generate_report(self, month=None):
+    def generate_report(self, month=None, refresh=False):
         if not self.current_user:
             print("Please login first")
             return
@@ -107,23 +132,23 @@ class FinanceCLI:
         if not month:
             month = datetime.now().strftime("%Y-%m")
             
-        response = self.report_stub.GenerateMonthlyReport(
-            report_pb2.MonthlyReportRequest(
-                user_id=self.current_user['user_id'],
-                month=month
-            )
-        )
+        # Same totals as ReportService.GenerateMonthlyReport, computed over the local copy
+        self._refresh_cache(refresh)
+        user_id = self.current_user['user_id']
+        total_income, total_expenses = self.cache.monthly_totals(user_id, month)
+        transactions = self.cache.query(user_id, f"{month}-01", f"{month}-31")
         
+        from common.money import from_minor
         print(f"\nMonthly Report for {month}:")
-        print(f"Income: {response.total_income}")
-        print(f"Expenses: {response.total_expenses}")
-        print(f"Balance: {response.balance}")
+        print(f"Income: {from_minor(total_income)}")
+        print(f"Expenses: {from_minor(total_expenses)}")
+        print(f"Balance: {from_minor(total_income - total_expenses)}")
         
         print("\nTransactions:")
-        for t in response.transactions:
-            print(f"{t.date} - {t.type.upper()}: {t.amount} ({t.category}) - {t.description}")
+        for t in transactions:
+            print(f"{t['date']} - {t['type'].upper()}: {t['amount']} ({t['category']}) - {t['description']}")
 
-    def export_report(self, month=None, format='json'):
+    def export_report(self, month=None, format='json', pretty=False):
         if not self.current_user:
             print("Please login first")
             return
@@ -131,11 +156,13 @@ class FinanceCLI:
         if not month:
             month = datetime.now().strftime("%Y-%m")
             
-        response = self.report_stub.ExportReport(
+        from generated import report_pb2
+        response = self.report_client.export_report(
             report_pb2.ExportReportRequest(
                 user_id=self.current_user['user_id'],
                 month=month,
-                format=format
+                format=format,
+                pretty=pretty
             )
         )
         
@@ -144,9 +171,7 @@ class FinanceCLI:
             
         print(f"Report exported to {response.file_name}")
 
-def main():
-    cli = FinanceCLI()
-    
+def build_parser():
     parser = argparse.ArgumentParser(description="Personal Finance Manager CLI")
     subparsers = parser.add_subparsers(dest='command', required=True)
     
@@ -172,18 +197,33 @@ def main():
     get_transactions_parser = subparsers.add_parser('get-transactions')
     get_transactions_parser.add_argument('--start-date', required=False)
     get_transactions_parser.add_argument('--end-date', required=False)
+    get_transactions_parser.add_argument('--category', required=False)
+    get_transactions_parser.add_argument('--type', choices=['income', 'expense'], required=False)
+    get_transactions_parser.add_argument('--min-amount', type=float, required=False)
+    get_transactions_parser.add_argument('--max-amount', type=float, required=False)
+    get_transactions_parser.add_argument('--sort', choices=['date', 'amount'], default='date')
+    get_transactions_parser.add_argument('--desc', action='store_true')
+    get_transactions_parser.add_argument('--limit', type=int, default=0)
+    get_transactions_parser.add_argument('--refresh', action='store_true', help="Sync with the server first")
     
     # Generate report command
     report_parser = subparsers.add_parser('generate-report')
     report_parser.add_argument('--month', required=False)
+    report_parser.add_argument('--refresh', action='store_true', help="Sync with the server first")
     
     # Export report command
     export_parser = subparsers.add_parser('export-report')
     export_parser.add_argument('--month', required=False)
     export_parser.add_argument('--format', choices=['json', 'csv'], default='json')
+    export_parser.add_argument('--pretty', action='store_true', help="Indent JSON output")
+
+    # Interactive shell: channels stay open between commands
+    shell_parser = subparsers.add_parser('shell', help="Run commands in one process with warm connections")
+    shell_parser.add_argument('--timing', action='store_true', help="Print the latency of every command")
     
-    args = parser.parse_args()
-    
+    return parser
+
+def run_command(cli, args):
     if args.command == 'register':
         cli.register(args.username, args.email, args.password)
     elif args.command == 'login':
@@ -191,11 +231,63 @@ def main():
     elif args.command == 'add-transaction':
         cli.add_transaction(args.amount, args.category, args.type, args.description)
     elif args.command == 'get-transactions':
-        cli.get_transactions(args.start_date, args.end_date)
+        cli.get_transactions(args.start_date, args.end_date, args.category, args.type,
+                             args.min_amount, args.max_amount, args.sort, args.desc, args.limit, args.refresh)
     elif args.command == 'generate-report':
-        cli.generate_report(args.month)
+        cli.generate_report(args.month, args.refresh)
     elif args.command == 'export-report':
-        cli.export_report(args.month, args.format)
+        cli.export_report(args.month, args.format, args.pretty)
+
+def shell(cli, parser, timing=False):
+    # One process for many commands: imports, TLS handshakes and JWTs are paid once
+    interactive = os.isatty(0)
+    if interactive:
+        print("Finance shell. Type a command without the program name, 'help' or 'exit'.")
+    while True:
+        try:
+            line = input("finance> " if interactive else "")
+        except EOFError:
+            break
+        try:
+            argv = shlex.split(line)
+        except ValueError as e:
+            # Unbalanced quotes: report and wait for the next command
+            print(f"Error: {e}")
+            continue
+        if not argv:
+            continue
+        if argv[0] in ('exit', 'quit'):
+            break
+        if argv[0] == 'help':
+            argv = ['--help']
+        if argv[0] == 'shell':
+            print("Already in the shell")
+            continue
+
+        try:
+            args = parser.parse_args(argv)
+        except SystemExit:
+            # argparse has already printed the usage or the error
+            continue
+
+        start = time.perf_counter()
+        try:
+            run_command(cli, args)
+        except Exception as e:
+            # A failed call (e.g. grpc.RpcError) must not end the session
+            print(f"Error: {e.details() if hasattr(e, 'details') else e}")
+        if timing:
+            print(f"[{(time.perf_counter() - start) * 1000:.1f} ms]")
+
+def main(argv=None):
+    parser = build_parser()
+    args = parser.parse_args(argv)
+    cli = FinanceCLI()
+    
+    if args.command == 'shell':
+        shell(cli, parser, args.timing)
+    else:
+        run_command(cli, args)
 
 if __name__ == '__main__':
     main()
\ No newline at end of file
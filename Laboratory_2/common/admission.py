@@ -0,0 +1,107 @@
+import time
+import threading
+from collections import OrderedDict
+
+import grpc
+
+from graphql_api.auth import AuthService
+
+from . import config
+
+
+class TokenBucket:
+    def __init__(self, rate, burst):
+        self.rate = rate
+        self.burst = burst
+        self.tokens = burst
+        self.updated_at = time.monotonic()
+
+    def take(self):
+        now = time.monotonic()
+        self.tokens = min(self.burst, self.tokens + (now - self.updated_at) * self.rate)
+        self.updated_at = now
+        if self.tokens < 1:
+            return False
+        self.tokens -= 1
+        return True
+
+
+class RateLimiter:
+    """Набор token bucket по ключу; давно не использованные ключи вытесняются."""
+
+    def __init__(self, rate, burst, max_keys=100_000):
+        self.rate = rate
+        self.burst = burst
+        self.max_keys = max_keys
+        self._buckets = OrderedDict()
+        self._lock = threading.Lock()
+
+    def allow(self, key):
+        with self._lock:
+            bucket = self._buckets.get(key)
+            if bucket is None:
+                bucket = self._buckets[key] = TokenBucket(self.rate, self.burst)
+                if len(self._buckets) > self.max_keys:
+                    self._buckets.popitem(last=False)
+            else:
+                self._buckets.move_to_end(key)
+            return bucket.take()
+
+
+class AdmissionInterceptor(grpc.ServerInterceptor):
+    """Отклоняет запрос с RESOURCE_EXHAUSTED вместо постановки в очередь пула потоков.
+
+    Лимиты: token bucket на пользователя (поле user_id запроса) и на сервис
+    (claim service_id/sub из JWT), плюс число одновременных вызовов метода.
+    Интерцептор работает уже в потоке пула, поэтому сам очередь не убирает:
+    сервер создаётся с maximum_concurrent_rpcs, равным размеру пула, и
+    вызов, которому не хватило бы потока, gRPC отклоняет с RESOURCE_EXHAUSTED
+    до постановки в очередь.
+    """
+
+    def __init__(self, audience, method_concurrency=None):
+        self.audience = audience
+        self.user_limiter = RateLimiter(config.RATE_LIMIT_USER_RPS, config.RATE_LIMIT_USER_BURST)
+        self.service_limiter = RateLimiter(config.RATE_LIMIT_SERVICE_RPS, config.RATE_LIMIT_SERVICE_BURST)
+        limits = config.METHOD_CONCURRENCY if method_concurrency is None else method_concurrency
+        self.semaphores = {method: threading.BoundedSemaphore(limit) for method, limit in limits.items()}
+
+    def _service_identity(self, metadata):
+        token = dict(metadata or ()).get('authorization', '').replace('Bearer ', '')
+        # Невалидный токен отклонит сам обработчик
+        payload = AuthService.verify_token(token, self.audience) if token else None
+        if not payload:
+            return None
+        return payload.get('service_id') or payload.get('sub')
+
+    def intercept_service(self, continuation, handler_call_details):
+        handler = continuation(handler_call_details)
+        if handler is None or handler.unary_unary is None:
+            return handler
+
+        method = handler_call_details.method.rsplit('/', 1)[-1]
+        semaphore = self.semaphores.get(method)
+        behavior = handler.unary_unary
+
+        def admitted(request, context):
+            service_id = self._service_identity(context.invocation_metadata())
+            if service_id and not self.service_limiter.allow(service_id):
+                context.abort(grpc.StatusCode.RESOURCE_EXHAUSTED, f"Rate limit exceeded for {service_id}")
+            user_id = getattr(request, 'user_id', '')
+            if user_id and not self.user_limiter.allow(user_id):
+                context.abort(grpc.StatusCode.RESOURCE_EXHAUSTED, f"Rate limit exceeded for user {user_id}")
+
+            if semaphore is None:
+                return behavior(request, context)
+            if not semaphore.acquire(blocking=False):
+                context.abort(grpc.StatusCode.RESOURCE_EXHAUSTED, f"Too many concurrent {method} calls")
+            try:
+                return behavior(request, context)
+            finally:
+                semaphore.release()
+
+        return grpc.unary_unary_rpc_method_handler(
+            admitted,
+            request_deserializer=handler.request_deserializer,
+            response_serializer=handler.response_serializer
+        )
@@ -0,0 +1,171 @@
+import random
+import itertools
+import threading
+
+import grpc
+
+from generated import health_pb2, health_pb2_grpc
+
+from . import config
+
+POLICIES = ('round_robin', 'least_request')
+
+
+class Backend:
+    def __init__(self, target, channel):
+        self.target = target
+        self.channel = channel
+        # Пока проверка не ответила, адрес считается рабочим
+        self.healthy = True
+        self.in_flight = 0
+
+
+class BalancedChannel(grpc.Channel):
+    """Канал к нескольким репликам одного сервиса с выбором адреса на каждый вызов.
+
+    round_robin - по кругу; least_request - из двух случайных адресов тот, у
+    кого меньше незавершённых вызовов (power of two choices). Фоновый поток
+    раз в HEALTH_CHECK_INTERVAL_SECONDS опрашивает grpc.health.v1.Health.Check
+    каждого адреса; адреса не в статусе SERVING пропускаются, а если таких не
+    осталось ни одного, вызовы идут на все. Повтор из ResilienceInterceptor
+    снова выбирает адрес, поэтому обычно попадает на другую реплику.
+    """
+
+    def __init__(self, channels, policy=None, health_service=''):
+        policy = policy or config.GRPC_LB_POLICY
+        if policy not in POLICIES:
+            raise ValueError(f"Unknown load balancing policy: {policy}")
+        self.policy = policy
+        self.health_service = health_service
+        self.backends = [Backend(target, channel) for target, channel in channels.items()]
+        self._lock = threading.Lock()
+        self._counter = itertools.count()
+        self._callables = {}
+        self._closed = threading.Event()
+        threading.Thread(target=self._check_health, name='grpc-health-check', daemon=True).start()
+
+    def pick(self):
+        candidates = [backend for backend in self.backends if backend.healthy] or self.backends
+        if self.policy == 'least_request' and len(candidates) > 1:
+            first, second = random.sample(candidates, 2)
+            backend = first if first.in_flight <= second.in_flight else second
+        else:
+            backend = candidates[next(self._counter) % len(candidates)]
+        with self._lock:
+            backend.in_flight += 1
+        return backend
+
+    def release(self, backend):
+        with self._lock:
+            backend.in_flight -= 1
+
+    def _check_health(self):
+        request = health_pb2.HealthCheckRequest(service=self.health_service)
+        stubs = [(backend, health_pb2_grpc.HealthStub(backend.channel)) for backend in self.backends]
+        while not self._closed.is_set():
+            for backend, stub in stubs:
+                try:
+                    response = stub.Check(request, timeout=config.HEALTH_CHECK_INTERVAL_SECONDS)
+                    backend.healthy = response.status == health_pb2.HealthCheckResponse.SERVING
+                except grpc.RpcError as e:
+                    # Сервер без Health: о его состоянии узнаём только по ошибкам вызовов
+                    backend.healthy = e.code() == grpc.StatusCode.UNIMPLEMENTED
+            self._closed.wait(config.HEALTH_CHECK_INTERVAL_SECONDS)
+
+    def unary_unary(self, method, request_serializer=None, response_deserializer=None, _registered_method=False):
+        # Перехватчик каналов запрашивает вызываемый объект на каждый вызов
+        multicallable = self._callables.get(method)
+        if multicallable is None:
+            multicallable = self._callables[method] = _BalancedUnaryUnary(
+                self, {backend.target: backend.channel.unary_unary(method, request_serializer, response_deserializer)
+                       for backend in self.backends})
+        return multicallable
+
+    def unary_stream(self, method, request_serializer=None, response_deserializer=None, _registered_method=False):
+        return _PinnedStream(self, 'unary_stream', method, request_serializer, response_deserializer)
+
+    def stream_unary(self, method, request_serializer=None, response_deserializer=None, _registered_method=False):
+        return _PinnedStream(self, 'stream_unary', method, request_serializer, response_deserializer)
+
+    def stream_stream(self, method, request_serializer=None, response_deserializer=None, _registered_method=False):
+        return _PinnedStream(self, 'stream_stream', method, request_serializer, response_deserializer)
+
+    def subscribe(self, callback, try_to_connect=False):
+        for backend in self.backends:
+            backend.channel.subscribe(callback, try_to_connect)
+
+    def unsubscribe(self, callback):
+        for backend in self.backends:
+            backend.channel.unsubscribe(callback)
+
+    def close(self):
+        self._closed.set()
+        for backend in self.backends:
+            backend.channel.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
+        return False
+
+
+class _BalancedUnaryUnary(grpc.UnaryUnaryMultiCallable):
+    def __init__(self, channel, callables):
+        self._channel = channel
+        self._callables = callables
+
+    def _invoke(self, name, request, kwargs):
+        backend = self._channel.pick()
+        try:
+            return getattr(self._callables[backend.target], name)(request, **kwargs)
+        finally:
+            self._channel.release(backend)
+
+    def __call__(self, request, timeout=None, metadata=None, credentials=None, wait_for_ready=None,
+                 compression=None):
+        return self._invoke('__call__', request, dict(
+            timeout=timeout, metadata=metadata, credentials=credentials,
+            wait_for_ready=wait_for_ready, compression=compression))
+
+    def with_call(self, request, timeout=None, metadata=None, credentials=None, wait_for_ready=None,
+                  compression=None):
+        return self._invoke('with_call', request, dict(
+            timeout=timeout, metadata=metadata, credentials=credentials,
+            wait_for_ready=wait_for_ready, compression=compression))
+
+    def future(self, request, timeout=None, metadata=None, credentials=None, wait_for_ready=None,
+               compression=None):
+        backend = self._channel.pick()
+        try:
+            call = self._callables[backend.target].future(
+                request, timeout=timeout, metadata=metadata, credentials=credentials,
+                wait_for_ready=wait_for_ready, compression=compression)
+        except Exception:
+            self._channel.release(backend)
+            raise
+        call.add_done_callback(lambda _: self._channel.release(backend))
+        return call
+
+
+class _PinnedStream:
+    # Потоковый вызов целиком идёт на один адрес, выбранный при его открытии
+    def __init__(self, channel, kind, method, request_serializer, response_deserializer):
+        self._channel = channel
+        self._kind = kind
+        self._args = (method, request_serializer, response_deserializer)
+
+    def _target(self):
+        backend = self._channel.pick()
+        self._channel.release(backend)
+        return getattr(backend.channel, self._kind)(*self._args)
+
+    def __call__(self, *args, **kwargs):
+        return self._target()(*args, **kwargs)
+
+    def with_call(self, *args, **kwargs):
+        return self._target().with_call(*args, **kwargs)
+
+    def future(self, *args, **kwargs):
+        return self._target().future(*args, **kwargs)
@@ -0,0 +1,75 @@
+import math
+import hashlib
+import threading
+
+
+class BloomFilter:
+    """Фильтр Блума: "точно нет" или "возможно есть" без обращения к хранилищу.
+
+    Основан на BloomFilter из Laboratory_1/Laboratory_1.1.ipynb, с исправлениями:
+    - might_contain возвращает True для "возможно есть" (check в ноутбуке
+      возвращал True для "точно нет");
+    - вместо djb2 от str(K) + item (слабый хеш, а индексы "1"+"0x" и "10"+"x"
+      совпадают) - двойное хеширование h1 + i*h2 по blake2b;
+    - размер и число хеш-функций выводятся из ожидаемого числа элементов и
+      допустимой доли ложных срабатываний (for_capacity);
+    - биты в bytearray вместо bitarray, без внешней зависимости;
+    - add под блокировкой: установка бита - чтение и запись байта, два
+      потока могли бы потерять бит друг друга и дать ложный отказ.
+    Удалять элементы нельзя, union/intersection не понадобились.
+    """
+
+    def __init__(self, size, number_hash_functions):
+        if size < 1 or number_hash_functions < 1:
+            raise ValueError("Size and number of hash functions must be positive")
+        self.size = size
+        self.number_hash_functions = number_hash_functions
+        self.bits = bytearray((size + 7) // 8)
+        self.count = 0  # добавлений, с повторами
+        self.bits_set = 0
+        self._lock = threading.Lock()
+
+    @classmethod
+    def for_capacity(cls, capacity, false_positive_rate):
+        """Фильтр, у которого после capacity элементов ложных срабатываний
+        не больше false_positive_rate."""
+        if not 0 < false_positive_rate < 1:
+            raise ValueError("False positive rate must be in (0, 1)")
+        capacity = max(1, capacity)
+        size = math.ceil(-capacity * math.log(false_positive_rate) / math.log(2) ** 2)
+        return cls(size, max(1, round(size / capacity * math.log(2))))
+
+    def _indexes(self, item):
+        digest = hashlib.blake2b(item.encode('utf-8'), digest_size=16).digest()
+        h1 = int.from_bytes(digest[:8], 'little')
+        # Нечётный шаг не зацикливается раньше времени на чётном size
+        h2 = int.from_bytes(digest[8:], 'little') | 1
+        return [(h1 + i * h2) % self.size for i in range(self.number_hash_functions)]
+
+    def add(self, item):
+        indexes = self._indexes(item)
+        with self._lock:
+            for index in indexes:
+                mask = 1 << (index & 7)
+                if not self.bits[index >> 3] & mask:
+                    self.bits[index >> 3] |= mask
+                    self.bits_set += 1
+            self.count += 1
+
+    def might_contain(self, item):
+        bits = self.bits
+        return all(bits[index >> 3] & (1 << (index & 7)) for index in self._indexes(item))
+
+    def __contains__(self, item):
+        return self.might_contain(item)
+
+    def fill_ratio(self):
+        return self.bits_set / self.size
+
+    def false_positive_rate(self):
+        """Оценка по доле установленных битов: вероятность, что все k бит
+        случайного отсутствующего элемента уже установлены."""
+        return self.fill_ratio() ** self.number_hash_functions
+
+    def size_bytes(self):
+        return len(self.bits)
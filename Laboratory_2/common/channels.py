@@ -0,0 +1,84 @@
+import os
+import stat
+
+import grpc
+
+from . import config
+from .compression import message_size_options
+
+
+def _read(path):
+    with open(os.path.join(config.PKI_DIR, path), 'rb') as f:
+        return f.read()
+
+
+def client_credentials(identity=None):
+    identity = identity or config.CLIENT_IDENTITY
+    return grpc.ssl_channel_credentials(
+        root_certificates=_read('intermediate/intermediateCA.crt'),
+        private_key=_read(f'certs/{identity}/{identity}.key'),
+        certificate_chain=_read(f'certs/{identity}/{identity}.crt')
+    )
+
+
+def server_credentials(identity):
+    return grpc.ssl_server_credentials(
+        private_key_certificate_chain_pairs=[(
+            _read(f'certs/{identity}/{identity}.key'),
+            _read(f'certs/{identity}/{identity}.crt')
+        )],
+        root_certificates=_read('intermediate/intermediateCA.crt'),
+        require_client_auth=True
+    )
+
+
+def is_local(target):
+    return target.startswith(('unix:', 'unix-abstract:'))
+
+
+def create_channel(target, server_name, identity=None):
+    """Канал к сервису с mTLS; к unix-сокету без TLS, если GRPC_UNIX_TLS=0."""
+    # Сжатые ответы (gzip/deflate) канал распаковывает сам
+    options = message_size_options()
+    if is_local(target) and not config.GRPC_UNIX_TLS:
+        return grpc.insecure_channel(target, options=options)
+    return grpc.secure_channel(
+        target,
+        client_credentials(identity),
+        options=options + [
+            ('grpc.ssl_target_name_override', server_name),
+            ('grpc.default_authority', server_name)
+        ]
+    )
+
+
+def _private_dir(path):
+    """Каталог, доступный только владельцу: это и есть защита сокета без TLS.
+
+    makedirs не меняет права существующего каталога, а права нового урезает
+    umask, поэтому права выставляются явно. Каталог другого пользователя или
+    символическая ссылка - отказ запускаться.
+    """
+    os.makedirs(path, mode=0o700, exist_ok=True)
+    info = os.lstat(path)
+    if not stat.S_ISDIR(info.st_mode) or info.st_uid != os.getuid():
+        raise RuntimeError(f"GRPC_UNIX_SOCKET_DIR {path} must be a directory owned by the current user")
+    if stat.S_IMODE(info.st_mode) != 0o700:
+        os.chmod(path, 0o700)
+
+
+def add_unix_port(server, name, credentials):
+    """Слушатель на unix-сокете рядом с TCP-портом, если задан GRPC_UNIX_SOCKET_DIR."""
+    if not config.GRPC_UNIX_SOCKET_DIR:
+        return None
+    _private_dir(config.GRPC_UNIX_SOCKET_DIR)
+    target = config.unix_target(name)
+    path = target[len('unix:'):]
+    # Сокет от прошлого запуска мешает bind
+    if os.path.exists(path):
+        os.unlink(path)
+    if config.GRPC_UNIX_TLS:
+        server.add_secure_port(target, credentials)
+    else:
+        server.add_insecure_port(target)
+    return target
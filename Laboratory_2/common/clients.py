@@ -0,0 +1,151 @@
+import time
+import uuid
+import zlib
+
+import grpc
+
+from generated import user_pb2_grpc, transaction_pb2_grpc, report_pb2_grpc
+from graphql_api.auth import AuthService, JWT_EXPIRE_MINUTES
+
+from . import config
+from .balancer import BalancedChannel
+from .channels import create_channel
+from .resilience import ResilienceInterceptor
+from .sharding import HashRing
+
+
+def resilient_stub(stub_class, target, server_name, identity=None):
+    targets = [item.strip() for item in target.split(',') if item.strip()]
+    if len(targets) > 1:
+        channel = BalancedChannel({item: create_channel(item, server_name, identity) for item in targets})
+    else:
+        channel = create_channel(target, server_name, identity)
+    return stub_class(grpc.intercept_channel(channel, ResilienceInterceptor(target)))
+
+
+class ServiceToken:
+    """Сервисный JWT, переиспользуемый до истечения срока."""
+
+    def __init__(self, caller, target_service, scopes):
+        self.caller = caller
+        self.target_service = target_service
+        self.scopes = scopes
+        self._token = None
+        self._expires_at = 0
+
+    def metadata(self):
+        now = time.time()
+        if now >= self._expires_at:
+            self._token = AuthService.create_service_token(self.caller, self.target_service, self.scopes)
+            # Обновляем с запасом в минуту
+            self._expires_at = now + (JWT_EXPIRE_MINUTES - 1) * 60
+        return [('authorization', f'Bearer {self._token}')]
+
+
+# Реплика отстала или недоступна - читаем с primary
+REPLICA_FALLBACK_CODES = {
+    grpc.StatusCode.FAILED_PRECONDITION, grpc.StatusCode.UNAVAILABLE, grpc.StatusCode.DEADLINE_EXCEEDED}
+
+
+class TransactionClient:
+    """Клиент TransactionService с маршрутизацией по user_id на шарды.
+
+    Если у шарда есть реплики, чтения пользователя идут на одну и ту же
+    реплику: версия данных и сами данные приходят из одной копии, и отчёт
+    не попадёт в кеш под чужой версией. Запись всегда идёт на primary.
+    """
+
+    def __init__(self, caller, shards=None, identity=None, replicas=None):
+        self.identity = identity
+        self.ring = HashRing(shards or config.TRANSACTION_SERVICE_SHARDS)
+        self.replicas = config.TRANSACTION_SERVICE_REPLICAS if replicas is None else replicas
+        self._replica_skip_until = {}  # реплика -> time.monotonic()
+        self.token = ServiceToken(caller, "transaction_service", ["read", "write"])
+        self._stubs = {}
+
+    def stub(self, target):
+        if target not in self._stubs:
+            self._stubs[target] = resilient_stub(
+                transaction_pb2_grpc.TransactionServiceStub, target, "transaction_service", self.identity)
+        return self._stubs[target]
+
+    def stub_for(self, user_id):
+        return self.stub(self.ring.get_node(user_id))
+
+    def replica_for(self, user_id):
+        replicas = self.replicas.get(self.ring.get_node(user_id))
+        if not replicas:
+            return None
+        replica = replicas[zlib.crc32(user_id.encode('utf-8')) % len(replicas)]
+        if self._replica_skip_until.get(replica, 0) > time.monotonic():
+            return None
+        return replica
+
+    def _read(self, method, request):
+        replica = self.replica_for(request.user_id)
+        if replica is not None:
+            try:
+                return getattr(self.stub(replica), method)(request, metadata=self.token.metadata())
+            except grpc.RpcError as e:
+                if e.code() not in REPLICA_FALLBACK_CODES:
+                    raise
+                # Пока реплика не догонит primary, все чтения её пользователей идут на primary
+                self._replica_skip_until[replica] = time.monotonic() + config.REPLICA_RETRY_SECONDS
+        return getattr(self.stub_for(request.user_id), method)(request, metadata=self.token.metadata())
+
+    def add_shard(self, target):
+        # Данные переезжают отдельно, см. common.rebalance
+        self.ring.add_node(target)
+
+    def add_transaction(self, request):
+        # Ключ задаётся один раз, чтобы повторы запроса не создавали дубликаты.
+        # Запрос копируется: иначе ключ остался бы в объекте вызывающего, и
+        # повторное использование того же объекта для новой транзакции
+        # молча схлопнулось бы с первой
+        if not request.idempotency_key:
+            original, request = request, type(request)()
+            request.CopyFrom(original)
+            request.idempotency_key = str(uuid.uuid4())
+        return self.stub_for(request.user_id).AddTransaction(request, metadata=self.token.metadata())
+
+    def get_transactions(self, request):
+        return self._read('GetTransactions', request)
+
+    def get_data_version(self, request):
+        return self._read('GetDataVersion', request)
+
+    def get_changes(self, request):
+        # Курсор привязан к копии, которая его выдала, поэтому синхронизация - с primary
+        return self.stub_for(request.user_id).GetChanges(request, metadata=self.token.metadata())
+
+
+class UserClient:
+    def __init__(self, caller, target=None, identity=None):
+        self.stub = resilient_stub(
+            user_pb2_grpc.UserServiceStub, target or config.USER_SERVICE_TARGET, "user_service", identity)
+        self.token = ServiceToken(caller, "user_service", ["read", "write"])
+
+    def register_user(self, request):
+        return self.stub.RegisterUser(request, metadata=self.token.metadata())
+
+    def login_user(self, request):
+        return self.stub.LoginUser(request, metadata=self.token.metadata())
+
+    def get_user(self, request):
+        return self.stub.GetUser(request, metadata=self.token.metadata())
+
+    def watch_users(self, request):
+        return self.stub.WatchUsers(request, metadata=self.token.metadata())
+
+
+class ReportClient:
+    def __init__(self, caller, target=None, identity=None):
+        self.stub = resilient_stub(
+            report_pb2_grpc.ReportServiceStub, target or config.REPORT_SERVICE_TARGET, "report_service", identity)
+        self.token = ServiceToken(caller, "report_service", ["read"])
+
+    def generate_monthly_report(self, request):
+        return self.stub.GenerateMonthlyReport(request, metadata=self.token.metadata())
+
+    def export_report(self, request):
+        return self.stub.ExportReport(request, metadata=self.token.metadata())
@@ -0,0 +1,44 @@
+import grpc
+
+from . import config
+
+ALGORITHMS = {
+    'gzip': grpc.Compression.Gzip,
+    'deflate': grpc.Compression.Deflate,
+    'none': grpc.Compression.NoCompression,
+}
+
+
+def message_size_options():
+    # По умолчанию gRPC принимает не больше 4 МБ, а выгрузка за месяц бывает больше
+    limit = config.GRPC_MAX_MESSAGE_MB * 1024 * 1024
+    return [
+        ('grpc.max_send_message_length', limit),
+        ('grpc.max_receive_message_length', limit),
+    ]
+
+
+class CompressionInterceptor(grpc.ServerInterceptor):
+    """Сжимает ответы выбранных методов; клиент сам сообщает поддерживаемые алгоритмы."""
+
+    def __init__(self, method_compression=None):
+        methods = config.METHOD_COMPRESSION if method_compression is None else method_compression
+        self.methods = {method: ALGORITHMS[name] for method, name in methods.items()}
+
+    def intercept_service(self, continuation, handler_call_details):
+        handler = continuation(handler_call_details)
+        compression = self.methods.get(handler_call_details.method.rsplit('/', 1)[-1])
+        if handler is None or handler.unary_unary is None or compression is None:
+            return handler
+
+        behavior = handler.unary_unary
+
+        def compressed(request, context):
+            context.set_compression(compression)
+            return behavior(request, context)
+
+        return grpc.unary_unary_rpc_method_handler(
+            compressed,
+            request_deserializer=handler.request_deserializer,
+            response_serializer=handler.response_serializer
+        )
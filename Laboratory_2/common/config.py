@@ -0,0 +1,133 @@
+import os
+import tempfile
+
+# Общая конфигурация клиентов; всё переопределяется переменными окружения
+
+
+def _list(name, default):
+    return [item.strip() for item in os.environ.get(name, default).split(',') if item.strip()]
+
+
+# Сервисы на одном хосте могут слушать unix-сокеты в этом каталоге; пусто - только TCP
+GRPC_UNIX_SOCKET_DIR = os.environ.get('GRPC_UNIX_SOCKET_DIR', '')
+# На TCP mTLS обязателен; на unix-сокете его можно отключить, доступ к сокету
+# ограничен правами на каталог
+GRPC_UNIX_TLS = os.environ.get('GRPC_UNIX_TLS', '0') != '0'
+
+
+def unix_target(name):
+    return f"unix:{os.path.join(GRPC_UNIX_SOCKET_DIR, name + '.sock')}"
+
+
+def _target(name, tcp_default):
+    # С каталогом сокетов клиенты по умолчанию ходят через них
+    return unix_target(name) if GRPC_UNIX_SOCKET_DIR else tcp_default
+
+
+# Адрес сервиса может быть списком реплик через запятую, например
+# "localhost:50052,localhost:50152": клиент распределяет вызовы между ними
+USER_SERVICE_TARGET = os.environ.get('USER_SERVICE_TARGET', _target('user_service', 'localhost:50051'))
+REPORT_SERVICE_TARGET = os.environ.get('REPORT_SERVICE_TARGET', _target('report_service', 'localhost:50052'))
+# Шарды TransactionService, например "localhost:50053,localhost:50063"
+TRANSACTION_SERVICE_SHARDS = _list(
+    'TRANSACTION_SERVICE_SHARDS', _target('transaction_service_50053', 'localhost:50053'))
+
+# Балансировка между репликами: round_robin или least_request
+GRPC_LB_POLICY = os.environ.get('GRPC_LB_POLICY', 'round_robin')
+# Как часто клиент опрашивает grpc.health.v1 реплик
+HEALTH_CHECK_INTERVAL_SECONDS = float(os.environ.get('HEALTH_CHECK_INTERVAL_SECONDS', '1'))
+# При остановке сервер сначала отвечает NOT_SERVING, чтобы клиенты успели уйти
+SHUTDOWN_DRAIN_SECONDS = float(os.environ.get('SHUTDOWN_DRAIN_SECONDS', '2'))
+SHUTDOWN_GRACE_SECONDS = float(os.environ.get('SHUTDOWN_GRACE_SECONDS', '5'))
+
+PKI_DIR = os.environ.get('FINANCE_PKI_DIR', 'finance_pki')
+# Сертификат, которым клиент представляется сервисам при mTLS
+CLIENT_IDENTITY = os.environ.get('FINANCE_CLIENT_IDENTITY', 'report_service')
+
+
+def _mapping(name, default, cast=str):
+    # "ExportReport=2,GenerateMonthlyReport=4" -> {'ExportReport': 2, ...}
+    return {key.strip(): cast(value.strip()) for key, value in
+            (item.split('=', 1) for item in _list(name, default))}
+
+
+# Реплики чтения TransactionService по шардам: "primary=replica1|replica2,...".
+# Чтения пользователя идут на одну и ту же реплику, запись - на primary
+TRANSACTION_SERVICE_REPLICAS = _mapping(
+    'TRANSACTION_SERVICE_REPLICAS', '', lambda value: [item for item in value.split('|') if item])
+# Реплика отказывает в чтении, если её данные старше этого
+REPLICA_MAX_STALENESS_SECONDS = float(os.environ.get('REPLICA_MAX_STALENESS_SECONDS', '2'))
+# Интервал heartbeat в потоке изменений; должен быть заметно меньше допустимого отставания
+REPLICA_HEARTBEAT_SECONDS = float(os.environ.get('REPLICA_HEARTBEAT_SECONDS', '0.5'))
+REPLICA_BATCH_SIZE = int(os.environ.get('REPLICA_BATCH_SIZE', '1000'))
+# Поток StreamChanges занимает поток пула primary, пока реплика подключена:
+# в пуле 10 потоков под обычные вызовы плюс по потоку на каждую реплику,
+# реплики сверх лимита получают RESOURCE_EXHAUSTED
+REPLICA_MAX_STREAMS = int(os.environ.get('REPLICA_MAX_STREAMS', '8'))
+# Сколько клиент обходит реплику после отказа и читает с primary
+REPLICA_RETRY_SECONDS = float(os.environ.get('REPLICA_RETRY_SECONDS', '5'))
+
+# Кеш профилей пользователей в шлюзе: время жизни найденных и неизвестных id,
+# предельный размер. Изменения приходят из UserService.WatchUsers, heartbeat
+# в этом потоке - раз в USER_WATCH_HEARTBEAT_SECONDS
+USER_CACHE_TTL_SECONDS = float(os.environ.get('USER_CACHE_TTL_SECONDS', '300'))
+USER_CACHE_NEGATIVE_TTL_SECONDS = float(os.environ.get('USER_CACHE_NEGATIVE_TTL_SECONDS', '30'))
+USER_CACHE_MAX_SIZE = int(os.environ.get('USER_CACHE_MAX_SIZE', '100000'))
+USER_WATCH_HEARTBEAT_SECONDS = float(os.environ.get('USER_WATCH_HEARTBEAT_SECONDS', '5'))
+# Каждый воркер шлюза держит WatchUsers и с ним поток пула UserService; для
+# них в пуле отдельный запас, подписчики сверх лимита получают RESOURCE_EXHAUSTED
+# и обходятся временем жизни записей
+USER_WATCH_MAX_STREAMS = int(os.environ.get('USER_WATCH_MAX_STREAMS', '16'))
+
+# Фильтр Блума по email и id в UserService: ожидаемое число пользователей и
+# доля ложных срабатываний при нём
+USER_BLOOM_CAPACITY = int(os.environ.get('USER_BLOOM_CAPACITY', '1000000'))
+USER_BLOOM_FP_RATE = float(os.environ.get('USER_BLOOM_FP_RATE', '0.01'))
+
+# Холодный слой TransactionService: закрытые месяцы переносятся из памяти в
+# столбцовые файлы (пусто - всё в памяти). В памяти остаются COLD_HOT_MONTHS
+# последних месяцев, включая текущий
+COLD_STORAGE_DIR = os.environ.get('COLD_STORAGE_DIR', os.path.join(tempfile.gettempdir(), 'finance_cold'))
+COLD_HOT_MONTHS = int(os.environ.get('COLD_HOT_MONTHS', '2'))
+COLD_COMPACT_INTERVAL_SECONDS = float(os.environ.get('COLD_COMPACT_INTERVAL_SECONDS', '3600'))
+
+# Допуск запросов: token bucket на пользователя и на сервис, лимит параллелизма на метод
+RATE_LIMIT_USER_RPS = float(os.environ.get('RATE_LIMIT_USER_RPS', '20'))
+RATE_LIMIT_USER_BURST = int(os.environ.get('RATE_LIMIT_USER_BURST', '40'))
+RATE_LIMIT_SERVICE_RPS = float(os.environ.get('RATE_LIMIT_SERVICE_RPS', '500'))
+RATE_LIMIT_SERVICE_BURST = int(os.environ.get('RATE_LIMIT_SERVICE_BURST', '1000'))
+METHOD_CONCURRENCY = _mapping('METHOD_CONCURRENCY', 'ExportReport=2,GenerateMonthlyReport=4', int)
+
+# Сжатие ответов по методам (gzip/deflate/none) и предельный размер сообщений
+METHOD_COMPRESSION = _mapping(
+    'METHOD_COMPRESSION', 'GetTransactions=gzip,GenerateMonthlyReport=gzip,ExportReport=gzip')
+GRPC_MAX_MESSAGE_MB = int(os.environ.get('GRPC_MAX_MESSAGE_MB', '64'))
+
+# GraphQL: бюджет стоимости запроса (число обращений к бэкендам) и persisted queries
+GRAPHQL_MAX_COST = int(os.environ.get('GRAPHQL_MAX_COST', '10'))
+GRAPHQL_PERSISTED_QUERIES = os.environ.get('GRAPHQL_PERSISTED_QUERIES', 'graphql_api/persisted_queries.json')
+# Разрешить клиентам регистрировать новые запросы (протокол Automatic Persisted Queries)
+GRAPHQL_APQ_REGISTER = os.environ.get('GRAPHQL_APQ_REGISTER', '1') != '0'
+# Сколько зарегистрированных клиентами запросов держать; запросы из файла не считаются
+GRAPHQL_APQ_MAX_QUERIES = int(os.environ.get('GRAPHQL_APQ_MAX_QUERIES', '1000'))
+
+# Unix-сокет брокера событий между воркерами шлюза; пусто - один процесс
+GATEWAY_EVENT_BUS = os.environ.get('GATEWAY_EVENT_BUS', '')
+
+# Фоновые выгрузки отчётов: каталог артефактов, время жизни, размер пула
+EXPORT_DIR = os.environ.get('EXPORT_DIR', os.path.join(tempfile.gettempdir(), 'finance_exports'))
+EXPORT_TTL_SECONDS = int(os.environ.get('EXPORT_TTL_SECONDS', '3600'))
+EXPORT_WORKERS = int(os.environ.get('EXPORT_WORKERS', '2'))
+EXPORT_MAX_PENDING = int(os.environ.get('EXPORT_MAX_PENDING', '100'))
+
+# Готовые файлы отчётов ReportService и HTTP-порт для их отдачи (0 - не поднимать)
+REPORT_STORE_DIR = os.environ.get('REPORT_STORE_DIR', os.path.join(tempfile.gettempdir(), 'finance_reports'))
+REPORT_STORE_MAX_MB = int(os.environ.get('REPORT_STORE_MAX_MB', '512'))
+REPORT_HTTP_PORT = int(os.environ.get('REPORT_HTTP_PORT', '8002'))
+
+# Отладочные ручки /debug (профиль CPU, стеки, heap, GC) на HTTP-приложении
+# сервиса. Сервис без своего HTTP-порта поднимает его на gRPC-порт плюс
+# DEBUG_PORT_OFFSET (0 - не поднимать)
+DEBUG_HTTP_HOST = os.environ.get('DEBUG_HTTP_HOST', '127.0.0.1')
+DEBUG_PORT_OFFSET = int(os.environ.get('DEBUG_PORT_OFFSET', '1000'))
+DEBUG_PROFILE_MAX_SECONDS = float(os.environ.get('DEBUG_PROFILE_MAX_SECONDS', '60'))
@@ -0,0 +1,10 @@
+import os
+import threading
+
+
+def write_atomic(path, data):
+    """Запись через временный файл и rename: читатель видит либо старый файл, либо новый целиком."""
+    tmp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+    with open(tmp_path, 'wb') as f:
+        f.write(data)
+    os.replace(tmp_path, path)
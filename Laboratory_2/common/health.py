@@ -0,0 +1,81 @@
+import signal
+import threading
+
+import grpc
+
+from generated import health_pb2, health_pb2_grpc
+
+from . import config
+
+SERVING = health_pb2.HealthCheckResponse.SERVING
+NOT_SERVING = health_pb2.HealthCheckResponse.NOT_SERVING
+SERVICE_UNKNOWN = health_pb2.HealthCheckResponse.SERVICE_UNKNOWN
+
+
+class HealthServicer(health_pb2_grpc.HealthServicer):
+    """Сервис grpc.health.v1.Health.
+
+    Статусы задаются через set() по имени сервиса ("" - сервер целиком).
+    probe, если задан, проверяется при каждом запросе: False означает
+    NOT_SERVING, например у отставшей реплики. Токен не нужен, как и у
+    HTTP /health шлюза: наружу отдаётся только статус.
+    """
+
+    def __init__(self, probe=None):
+        self.probe = probe
+        self._statuses = {}
+        self._changed = threading.Condition()
+
+    def set(self, service, status):
+        with self._changed:
+            self._statuses[service] = status
+            self._changed.notify_all()
+
+    def set_all(self, status):
+        with self._changed:
+            for service in self._statuses:
+                self._statuses[service] = status
+            self._changed.notify_all()
+
+    def status(self, service):
+        status = self._statuses.get(service, SERVICE_UNKNOWN)
+        if status == SERVING and self.probe is not None and not self.probe():
+            return NOT_SERVING
+        return status
+
+    def Check(self, request, context):
+        status = self.status(request.service)
+        if status == SERVICE_UNKNOWN:
+            context.abort(grpc.StatusCode.NOT_FOUND, f"Unknown service: {request.service}")
+        return health_pb2.HealthCheckResponse(status=status)
+
+    def Watch(self, request, context):
+        # Поток держит поток сервера, поэтому probe перепроверяется по таймеру
+        last = None
+        while context.is_active():
+            status = self.status(request.service)
+            if status != last:
+                last = status
+                yield health_pb2.HealthCheckResponse(status=status)
+            with self._changed:
+                self._changed.wait(config.HEALTH_CHECK_INTERVAL_SECONDS)
+
+
+def add_health(server, services, probe=None):
+    """Регистрирует Health на сервере; все сервисы и "" сразу SERVING."""
+    health = HealthServicer(probe)
+    for service in ('', *services):
+        health.set(service, SERVING)
+    health_pb2_grpc.add_HealthServicer_to_server(health, server)
+    return health
+
+
+def stop_on_signal(server, health):
+    """SIGTERM/SIGINT: сначала NOT_SERVING, чтобы клиенты ушли на другие
+    реплики, затем остановка с дозавершением начатых вызовов."""
+    def handle(signum, frame):
+        health.set_all(NOT_SERVING)
+        threading.Timer(config.SHUTDOWN_DRAIN_SECONDS, server.stop, args=(config.SHUTDOWN_GRACE_SECONDS,)).start()
+
+    signal.signal(signal.SIGTERM, handle)
+    signal.signal(signal.SIGINT, handle)
@@ -0,0 +1,174 @@
+"""Запуск всех сервисов на Linux (замена all.bat) с ожиданием готовности.
+
+Пример: три реплики ReportService и два шарда TransactionService с репликой
+чтения у каждого:
+    python -m common.launcher --reports 3 --shards 2 --replicas 1
+
+Сервисы стартуют группами по зависимостям. Следующая группа запускается,
+когда все процессы предыдущей отвечают SERVING в grpc.health.v1 (шлюз -
+200 на /health). Адреса всех реплик передаются процессам через окружение.
+UserService хранит пользователей в памяти процесса, поэтому он всегда один.
+Ctrl+C или SIGTERM останавливает процессы в обратном порядке.
+"""
+import os
+import sys
+import time
+import signal
+import argparse
+import subprocess
+import urllib.request
+
+import grpc
+
+from generated import health_pb2, health_pb2_grpc
+
+from . import config
+from .channels import create_channel
+
+
+def _address(name, port):
+    # С каталогом сокетов сервисы на одном хосте общаются через unix-сокеты
+    return config.unix_target(name) if config.GRPC_UNIX_SOCKET_DIR else f'localhost:{port}'
+
+
+def grpc_ready(target, server_name):
+    channel = create_channel(target, server_name)
+    try:
+        response = health_pb2_grpc.HealthStub(channel).Check(health_pb2.HealthCheckRequest(), timeout=1)
+        return response.status == health_pb2.HealthCheckResponse.SERVING
+    except grpc.RpcError:
+        return False
+    finally:
+        channel.close()
+
+
+def http_ready(port):
+    try:
+        with urllib.request.urlopen(f'http://localhost:{port}/health', timeout=1) as response:
+            return response.status == 200
+    except OSError:
+        return False
+
+
+class Launcher:
+    def __init__(self, env, timeout):
+        self.env = env
+        self.timeout = timeout
+        self.processes = []  # (имя, Popen) в порядке запуска
+
+    def start_group(self, services):
+        """services: [(имя, аргументы python -m, проверка готовности)]."""
+        started = []
+        for name, args, ready in services:
+            process = subprocess.Popen([sys.executable, '-m', *args], env=self.env)
+            self.processes.append((name, process))
+            started.append((name, process, ready))
+        deadline = time.monotonic() + self.timeout
+        for name, process, ready in started:
+            while not ready():
+                if process.poll() is not None:
+                    raise RuntimeError(f"{name} exited with code {process.returncode}")
+                if time.monotonic() > deadline:
+                    raise RuntimeError(f"{name} is not ready after {self.timeout:.0f}s")
+                time.sleep(0.2)
+            print(f"{name} is ready")
+
+    def wait(self):
+        # Остальные реплики продолжают работать, клиенты обходят упавшую по Health
+        running = dict(self.processes)
+        while running:
+            for name, process in list(running.items()):
+                if process.poll() is not None:
+                    print(f"{name} exited with code {process.returncode}", file=sys.stderr)
+                    del running[name]
+            time.sleep(1)
+
+    def stop(self):
+        for _, process in reversed(self.processes):
+            if process.poll() is None:
+                process.terminate()
+        # Сервисы сначала уходят в NOT_SERVING, потом дозавершают вызовы
+        timeout = config.SHUTDOWN_DRAIN_SECONDS + config.SHUTDOWN_GRACE_SECONDS + 5
+        for name, process in reversed(self.processes):
+            try:
+                process.wait(timeout)
+            except subprocess.TimeoutExpired:
+                print(f"{name} did not stop, killing it")
+                process.kill()
+
+
+def plan(reports, shards, replicas, gateway_workers, gateway_port):
+    """Группы процессов в порядке запуска и окружение для них."""
+    user = _address('user_service', 50051)
+    shard_ports = [50053 + 10 * i for i in range(shards)]
+    primaries = {port: _address(f'transaction_service_{port}', port) for port in shard_ports}
+    # Реплики шарда - на следующих портах после primary
+    replica_ports = {port: [port + 1 + j for j in range(replicas)] for port in shard_ports}
+    replica_targets = {port: [_address(f'transaction_service_{r}', r) for r in replica_ports[port]]
+                       for port in shard_ports}
+    report_ports = [50052 + 100 * i for i in range(reports)]
+    report_targets = [_address('report_service' if port == 50052 else f'report_service_{port}', port)
+                      for port in report_ports]
+
+    env = {
+        **os.environ,
+        'USER_SERVICE_TARGET': user,
+        'TRANSACTION_SERVICE_SHARDS': ','.join(primaries.values()),
+        'TRANSACTION_SERVICE_REPLICAS': ','.join(
+            f"{primaries[port]}={'|'.join(replica_targets[port])}" for port in shard_ports if replicas),
+        'REPORT_SERVICE_TARGET': ','.join(report_targets),
+    }
+
+    groups = [
+        [('user_service', ['user_service.server'], lambda: grpc_ready(user, 'user_service'))] + [
+            (f'transaction_service:{port}', ['transaction_service.server', '--port', str(port)],
+             lambda target=primaries[port]: grpc_ready(target, 'transaction_service'))
+            for port in shard_ports],
+        # Реплика готова, когда догнала primary
+        [(f'transaction_replica:{r}',
+          ['transaction_service.server', '--port', str(r), '--replica-of', primaries[port]],
+          lambda target=target: grpc_ready(target, 'transaction_service'))
+         for port in shard_ports for r, target in zip(replica_ports[port], replica_targets[port])],
+        # HTTP-отдачу файлов поднимает только первая реплика
+        [(f'report_service:{port}',
+          ['report_service.server', '--port', str(port),
+           '--http-port', str(config.REPORT_HTTP_PORT if i == 0 else 0)],
+          lambda target=target: grpc_ready(target, 'report_service'))
+         for i, (port, target) in enumerate(zip(report_ports, report_targets))],
+        [('graphql_gateway',
+          ['graphql_api.server', '--port', str(gateway_port), '--workers', str(gateway_workers)],
+          lambda: http_ready(gateway_port))],
+    ]
+    return [group for group in groups if group], env
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Start all services with readiness gating")
+    parser.add_argument('--reports', type=int, default=1, help="ReportService replicas")
+    parser.add_argument('--shards', type=int, default=1, help="TransactionService shards")
+    parser.add_argument('--replicas', type=int, default=0, choices=range(0, 9),
+                        help="Read replicas per TransactionService shard")
+    parser.add_argument('--gateway-workers', type=int, default=1)
+    parser.add_argument('--gateway-port', type=int, default=8000)
+    parser.add_argument('--timeout', type=float, default=30, help="Seconds to wait for each group")
+    args = parser.parse_args()
+
+    groups, env = plan(args.reports, args.shards, args.replicas, args.gateway_workers, args.gateway_port)
+    launcher = Launcher(env, args.timeout)
+    signal.signal(signal.SIGTERM, lambda signum, frame: sys.exit(0))
+    try:
+        for group in groups:
+            launcher.start_group(group)
+        print("Все сервисы запущены")
+        launcher.wait()
+    except RuntimeError as e:
+        print(e, file=sys.stderr)
+        sys.exit(1)
+    except KeyboardInterrupt:
+        pass
+    finally:
+        launcher.stop()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,16 @@
+import threading
+
+
+class StripedLock:
+    """Фиксированный набор блокировок, ключ выбирает одну из них по хешу.
+
+    Записи по разным ключам почти всегда идут параллельно, по одному ключу -
+    строго по очереди; памяти нужно O(stripes), а не по блокировке на ключ.
+    Блокировки реентерабельные, чтобы метод под блокировкой мог вызвать другой.
+    """
+
+    def __init__(self, stripes=64):
+        self._locks = [threading.RLock() for _ in range(stripes)]
+
+    def __call__(self, key):
+        return self._locks[hash(key) % len(self._locks)]
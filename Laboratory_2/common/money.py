@@ -0,0 +1,47 @@
+"""Суммы в минимальных единицах валюты (копейках) как целые int64.
+
+Поле amount (double) остаётся в сообщениях для совместимости и всегда
+равно amount_minor / MINOR_UNITS. Итоги считаются только по целым: сумма
+int в Python точна, а в пределах int64 идёт по быстрому пути sum() без
+длинной арифметики.
+"""
+import math
+from decimal import Decimal, ROUND_HALF_UP
+
+MINOR_UNITS = 100
+# amount_minor - int64 в сообщениях и в столбце сегментов
+MAX_MINOR = 2 ** 63 - 1
+
+
+def to_minor(amount):
+    """Сумма в копейках; половина копейки округляется от нуля (0.125 -> 13).
+
+    ValueError для inf, nan и сумм, которые не помещаются в int64.
+    """
+    amount = float(amount)
+    if not math.isfinite(amount):
+        raise ValueError(f"Amount must be a finite number, got {amount}")
+    # repr даёт кратчайшую запись числа: 0.1 -> "0.1" -> 10, без 0.1000000000000000055
+    minor = Decimal(repr(amount)) * MINOR_UNITS
+    # Проверка до quantize: в точность Decimal помещается не любое число
+    if abs(minor) > MAX_MINOR:
+        raise ValueError(f"Amount out of range: {amount}")
+    return int(minor.quantize(Decimal(1), ROUND_HALF_UP))
+
+
+def from_minor(minor):
+    return minor / MINOR_UNITS
+
+
+def minor_amount(message):
+    """amount_minor сообщения; отправители без этого поля присылают только amount."""
+    if message.amount_minor or not message.amount:
+        return message.amount_minor
+    return to_minor(message.amount)
+
+
+def totals(transactions):
+    """(доходы, расходы) в копейках по сообщениям Transaction."""
+    income = sum([t.amount_minor for t in transactions if t.type == 'income'])
+    expenses = sum([t.amount_minor for t in transactions if t.type == 'expense'])
+    return income, expenses
@@ -0,0 +1,235 @@
+"""Отладочные HTTP-ручки сервиса: профиль CPU, стеки потоков, heap, GC.
+
+Ручки висят на FastAPI-приложении сервиса под /debug, их проверяет
+jwt_middleware сервиса, а токен должен содержать право "debug", например
+AuthService.create_service_token("ops", "transaction_service", ["debug"]).
+
+    GET  /debug/profile?seconds=10        профиль CPU в collapsed-формате
+    GET  /debug/threads?prefix=grpc-worker стеки потоков (grpc-worker - пул gRPC)
+    POST /debug/heap/start                включить tracemalloc
+    GET  /debug/heap                      крупнейшие места выделения памяти
+    POST /debug/heap/baseline             запомнить снимок для /debug/heap/diff
+    GET  /debug/heap/diff                 рост памяти относительно снимка
+    POST /debug/heap/stop                 выключить tracemalloc
+    GET  /debug/gc                        статистика и паузы сборщика мусора
+
+Collapsed-формат ("поток;функция (файл:строка);... число") читают
+flamegraph.pl, inferno, speedscope.app.
+"""
+import gc
+import sys
+import time
+import threading
+import tracemalloc
+from collections import Counter
+
+import uvicorn
+from fastapi import APIRouter, Depends, HTTPException, Request
+from fastapi.responses import PlainTextResponse
+
+from . import config
+
+# Служебные кадры tracemalloc и импорта не интересны в выводе heap
+_HEAP_FILTERS = [
+    tracemalloc.Filter(False, tracemalloc.__file__),
+    tracemalloc.Filter(False, '<frozen importlib._bootstrap>'),
+    tracemalloc.Filter(False, '<frozen importlib._bootstrap_external>'),
+]
+
+
+def _frame_name(filename, lineno, function):
+    return f"{function} ({filename}:{lineno})"
+
+
+def _stack(frame):
+    """Кадры от корня к текущему."""
+    names = []
+    while frame is not None:
+        code = frame.f_code
+        names.append(_frame_name(code.co_filename, frame.f_lineno, code.co_name))
+        frame = frame.f_back
+    names.reverse()
+    return names
+
+
+def _collapsed(counts):
+    return ''.join(f"{';'.join(stack)} {count}\n" for stack, count in counts.most_common())
+
+
+def sample_cpu(seconds, interval, thread_prefix=''):
+    """Семплирует стеки всех потоков раз в interval секунд.
+
+    Возвращает Counter {(поток, кадр, ...): число семплов}. Под GIL семпл
+    снимается, когда семплер получает GIL, поэтому поток, который долго
+    держит GIL, немного недосчитывается. Ожидающие потоки тоже попадают в
+    профиль: их листовой кадр - wait/select/acquire.
+    """
+    me = threading.get_ident()
+    counts = Counter()
+    deadline = time.monotonic() + seconds
+    while time.monotonic() < deadline:
+        names = {thread.ident: thread.name for thread in threading.enumerate()}
+        for ident, frame in sys._current_frames().items():
+            name = names.get(ident, f"thread-{ident}")
+            if ident == me or not name.startswith(thread_prefix):
+                continue
+            counts[(name, *_stack(frame))] += 1
+        time.sleep(interval)
+    return counts
+
+
+def dump_threads(thread_prefix=''):
+    threads = {thread.ident: thread for thread in threading.enumerate()}
+    lines = []
+    for ident, frame in sys._current_frames().items():
+        thread = threads.get(ident)
+        name = thread.name if thread else f"thread-{ident}"
+        if not name.startswith(thread_prefix):
+            continue
+        daemon = ", daemon" if thread is not None and thread.daemon else ""
+        lines.append(f"Thread {ident} ({name}{daemon}):")
+        lines.extend(f"    {line}" for line in _stack(frame))
+        lines.append("")
+    return '\n'.join(lines)
+
+
+class GcPauses:
+    """Длительность сборок по поколениям через gc.callbacks."""
+
+    def __init__(self):
+        self.total_seconds = [0.0, 0.0, 0.0]
+        self.max_seconds = [0.0, 0.0, 0.0]
+        self._started = None
+
+    def __call__(self, phase, info):
+        if phase == 'start':
+            self._started = time.perf_counter()
+        elif self._started is not None:
+            pause = time.perf_counter() - self._started
+            generation = info['generation']
+            self.total_seconds[generation] += pause
+            self.max_seconds[generation] = max(self.max_seconds[generation], pause)
+            self._started = None
+
+    def stats(self):
+        return [{'pause_total_ms': round(total * 1000, 3), 'pause_max_ms': round(longest * 1000, 3)}
+                for total, longest in zip(self.total_seconds, self.max_seconds)]
+
+
+def _require_debug_scope(request: Request):
+    # Подпись и аудиторию уже проверил jwt_middleware
+    if 'debug' not in getattr(request.state, 'scopes', []):
+        raise HTTPException(status_code=403, detail="Token lacks 'debug' scope")
+
+
+def _heap_snapshot():
+    if not tracemalloc.is_tracing():
+        raise HTTPException(status_code=409, detail="tracemalloc is off, POST /debug/heap/start first")
+    return tracemalloc.take_snapshot().filter_traces(_HEAP_FILTERS)
+
+
+def _heap_text(stats, limit):
+    return '\n'.join(str(stat) for stat in stats[:limit]) + '\n'
+
+
+def _heap_collapsed(snapshot):
+    # Вес стека - байты, выделенные в нём и ещё не освобождённые
+    counts = Counter()
+    for stat in snapshot.statistics('traceback'):
+        stack = tuple(f"{frame.filename}:{frame.lineno}" for frame in stat.traceback)
+        counts[stack] += stat.size
+    return _collapsed(counts)
+
+
+def debug_router():
+    router = APIRouter(prefix='/debug', dependencies=[Depends(_require_debug_scope)])
+    profiling = threading.Lock()
+    baseline = {}
+    pauses = GcPauses()
+    gc.callbacks.append(pauses)
+
+    @router.get('/profile', response_class=PlainTextResponse)
+    def profile(seconds: float = 10, hz: int = 100, threads: str = ''):
+        # Обычный def: FastAPI выполняет ручку в пуле потоков, цикл событий свободен
+        if not 0 < seconds <= config.DEBUG_PROFILE_MAX_SECONDS:
+            raise HTTPException(status_code=400,
+                                detail=f"seconds must be in (0, {config.DEBUG_PROFILE_MAX_SECONDS}]")
+        if not 1 <= hz <= 1000:
+            raise HTTPException(status_code=400, detail="hz must be in [1, 1000]")
+        if not profiling.acquire(blocking=False):
+            raise HTTPException(status_code=409, detail="Another profile is running")
+        try:
+            return _collapsed(sample_cpu(seconds, 1 / hz, threads))
+        finally:
+            profiling.release()
+
+    @router.get('/threads', response_class=PlainTextResponse)
+    def threads(prefix: str = ''):
+        return dump_threads(prefix)
+
+    @router.post('/heap/start')
+    def heap_start(frames: int = 25):
+        if not tracemalloc.is_tracing():
+            tracemalloc.start(frames)
+        return {'tracing': True, 'frames': tracemalloc.get_traceback_limit()}
+
+    @router.post('/heap/stop')
+    def heap_stop():
+        baseline.clear()
+        tracemalloc.stop()
+        return {'tracing': False}
+
+    @router.get('/heap', response_class=PlainTextResponse)
+    def heap(limit: int = 50, group: str = 'lineno', format: str = 'text'):
+        snapshot = _heap_snapshot()
+        if format == 'collapsed':
+            return _heap_collapsed(snapshot)
+        if group not in ('lineno', 'filename', 'traceback'):
+            raise HTTPException(status_code=400, detail="group must be lineno, filename or traceback")
+        current, peak = tracemalloc.get_traced_memory()
+        return f"# traced {current} bytes, peak {peak} bytes\n" + _heap_text(snapshot.statistics(group), limit)
+
+    @router.post('/heap/baseline')
+    def heap_baseline():
+        baseline['snapshot'] = _heap_snapshot()
+        return {'traced_bytes': tracemalloc.get_traced_memory()[0]}
+
+    @router.get('/heap/diff', response_class=PlainTextResponse)
+    def heap_diff(limit: int = 50, group: str = 'lineno'):
+        if 'snapshot' not in baseline:
+            raise HTTPException(status_code=409, detail="No baseline, POST /debug/heap/baseline first")
+        if group not in ('lineno', 'filename', 'traceback'):
+            raise HTTPException(status_code=400, detail="group must be lineno, filename or traceback")
+        return _heap_text(_heap_snapshot().compare_to(baseline['snapshot'], group), limit)
+
+    @router.get('/gc')
+    def gc_stats():
+        return {
+            'enabled': gc.isenabled(),
+            'counts': gc.get_count(),
+            'thresholds': gc.get_threshold(),
+            'frozen': gc.get_freeze_count(),
+            'garbage': len(gc.garbage),
+            'generations': [{**stats, **timing} for stats, timing in zip(gc.get_stats(), pauses.stats())],
+        }
+
+    return router
+
+
+def add_debug_routes(app):
+    app.include_router(debug_router())
+
+
+def serve_http(app, port, host=None):
+    """Поднимает приложение в фоновом потоке процесса сервиса."""
+    threading.Thread(
+        target=uvicorn.run,
+        args=(app,),
+        kwargs={'host': host or config.DEBUG_HTTP_HOST, 'port': port, 'log_level': 'warning'},
+        name='debug-http',
+        daemon=True
+    ).start()
+
+
+def debug_port(grpc_port):
+    return grpc_port + config.DEBUG_PORT_OFFSET if config.DEBUG_PORT_OFFSET else 0
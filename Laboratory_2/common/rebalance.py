@@ -0,0 +1,64 @@
+"""Перенос пользователей между шардами TransactionService.
+
+Пример добавления шарда:
+    python -m common.rebalance --old localhost:50053 --new localhost:50053,localhost:50063
+
+Запись на время переноса нужно остановить, иначе транзакции,
+пришедшие на старый шард после копирования, будут потеряны.
+"""
+import argparse
+
+from generated import transaction_pb2
+
+from .clients import TransactionClient
+from .sharding import HashRing
+
+
+def rebalance(old_shards, new_shards, caller="rebalancer"):
+    client = TransactionClient(caller, shards=new_shards)
+    old_ring = HashRing(old_shards)
+    moved = {}
+
+    for source in old_ring.nodes:
+        source_stub = client.stub(source)
+        users = source_stub.ListUsers(
+            transaction_pb2.ListUsersRequest(), metadata=client.token.metadata()
+        ).user_ids
+
+        for user_id in users:
+            target = client.ring.get_node(user_id)
+            if target == source:
+                continue
+
+            transactions = source_stub.GetTransactions(
+                transaction_pb2.GetTransactionsRequest(user_id=user_id),
+                metadata=client.token.metadata()
+            ).transactions
+            client.stub(target).ImportTransactions(
+                transaction_pb2.ImportTransactionsRequest(transactions=transactions),
+                metadata=client.token.metadata()
+            )
+            # Удаляем со старого шарда только после успешного импорта
+            source_stub.DeleteUserTransactions(
+                transaction_pb2.DeleteUserTransactionsRequest(user_id=user_id),
+                metadata=client.token.metadata()
+            )
+            moved[user_id] = (source, target)
+
+    return moved
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Rebalance TransactionService shards")
+    parser.add_argument('--old', required=True, help="Comma-separated list of current shards")
+    parser.add_argument('--new', required=True, help="Comma-separated list of shards after the change")
+    args = parser.parse_args()
+
+    moved = rebalance(args.old.split(','), args.new.split(','))
+    for user_id, (source, target) in moved.items():
+        print(f"{user_id}: {source} -> {target}")
+    print(f"Moved {len(moved)} users")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,210 @@
+import time
+import random
+import threading
+import contextvars
+import collections
+from concurrent import futures
+
+import grpc
+
+# Дедлайны по методам, секунды
+DEFAULT_DEADLINE = 5.0
+DEADLINES = {
+    'RegisterUser': 3.0,
+    'LoginUser': 3.0,
+    'GetUser': 2.0,
+    'AddTransaction': 3.0,
+    'GetTransactions': 3.0,
+    'GetDataVersion': 1.0,
+    'GetChanges': 5.0,
+    'GenerateMonthlyReport': 10.0,
+    'ExportReport': 30.0,
+}
+
+# Повторяем только идемпотентные вызовы; AddTransaction - только с ключом идемпотентности
+RETRYABLE_METHODS = {
+    'GetUser', 'GetTransactions', 'GenerateMonthlyReport', 'ExportReport', 'ListUsers', 'GetDataVersion',
+    'GetChanges'}
+RETRYABLE_CODES = {grpc.StatusCode.UNAVAILABLE, grpc.StatusCode.ABORTED}
+HEDGED_METHODS = {'GetUser', 'GetTransactions'}
+# Ошибки, которые говорят о проблеме с самим бэкендом
+BREAKER_CODES = {grpc.StatusCode.UNAVAILABLE, grpc.StatusCode.DEADLINE_EXCEEDED}
+
+# Абсолютный дедлайн входящего вызова (time.monotonic), если он есть
+_incoming_deadline = contextvars.ContextVar('incoming_deadline', default=None)
+_hedge_executor = futures.ThreadPoolExecutor(max_workers=8, thread_name_prefix='grpc-hedge')
+
+
+class _CallDetails(
+        collections.namedtuple(
+            '_CallDetails',
+            ('method', 'timeout', 'metadata', 'credentials', 'wait_for_ready', 'compression')),
+        grpc.ClientCallDetails):
+    pass
+
+
+def _with_timeout(details, timeout):
+    return _CallDetails(
+        details.method, max(timeout, 0), details.metadata, details.credentials,
+        details.wait_for_ready, details.compression)
+
+
+class RpcFailure(grpc.RpcError):
+    """Ошибка, которую клиент формирует сам, не дойдя до сервера."""
+
+    def __init__(self, code, details):
+        super().__init__(details)
+        self._code = code
+        self._details = details
+
+    def code(self):
+        return self._code
+
+    def details(self):
+        return self._details
+
+    def exception(self):
+        return self
+
+    def result(self, timeout=None):
+        raise self
+
+
+class RetryPolicy:
+    def __init__(self, max_attempts=3, initial_backoff=0.05, max_backoff=1.0, multiplier=2.0):
+        self.max_attempts = max_attempts
+        self.initial_backoff = initial_backoff
+        self.max_backoff = max_backoff
+        self.multiplier = multiplier
+
+    def backoff(self, attempt):
+        # Full jitter: случайная пауза от 0 до экспоненциальной границы
+        ceiling = min(self.max_backoff, self.initial_backoff * self.multiplier ** attempt)
+        return random.uniform(0, ceiling)
+
+
+class CircuitBreaker:
+    """Размыкается после подряд идущих сбоев и пропускает пробный вызов через reset_timeout."""
+
+    def __init__(self, failure_threshold=5, reset_timeout=10.0):
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.failures = 0
+        self.opened_at = None
+        self._lock = threading.Lock()
+
+    def allow(self):
+        with self._lock:
+            if self.opened_at is None:
+                return True
+            if time.monotonic() - self.opened_at >= self.reset_timeout:
+                # half-open: пропускаем один вызов, следующий ждёт его результата
+                self.opened_at = time.monotonic()
+                return True
+            return False
+
+    def record(self, ok):
+        with self._lock:
+            if ok:
+                self.failures = 0
+                self.opened_at = None
+            else:
+                self.failures += 1
+                if self.failures >= self.failure_threshold:
+                    self.opened_at = time.monotonic()
+
+
+class ResilienceInterceptor(grpc.UnaryUnaryClientInterceptor):
+    """Дедлайны, повторы с джиттером, хеджирование и circuit breaker для одного адреса."""
+
+    def __init__(self, target, deadlines=None, retry_policy=None, hedge_delay=0.05, breaker=None):
+        self.target = target
+        self.deadlines = {**DEADLINES, **(deadlines or {})}
+        self.retry_policy = retry_policy or RetryPolicy()
+        self.hedge_delay = hedge_delay
+        self.breaker = breaker or CircuitBreaker()
+
+    def intercept_unary_unary(self, continuation, client_call_details, request):
+        method = client_call_details.method.rsplit('/', 1)[-1]
+        timeout = client_call_details.timeout or self.deadlines.get(method, DEFAULT_DEADLINE)
+        deadline = time.monotonic() + timeout
+        incoming = _incoming_deadline.get()
+        if incoming is not None:
+            deadline = min(deadline, incoming)
+
+        retryable = method in RETRYABLE_METHODS or (
+            method == 'AddTransaction' and getattr(request, 'idempotency_key', ''))
+        max_attempts = self.retry_policy.max_attempts if retryable else 1
+
+        attempt = 0
+        while True:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                return RpcFailure(grpc.StatusCode.DEADLINE_EXCEEDED, f"Deadline exceeded calling {method}")
+            if not self.breaker.allow():
+                return RpcFailure(grpc.StatusCode.UNAVAILABLE, f"Circuit open for {self.target}")
+
+            if method in HEDGED_METHODS:
+                outcome = self._hedged_call(continuation, client_call_details, request, deadline)
+            else:
+                outcome = continuation(_with_timeout(client_call_details, remaining), request)
+
+            code = outcome.code()
+            self.breaker.record(code not in BREAKER_CODES)
+            attempt += 1
+            if code not in RETRYABLE_CODES or attempt >= max_attempts:
+                return outcome
+
+            pause = self.retry_policy.backoff(attempt)
+            if time.monotonic() + pause >= deadline:
+                return outcome
+            time.sleep(pause)
+
+    def _hedged_call(self, continuation, client_call_details, request, deadline):
+        # Второй запрос уходит, если первый не ответил за hedge_delay; берём первый успешный.
+        # Оба укладываются в один общий дедлайн.
+        def attempt():
+            details = _with_timeout(client_call_details, deadline - time.monotonic())
+            return continuation(details, request)
+
+        pending = {_hedge_executor.submit(attempt)}
+        done, pending = futures.wait(pending, timeout=self.hedge_delay)
+        if not done and deadline - time.monotonic() > 0:
+            pending.add(_hedge_executor.submit(attempt))
+
+        outcome = None
+        while pending:
+            done, pending = futures.wait(pending, return_when=futures.FIRST_COMPLETED)
+            for future in done:
+                outcome = future.result()
+                if outcome.code() == grpc.StatusCode.OK:
+                    return outcome
+        if outcome is None:
+            outcome = next(iter(done)).result()
+        return outcome
+
+
+class DeadlinePropagationInterceptor(grpc.ServerInterceptor):
+    """Делает дедлайн входящего вызова верхней границей для исходящих."""
+
+    def intercept_service(self, continuation, handler_call_details):
+        handler = continuation(handler_call_details)
+        if handler is None or handler.unary_unary is None:
+            return handler
+
+        behavior = handler.unary_unary
+
+        def with_deadline(request, context):
+            remaining = context.time_remaining()
+            token = _incoming_deadline.set(
+                time.monotonic() + remaining if remaining is not None else None)
+            try:
+                return behavior(request, context)
+            finally:
+                _incoming_deadline.reset(token)
+
+        return grpc.unary_unary_rpc_method_handler(
+            with_deadline,
+            request_deserializer=handler.request_deserializer,
+            response_serializer=handler.response_serializer
+        )
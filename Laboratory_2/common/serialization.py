@@ -0,0 +1,105 @@
+import json
+import operator
+from itertools import islice
+
+try:
+    import orjson
+except ImportError:  # без orjson работает стандартный json, только медленнее
+    orjson = None
+
+
+class MessageConverter:
+    """Преобразование protobuf-сообщения в dict по списку (поле, ключ).
+
+    Поля читаются одним operator.attrgetter, без MessageToDict и обхода
+    дескрипторов на каждом сообщении.
+    """
+
+    def __init__(self, fields):
+        self.keys = tuple(key for _, key in fields)
+        getter = operator.attrgetter(*(field for field, _ in fields))
+        if len(fields) == 1:
+            # attrgetter с одним полем возвращает значение, а не кортеж
+            self._values = lambda message: (getter(message),)
+        else:
+            self._values = getter
+
+    def __call__(self, message):
+        return dict(zip(self.keys, self._values(message)))
+
+    def many(self, messages):
+        keys, values = self.keys, self._values
+        return [dict(zip(keys, values(message))) for message in messages]
+
+
+# Транзакция в JSON-выгрузке отчёта
+EXPORT_TRANSACTION = MessageConverter([
+    ('transaction_id', 'transaction_id'),
+    ('amount', 'amount'),
+    ('category', 'category'),
+    ('type', 'type'),
+    ('date', 'date'),
+    ('description', 'description'),
+])
+
+# Транзакция в ответах GraphQL (тип Transaction в schema.graphql)
+GRAPHQL_TRANSACTION = MessageConverter([
+    ('transaction_id', 'id'),
+    ('user_id', 'userId'),
+    ('amount', 'amount'),
+    ('category', 'category'),
+    ('type', 'type'),
+    ('date', 'date'),
+    ('description', 'description'),
+])
+
+EXPORT_REPORT = MessageConverter([
+    ('user_id', 'user_id'),
+    ('month', 'month'),
+    ('total_income', 'total_income'),
+    ('total_expenses', 'total_expenses'),
+    ('balance', 'balance'),
+])
+
+GRAPHQL_REPORT = MessageConverter([
+    ('user_id', 'userId'),
+    ('month', 'month'),
+    ('total_income', 'totalIncome'),
+    ('total_expenses', 'totalExpenses'),
+    ('balance', 'balance'),
+])
+
+
+def report_to_graphql(report):
+    result = GRAPHQL_REPORT(report)
+    result['transactions'] = GRAPHQL_TRANSACTION.many(report.transactions)
+    return result
+
+
+def dumps(obj, pretty=False):
+    """JSON в UTF-8 байтах; orjson, если он установлен."""
+    if orjson is not None:
+        return orjson.dumps(obj, option=orjson.OPT_INDENT_2 if pretty else 0)
+    if pretty:
+        return json.dumps(obj, indent=2, ensure_ascii=False).encode('utf-8')
+    return json.dumps(obj, separators=(',', ':'), ensure_ascii=False).encode('utf-8')
+
+
+def iter_dumps(obj, key, items, convert, chunk_size=1000):
+    """Компактный JSON объекта obj с большим массивом key, по частям.
+
+    items превращаются в dict через convert пачками по chunk_size, поэтому ни
+    полный список dict, ни вся строка JSON не держатся в памяти одновременно.
+    """
+    head = dumps(obj)
+    yield head[:-1] + (b',' if obj else b'') + dumps(key) + b':['
+    items = iter(items)
+    separator = b''
+    while batch := list(islice(items, chunk_size)):
+        yield separator + dumps(convert.many(batch))[1:-1]
+        separator = b','
+    yield b']}'
+
+
+def iter_report_json(report, chunk_size=1000):
+    return iter_dumps(EXPORT_REPORT(report), 'transactions', report.transactions, EXPORT_TRANSACTION, chunk_size)
@@ -0,0 +1,47 @@
+import bisect
+import hashlib
+
+
+def _hash(key):
+    # Стабильный между процессами хеш (встроенный hash() рандомизирован)
+    return int.from_bytes(hashlib.md5(key.encode('utf-8')).digest()[:8], 'big')
+
+
+class HashRing:
+    """Консистентное хеширование с виртуальными узлами.
+
+    При добавлении шарда на новый узел переезжает только ~1/N ключей.
+    """
+
+    def __init__(self, nodes=(), vnodes=128):
+        self.vnodes = vnodes
+        self.nodes = []
+        self._keys = []
+        self._ring = {}
+        for node in nodes:
+            self.add_node(node)
+
+    def add_node(self, node):
+        if node in self.nodes:
+            return
+        self.nodes.append(node)
+        for i in range(self.vnodes):
+            point = _hash(f"{node}#{i}")
+            self._ring[point] = node
+            bisect.insort(self._keys, point)
+
+    def remove_node(self, node):
+        if node not in self.nodes:
+            return
+        self.nodes.remove(node)
+        for i in range(self.vnodes):
+            point = _hash(f"{node}#{i}")
+            if self._ring.get(point) == node:
+                del self._ring[point]
+                self._keys.remove(point)
+
+    def get_node(self, key):
+        if not self._keys:
+            raise LookupError("Hash ring is empty")
+        index = bisect.bisect(self._keys, _hash(key)) % len(self._keys)
+        return self._ring[self._keys[index]]
@@ -15,7 +15,7 @@ _sym_db = _symbol_database.Default()
 from generated import transaction_pb2 as protobufs_dot_transaction__pb2
 
 
-DESCRIPTOR = _descriptor_pool.Default().AddSerializedFile(b'\n\x16protobufs/report.proto\x12\x06report\x1a\x1bprotobufs/transaction.proto\"6\n\x14MonthlyReportRequest\x12\x0f\n\x07user_id\x18\x01 \x01(\t\x12\r\n\x05month\x18\x02 \x01(\t\"\xa6\x01\n\x15MonthlyReportResponse\x12\x0f\n\x07user_id\x18\x01 \x01(\t\x12\r\n\x05month\x18\x02 \x01(\t\x12\x14\n\x0ctotal_income\x18\x03 \x01(\x01\x12\x16\n\x0etotal_expenses\x18\x04 \x01(\x01\x12\x0f\n\x07\x62\x61lance\x18\x05 \x01(\x01\x12.\n\x0ctransactions\x18\x06 \x03(\x0b\x32\x18.transaction.Transaction\"E\n\x13\x45xportReportRequest\x12\x0f\n\x07user_id\x18\x01 \x01(\t\x12\r\n\x05month\x18\x02 \x01(\t\x12\x0e\n\x06\x66ormat\x18\x03 \x01(\t\"?\n\x14\x45xportReportResponse\x12\x14\n\x0c\x66ile_content\x18\x01 \x01(\x0c\x12\x11\n\tfile_name\x18\x02 \x01(\t2\xb0\x01\n\rReportService\x12T\n\x15GenerateMonthlyReport\x12\x1c.report.MonthlyReportRequest\x1a\x1d.report.MonthlyReportResponse\x12I\n\x0c\x45xportReport\x12\x1b.report.ExportReportRequest\x1a\x1c.report.ExportReportResponseb\x06proto3')
+DESCRIPTOR = _descriptor_pool.Default().AddSerializedFile(b'\n\x16protobufs/report.proto\x12\x06report\x1a\x1bprotobufs/transaction.proto\"6\n\x14MonthlyReportRequest\x12\x0f\n\x07user_id\x18\x01 \x01(\t\x12\r\n\x05month\x18\x02 \x01(\t\"\xf7\x01\n\x15MonthlyReportResponse\x12\x0f\n\x07user_id\x18\x01 \x01(\t\x12\r\n\x05month\x18\x02 \x01(\t\x12\x14\n\x0ctotal_income\x18\x03 \x01(\x01\x12\x16\n\x0etotal_expenses\x18\x04 \x01(\x01\x12\x0f\n\x07\x62\x61lance\x18\x05 \x01(\x01\x12.\n\x0ctransactions\x18\x06 \x03(\x0b\x32\x18.transaction.Transaction\x12\x1a\n\x12total_income_minor\x18\x07 \x01(\x03\x12\x1c\n\x14total_expenses_minor\x18\x08 \x01(\x03\x12\x15\n\rbalance_minor\x18\t \x01(\x03\"U\n\x13\x45xportReportRequest\x12\x0f\n\x07user_id\x18\x01 \x01(\t\x12\r\n\x05month\x18\x02 \x01(\t\x12\x0e\n\x06\x66ormat\x18\x03 \x01(\t\x12\x0e\n\x06pretty\x18\x04 \x01(\x08\"?\n\x14\x45xportReportResponse\x12\x14\n\x0c\x66ile_content\x18\x01 \x01(\x0c\x12\x11\n\tfile_name\x18\x02 \x01(\t2\xb0\x01\n\rReportService\x12T\n\x15GenerateMonthlyReport\x12\x1c.report.MonthlyReportRequest\x1a\x1d.report.MonthlyReportResponse\x12I\n\x0c\x45xportReport\x12\x1b.report.ExportReportRequest\x1a\x1c.report.ExportReportResponseb\x06proto3')
 
 _globals = globals()
 _builder.BuildMessageAndEnumDescriptors(DESCRIPTOR, _globals)
@@ -25,11 +25,11 @@ if _descriptor._USE_C_DESCRIPTORS == False:
   _globals['_MONTHLYREPORTREQUEST']._serialized_start=63
   _globals['_MONTHLYREPORTREQUEST']._serialized_end=117
   _globals['_MONTHLYREPORTRESPONSE']._serialized_start=120
-  _globals['_MONTHLYREPORTRESPONSE']._serialized_end=286
-  _globals['_EXPORTREPORTREQUEST']._serialized_start=288
-  _globals['_EXPORTREPORTREQUEST']._serialized_end=357
-  _globals['_EXPORTREPORTRESPONSE']._serialized_start=359
-  _globals['_EXPORTREPORTRESPONSE']._serialized_end=422
-  _globals['_REPORTSERVICE']._serialized_start=425
-  _globals['_REPORTSERVICE']._serialized_end=601
+  _globals['_MONTHLYREPORTRESPONSE']._serialized_end=367
+  _globals['_EXPORTREPORTREQUEST']._serialized_start=369
+  _globals['_EXPORTREPORTREQUEST']._serialized_end=454
+  _globals['_EXPORTREPORTRESPONSE']._serialized_start=456
+  _globals['_EXPORTREPORTRESPONSE']._serialized_end=519
+  _globals['_REPORTSERVICE']._serialized_start=522
+  _globals['_REPORTSERVICE']._serialized_end=698
 # @@protoc_insertion_point(module_scope)
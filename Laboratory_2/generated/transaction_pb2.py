@@ -14,23 +14,49 @@ _sym_db = _symbol_database.Default()
 
 
 
-DESCRIPTOR = _descriptor_pool.Default().AddSerializedFile(b'\n\x1bprotobufs/transaction.proto\x12\x0btransaction\"m\n\x15\x41\x64\x64TransactionRequest\x12\x0f\n\x07user_id\x18\x01 \x01(\t\x12\x0e\n\x06\x61mount\x18\x02 \x01(\x01\x12\x10\n\x08\x63\x61tegory\x18\x03 \x01(\t\x12\x0c\n\x04type\x18\x04 \x01(\t\x12\x13\n\x0b\x64\x65scription\x18\x05 \x01(\t\"O\n\x16GetTransactionsRequest\x12\x0f\n\x07user_id\x18\x01 \x01(\t\x12\x12\n\nstart_date\x18\x02 \x01(\t\x12\x10\n\x08\x65nd_date\x18\x03 \x01(\t\"\x89\x01\n\x0bTransaction\x12\x16\n\x0etransaction_id\x18\x01 \x01(\t\x12\x0f\n\x07user_id\x18\x02 \x01(\t\x12\x0e\n\x06\x61mount\x18\x03 \x01(\x01\x12\x10\n\x08\x63\x61tegory\x18\x04 \x01(\t\x12\x0c\n\x04type\x18\x05 \x01(\t\x12\x0c\n\x04\x64\x61te\x18\x06 \x01(\t\x12\x13\n\x0b\x64\x65scription\x18\x07 \x01(\t\"D\n\x13TransactionResponse\x12-\n\x0btransaction\x18\x01 \x01(\x0b\x32\x18.transaction.Transaction\"F\n\x14TransactionsResponse\x12.\n\x0ctransactions\x18\x01 \x03(\x0b\x32\x18.transaction.Transaction2\xc7\x01\n\x12TransactionService\x12V\n\x0e\x41\x64\x64Transaction\x12\".transaction.AddTransactionRequest\x1a .transaction.TransactionResponse\x12Y\n\x0fGetTransactions\x12#.transaction.GetTransactionsRequest\x1a!.transaction.TransactionsResponseb\x06proto3')
+DESCRIPTOR = _descriptor_pool.Default().AddSerializedFile(b'\n\x1bprotobufs/transaction.proto\x12\x0btransaction\"\x9c\x01\n\x15\x41\x64\x64TransactionRequest\x12\x0f\n\x07user_id\x18\x01 \x01(\t\x12\x0e\n\x06\x61mount\x18\x02 \x01(\x01\x12\x10\n\x08\x63\x61tegory\x18\x03 \x01(\t\x12\x0c\n\x04type\x18\x04 \x01(\t\x12\x13\n\x0b\x64\x65scription\x18\x05 \x01(\t\x12\x17\n\x0fidempotency_key\x18\x06 \x01(\t\x12\x14\n\x0c\x61mount_minor\x18\x07 \x01(\x03\"\x83\x02\n\x16GetTransactionsRequest\x12\x0f\n\x07user_id\x18\x01 \x01(\t\x12\x12\n\nstart_date\x18\x02 \x01(\t\x12\x10\n\x08\x65nd_date\x18\x03 \x01(\t\x12\x10\n\x08\x63\x61tegory\x18\x04 \x01(\t\x12\x0c\n\x04type\x18\x05 \x01(\t\x12\x17\n\nmin_amount\x18\x06 \x01(\x01H\x00\x88\x01\x01\x12\x17\n\nmax_amount\x18\x07 \x01(\x01H\x01\x88\x01\x01\x12\x0f\n\x07sort_by\x18\x08 \x01(\t\x12\x12\n\ndescending\x18\t \x01(\x08\x12\r\n\x05limit\x18\n \x01(\x05\x12\x0e\n\x06\x63ursor\x18\x0b \x01(\tB\r\n\x0b_min_amountB\r\n\x0b_max_amount\"\x9f\x01\n\x0bTransaction\x12\x16\n\x0etransaction_id\x18\x01 \x01(\t\x12\x0f\n\x07user_id\x18\x02 \x01(\t\x12\x0e\n\x06\x61mount\x18\x03 \x01(\x01\x12\x10\n\x08\x63\x61tegory\x18\x04 \x01(\t\x12\x0c\n\x04type\x18\x05 \x01(\t\x12\x0c\n\x04\x64\x61te\x18\x06 \x01(\t\x12\x13\n\x0b\x64\x65scription\x18\x07 \x01(\t\x12\x14\n\x0c\x61mount_minor\x18\x08 \x01(\x03\"D\n\x13TransactionResponse\x12-\n\x0btransaction\x18\x01 \x01(\x0b\x32\x18.transaction.Transaction\"[\n\x14TransactionsResponse\x12.\n\x0ctransactions\x18\x01 \x03(\x0b\x32\x18.transaction.Transaction\x12\x13\n\x0bnext_cursor\x18\x02 \x01(\t\"\x12\n\x10ListUsersRequest\"%\n\x11ListUsersResponse\x12\x10\n\x08user_ids\x18\x01 \x03(\t\"K\n\x19ImportTransactionsRequest\x12.\n\x0ctransactions\x18\x01 \x03(\x0b\x32\x18.transaction.Transaction\".\n\x1aImportTransactionsResponse\x12\x10\n\x08imported\x18\x01 \x01(\x05\"0\n\x1d\x44\x65leteUserTransactionsRequest\x12\x0f\n\x07user_id\x18\x01 \x01(\t\"1\n\x1e\x44\x65leteUserTransactionsResponse\x12\x0f\n\x07\x64\x65leted\x18\x01 \x01(\x05\"4\n\x12\x44\x61taVersionRequest\x12\x0f\n\x07user_id\x18\x01 \x01(\t\x12\r\n\x05month\x18\x02 \x01(\t\"&\n\x13\x44\x61taVersionResponse\x12\x0f\n\x07version\x18\x01 \x01(\t\"C\n\x11GetChangesRequest\x12\x0f\n\x07user_id\x18\x01 \x01(\t\x12\x0e\n\x06\x63ursor\x18\x02 \x01(\t\x12\r\n\x05limit\x18\x03 \x01(\x05\"r\n\x0f\x43hangesResponse\x12.\n\x0ctransactions\x18\x01 \x03(\x0b\x32\x18.transaction.Transaction\x12\x0e\n\x06\x63ursor\x18\x02 \x01(\t\x12\r\n\x05reset\x18\x03 \x01(\x08\x12\x10\n\x08has_more\x18\x04 \x01(\x08\":\n\x14StreamChangesRequest\x12\x0e\n\x06\x63ursor\x18\x01 \x01(\t\x12\x12\n\nbatch_size\x18\x02 \x01(\x05\"^\n\x06\x43hange\x12/\n\x0btransaction\x18\x01 \x01(\x0b\x32\x18.transaction.TransactionH\x00\x12\x19\n\x0f\x64\x65leted_user_id\x18\x02 \x01(\tH\x00\x42\x08\n\x06\x63hange\"`\n\x0b\x43hangeBatch\x12$\n\x07\x63hanges\x18\x01 \x03(\x0b\x32\x13.transaction.Change\x12\x0e\n\x06\x63ursor\x18\x02 \x01(\t\x12\r\n\x05reset\x18\x03 \x01(\x08\x12\x0c\n\x04head\x18\x04 \x01(\x03\x32\xde\x05\n\x12TransactionService\x12V\n\x0e\x41\x64\x64Transaction\x12\".transaction.AddTransactionRequest\x1a .transaction.TransactionResponse\x12Y\n\x0fGetTransactions\x12#.transaction.GetTransactionsRequest\x1a!.transaction.TransactionsResponse\x12J\n\tListUsers\x12\x1d.transaction.ListUsersRequest\x1a\x1e.transaction.ListUsersResponse\x12\x65\n\x12ImportTransactions\x12&.transaction.ImportTransactionsRequest\x1a\'.transaction.ImportTransactionsResponse\x12q\n\x16\x44\x65leteUserTransactions\x12*.transaction.DeleteUserTransactionsRequest\x1a+.transaction.DeleteUserTransactionsResponse\x12S\n\x0eGetDataVersion\x12\x1f.transaction.DataVersionRequest\x1a .transaction.DataVersionResponse\x12J\n\nGetChanges\x12\x1e.transaction.GetChangesRequest\x1a\x1c.transaction.ChangesResponse\x12N\n\rStreamChanges\x12!.transaction.StreamChangesRequest\x1a\x18.transaction.ChangeBatch0\x01\x62\x06proto3')
 
 _globals = globals()
 _builder.BuildMessageAndEnumDescriptors(DESCRIPTOR, _globals)
 _builder.BuildTopDescriptorsAndMessages(DESCRIPTOR, 'protobufs.transaction_pb2', _globals)
 if _descriptor._USE_C_DESCRIPTORS == False:
   DESCRIPTOR._options = None
-  _globals['_ADDTRANSACTIONREQUEST']._serialized_start=44
-  _globals['_ADDTRANSACTIONREQUEST']._serialized_end=153
-  _globals['_GETTRANSACTIONSREQUEST']._serialized_start=155
-  _globals['_GETTRANSACTIONSREQUEST']._serialized_end=234
-  _globals['_TRANSACTION']._serialized_start=237
-  _globals['_TRANSACTION']._serialized_end=374
-  _globals['_TRANSACTIONRESPONSE']._serialized_start=376
-  _globals['_TRANSACTIONRESPONSE']._serialized_end=444
-  _globals['_TRANSACTIONSRESPONSE']._serialized_start=446
-  _globals['_TRANSACTIONSRESPONSE']._serialized_end=516
-  _globals['_TRANSACTIONSERVICE']._serialized_start=519
-  _globals['_TRANSACTIONSERVICE']._serialized_end=718
+  _globals['_ADDTRANSACTIONREQUEST']._serialized_start=45
+  _globals['_ADDTRANSACTIONREQUEST']._serialized_end=201
+  _globals['_GETTRANSACTIONSREQUEST']._serialized_start=204
+  _globals['_GETTRANSACTIONSREQUEST']._serialized_end=463
+  _globals['_TRANSACTION']._serialized_start=466
+  _globals['_TRANSACTION']._serialized_end=625
+  _globals['_TRANSACTIONRESPONSE']._serialized_start=627
+  _globals['_TRANSACTIONRESPONSE']._serialized_end=695
+  _globals['_TRANSACTIONSRESPONSE']._serialized_start=697
+  _globals['_TRANSACTIONSRESPONSE']._serialized_end=788
+  _globals['_LISTUSERSREQUEST']._serialized_start=790
+  _globals['_LISTUSERSREQUEST']._serialized_end=808
+  _globals['_LISTUSERSRESPONSE']._serialized_start=810
+  _globals['_LISTUSERSRESPONSE']._serialized_end=847
+  _globals['_IMPORTTRANSACTIONSREQUEST']._serialized_start=849
+  _globals['_IMPORTTRANSACTIONSREQUEST']._serialized_end=924
+  _globals['_IMPORTTRANSACTIONSRESPONSE']._serialized_start=926
+  _globals['_IMPORTTRANSACTIONSRESPONSE']._serialized_end=972
+  _globals['_DELETEUSERTRANSACTIONSREQUEST']._serialized_start=974
+  _globals['_DELETEUSERTRANSACTIONSREQUEST']._serialized_end=1022
+  _globals['_DELETEUSERTRANSACTIONSRESPONSE']._serialized_start=1024
+  _globals['_DELETEUSERTRANSACTIONSRESPONSE']._serialized_end=1073
+  _globals['_DATAVERSIONREQUEST']._serialized_start=1075
+  _globals['_DATAVERSIONREQUEST']._serialized_end=1127
+  _globals['_DATAVERSIONRESPONSE']._serialized_start=1129
+  _globals['_DATAVERSIONRESPONSE']._serialized_end=1167
+  _globals['_GETCHANGESREQUEST']._serialized_start=1169
+  _globals['_GETCHANGESREQUEST']._serialized_end=1236
+  _globals['_CHANGESRESPONSE']._serialized_start=1238
+  _globals['_CHANGESRESPONSE']._serialized_end=1352
+  _globals['_STREAMCHANGESREQUEST']._serialized_start=1354
+  _globals['_STREAMCHANGESREQUEST']._serialized_end=1412
+  _globals['_CHANGE']._serialized_start=1414
+  _globals['_CHANGE']._serialized_end=1508
+  _globals['_CHANGEBATCH']._serialized_start=1510
+  _globals['_CHANGEBATCH']._serialized_end=1606
+  _globals['_TRANSACTIONSERVICE']._serialized_start=1609
+  _globals['_TRANSACTIONSERVICE']._serialized_end=2343
 # @@protoc_insertion_point(module_scope)
@@ -24,6 +24,36 @@ class TransactionServiceStub(object):
                 request_serializer=protobufs_dot_transaction__pb2.GetTransactionsRequest.SerializeToString,
                 response_deserializer=protobufs_dot_transaction__pb2.TransactionsResponse.FromString,
                 )
+        self.ListUsers = channel.unary_unary(
+                '/transaction.TransactionService/ListUsers',
+                request_serializer=protobufs_dot_transaction__pb2.ListUsersRequest.SerializeToString,
+                response_deserializer=protobufs_dot_transaction__pb2.ListUsersResponse.FromString,
+                )
+        self.ImportTransactions = channel.unary_unary(
+                '/transaction.TransactionService/ImportTransactions',
+                request_serializer=protobufs_dot_transaction__pb2.ImportTransactionsRequest.SerializeToString,
+                response_deserializer=protobufs_dot_transaction__pb2.ImportTransactionsResponse.FromString,
+                )
+        self.DeleteUserTransactions = channel.unary_unary(
+                '/transaction.TransactionService/DeleteUserTransactions',
+                request_serializer=protobufs_dot_transaction__pb2.DeleteUserTransactionsRequest.SerializeToString,
+                response_deserializer=protobufs_dot_transaction__pb2.DeleteUserTransactionsResponse.FromString,
+                )
+        self.GetDataVersion = channel.unary_unary(
+                '/transaction.TransactionService/GetDataVersion',
+                request_serializer=protobufs_dot_transaction__pb2.DataVersionRequest.SerializeToString,
+                response_deserializer=protobufs_dot_transaction__pb2.DataVersionResponse.FromString,
+                )
+        self.GetChanges = channel.unary_unary(
+                '/transaction.TransactionService/GetChanges',
+                request_serializer=protobufs_dot_transaction__pb2.GetChangesRequest.SerializeToString,
+                response_deserializer=protobufs_dot_transaction__pb2.ChangesResponse.FromString,
+                )
+        self.StreamChanges = channel.unary_stream(
+                '/transaction.TransactionService/StreamChanges',
+                request_serializer=protobufs_dot_transaction__pb2.StreamChangesRequest.SerializeToString,
+                response_deserializer=protobufs_dot_transaction__pb2.ChangeBatch.FromString,
+                )
 
 
 class TransactionServiceServicer(object):
@@ -41,6 +71,46 @@ class TransactionServiceServicer(object):
         context.set_details('Method not implemented!')
         raise NotImplementedError('Method not implemented!')
 
+    def ListUsers(self, request, context):
+        """Перенос пользователей между шардами при ребалансировке
+        """
+        context.set_code(grpc.StatusCode.UNIMPLEMENTED)
+        context.set_details('Method not implemented!')
+        raise NotImplementedError('Method not implemented!')
+
+    def ImportTransactions(self, request, context):
+        """Missing associated documentation comment in .proto file."""
+        context.set_code(grpc.StatusCode.UNIMPLEMENTED)
+        context.set_details('Method not implemented!')
+        raise NotImplementedError('Method not implemented!')
+
+    def DeleteUserTransactions(self, request, context):
+        """Missing associated documentation comment in .proto file."""
+        context.set_code(grpc.StatusCode.UNIMPLEMENTED)
+        context.set_details('Method not implemented!')
+        raise NotImplementedError('Method not implemented!')
+
+    def GetDataVersion(self, request, context):
+        """Версия данных пользователя за месяц: меняется при любой записи в этот месяц
+        """
+        context.set_code(grpc.StatusCode.UNIMPLEMENTED)
+        context.set_details('Method not implemented!')
+        raise NotImplementedError('Method not implemented!')
+
+    def GetChanges(self, request, context):
+        """Транзакции пользователя, появившиеся после курсора: синхронизация локальных кешей
+        """
+        context.set_code(grpc.StatusCode.UNIMPLEMENTED)
+        context.set_details('Method not implemented!')
+        raise NotImplementedError('Method not implemented!')
+
+    def StreamChanges(self, request, context):
+        """Журнал всех изменений для реплик чтения; поток открыт, пока реплика подключена
+        """
+        context.set_code(grpc.StatusCode.UNIMPLEMENTED)
+        context.set_details('Method not implemented!')
+        raise NotImplementedError('Method not implemented!')
+
 
 def add_TransactionServiceServicer_to_server(servicer, server):
     rpc_method_handlers = {
@@ -54,6 +124,36 @@ def add_TransactionServiceServicer_to_server(servicer, server):
                     request_deserializer=protobufs_dot_transaction__pb2.GetTransactionsRequest.FromString,
                     response_serializer=protobufs_dot_transaction__pb2.TransactionsResponse.SerializeToString,
             ),
+            'ListUsers': grpc.unary_unary_rpc_method_handler(
+                    servicer.ListUsers,
+                    request_deserializer=protobufs_dot_transaction__pb2.ListUsersRequest.FromString,
+                    response_serializer=protobufs_dot_transaction__pb2.ListUsersResponse.SerializeToString,
+            ),
+            'ImportTransactions': grpc.unary_unary_rpc_method_handler(
+                    servicer.ImportTransactions,
+                    request_deserializer=protobufs_dot_transaction__pb2.ImportTransactionsRequest.FromString,
+                    response_serializer=protobufs_dot_transaction__pb2.ImportTransactionsResponse.SerializeToString,
+            ),
+            'DeleteUserTransactions': grpc.unary_unary_rpc_method_handler(
+                    servicer.DeleteUserTransactions,
+                    request_deserializer=protobufs_dot_transaction__pb2.DeleteUserTransactionsRequest.FromString,
+                    response_serializer=protobufs_dot_transaction__pb2.DeleteUserTransactionsResponse.SerializeToString,
+            ),
+            'GetDataVersion': grpc.unary_unary_rpc_method_handler(
+                    servicer.GetDataVersion,
+                    request_deserializer=protobufs_dot_transaction__pb2.DataVersionRequest.FromString,
+                    response_serializer=protobufs_dot_transaction__pb2.DataVersionResponse.SerializeToString,
+            ),
+            'GetChanges': grpc.unary_unary_rpc_method_handler(
+                    servicer.GetChanges,
+                    request_deserializer=protobufs_dot_transaction__pb2.GetChangesRequest.FromString,
+                    response_serializer=protobufs_dot_transaction__pb2.ChangesResponse.SerializeToString,
+            ),
+            'StreamChanges': grpc.unary_stream_rpc_method_handler(
+                    servicer.StreamChanges,
+                    request_deserializer=protobufs_dot_transaction__pb2.StreamChangesRequest.FromString,
+                    response_serializer=protobufs_dot_transaction__pb2.ChangeBatch.SerializeToString,
+            ),
     }
     generic_handler = grpc.method_handlers_generic_handler(
             'transaction.TransactionService', rpc_method_handlers)
@@ -97,3 +197,105 @@ class TransactionService(object):
             protobufs_dot_transaction__pb2.TransactionsResponse.FromString,
             options, channel_credentials,
             insecure, call_credentials, compression, wait_for_ready, timeout, metadata)
+
+    @staticmethod
+    def ListUsers(request,
+            target,
+            options=(),
+            channel_credentials=None,
+            call_credentials=None,
+            insecure=False,
+            compression=None,
+            wait_for_ready=None,
+            timeout=None,
+            metadata=None):
+        return grpc.experimental.unary_unary(request, target, '/transaction.TransactionService/ListUsers',
+            protobufs_dot_transaction__pb2.ListUsersRequest.SerializeToString,
+            protobufs_dot_transaction__pb2.ListUsersResponse.FromString,
+            options, channel_credentials,
+            insecure, call_credentials, compression, wait_for_ready, timeout, metadata)
+
+    @staticmethod
+    def ImportTransactions(request,
+            target,
+            options=(),
+            channel_credentials=None,
+            call_credentials=None,
+            insecure=False,
+            compression=None,
+            wait_for_ready=None,
+            timeout=None,
+            metadata=None):
+        return grpc.experimental.unary_unary(request, target, '/transaction.TransactionService/ImportTransactions',
+            protobufs_dot_transaction__pb2.ImportTransactionsRequest.SerializeToString,
+            protobufs_dot_transaction__pb2.ImportTransactionsResponse.FromString,
+            options, channel_credentials,
+            insecure, call_credentials, compression, wait_for_ready, timeout, metadata)
+
+    @staticmethod
+    def DeleteUserTransactions(request,
+            target,
+            options=(),
+            channel_credentials=None,
+            call_credentials=None,
+            insecure=False,
+            compression=None,
+            wait_for_ready=None,
+            timeout=None,
+            metadata=None):
+        return grpc.experimental.unary_unary(request, target, '/transaction.TransactionService/DeleteUserTransactions',
+            protobufs_dot_transaction__pb2.DeleteUserTransactionsRequest.SerializeToString,
+            protobufs_dot_transaction__pb2.DeleteUserTransactionsResponse.FromString,
+            options, channel_credentials,
+            insecure, call_credentials, compression, wait_for_ready, timeout, metadata)
+
+    @staticmethod
+    def GetDataVersion(request,
+            target,
+            options=(),
+            channel_credentials=None,
+            call_credentials=None,
+            insecure=False,
+            compression=None,
+            wait_for_ready=None,
+            timeout=None,
+            metadata=None):
+        return grpc.experimental.unary_unary(request, target, '/transaction.TransactionService/GetDataVersion',
+            protobufs_dot_transaction__pb2.DataVersionRequest.SerializeToString,
+            protobufs_dot_transaction__pb2.DataVersionResponse.FromString,
+            options, channel_credentials,
+            insecure, call_credentials, compression, wait_for_ready, timeout, metadata)
+
+    @staticmethod
+    def GetChanges(request,
+            target,
+            options=(),
+            channel_credentials=None,
+            call_credentials=None,
+            insecure=False,
+            compression=None,
+            wait_for_ready=None,
+            timeout=None,
+            metadata=None):
+        return grpc.experimental.unary_unary(request, target, '/transaction.TransactionService/GetChanges',
+            protobufs_dot_transaction__pb2.GetChangesRequest.SerializeToString,
+            protobufs_dot_transaction__pb2.ChangesResponse.FromString,
+            options, channel_credentials,
+            insecure, call_credentials, compression, wait_for_ready, timeout, metadata)
+
+    @staticmethod
+    def StreamChanges(request,
+            target,
+            options=(),
+            channel_credentials=None,
+            call_credentials=None,
+            insecure=False,
+            compression=None,
+            wait_for_ready=None,
+            timeout=None,
+            metadata=None):
+        return grpc.experimental.unary_stream(request, target, '/transaction.TransactionService/StreamChanges',
+            protobufs_dot_transaction__pb2.StreamChangesRequest.SerializeToString,
+            protobufs_dot_transaction__pb2.ChangeBatch.FromString,
+            options, channel_credentials,
+            insecure, call_credentials, compression, wait_for_ready, timeout, metadata)
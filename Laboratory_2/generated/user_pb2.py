@@ -14,7 +14,7 @@ _sym_db = _symbol_database.Default()
 
 
 
-DESCRIPTOR = _descriptor_pool.Default().AddSerializedFile(b'\n\x14protobufs/user.proto\x12\x04user\"D\n\x0fRegisterRequest\x12\x10\n\x08username\x18\x01 \x01(\t\x12\r\n\x05\x65mail\x18\x02 \x01(\t\x12\x10\n\x08password\x18\x03 \x01(\t\"/\n\x0cLoginRequest\x12\r\n\x05\x65mail\x18\x01 \x01(\t\x12\x10\n\x08password\x18\x02 \x01(\t\"!\n\x0eGetUserRequest\x12\x0f\n\x07user_id\x18\x01 \x01(\t\"T\n\x0cUserResponse\x12\x0f\n\x07user_id\x18\x01 \x01(\t\x12\x10\n\x08username\x18\x02 \x01(\t\x12\r\n\x05\x65mail\x18\x03 \x01(\t\x12\x12\n\ncreated_at\x18\x04 \x01(\t2\xb2\x01\n\x0bUserService\x12\x39\n\x0cRegisterUser\x12\x15.user.RegisterRequest\x1a\x12.user.UserResponse\x12\x33\n\tLoginUser\x12\x12.user.LoginRequest\x1a\x12.user.UserResponse\x12\x33\n\x07GetUser\x12\x14.user.GetUserRequest\x1a\x12.user.UserResponseb\x06proto3')
+DESCRIPTOR = _descriptor_pool.Default().AddSerializedFile(b'\n\x14protobufs/user.proto\x12\x04user\"D\n\x0fRegisterRequest\x12\x10\n\x08username\x18\x01 \x01(\t\x12\r\n\x05\x65mail\x18\x02 \x01(\t\x12\x10\n\x08password\x18\x03 \x01(\t\"/\n\x0cLoginRequest\x12\r\n\x05\x65mail\x18\x01 \x01(\t\x12\x10\n\x08password\x18\x02 \x01(\t\"!\n\x0eGetUserRequest\x12\x0f\n\x07user_id\x18\x01 \x01(\t\"T\n\x0cUserResponse\x12\x0f\n\x07user_id\x18\x01 \x01(\t\x12\x10\n\x08username\x18\x02 \x01(\t\x12\r\n\x05\x65mail\x18\x03 \x01(\t\x12\x12\n\ncreated_at\x18\x04 \x01(\t\"#\n\x11WatchUsersRequest\x12\x0e\n\x06\x63ursor\x18\x01 \x01(\t\">\n\x0bUserChanges\x12\x10\n\x08user_ids\x18\x01 \x03(\t\x12\x0e\n\x06\x63ursor\x18\x02 \x01(\t\x12\r\n\x05reset\x18\x03 \x01(\x08\x32\xee\x01\n\x0bUserService\x12\x39\n\x0cRegisterUser\x12\x15.user.RegisterRequest\x1a\x12.user.UserResponse\x12\x33\n\tLoginUser\x12\x12.user.LoginRequest\x1a\x12.user.UserResponse\x12\x33\n\x07GetUser\x12\x14.user.GetUserRequest\x1a\x12.user.UserResponse\x12:\n\nWatchUsers\x12\x17.user.WatchUsersRequest\x1a\x11.user.UserChanges0\x01\x62\x06proto3')
 
 _globals = globals()
 _builder.BuildMessageAndEnumDescriptors(DESCRIPTOR, _globals)
@@ -29,6 +29,10 @@ if _descriptor._USE_C_DESCRIPTORS == False:
   _globals['_GETUSERREQUEST']._serialized_end=182
   _globals['_USERRESPONSE']._serialized_start=184
   _globals['_USERRESPONSE']._serialized_end=268
-  _globals['_USERSERVICE']._serialized_start=271
-  _globals['_USERSERVICE']._serialized_end=449
+  _globals['_WATCHUSERSREQUEST']._serialized_start=270
+  _globals['_WATCHUSERSREQUEST']._serialized_end=305
+  _globals['_USERCHANGES']._serialized_start=307
+  _globals['_USERCHANGES']._serialized_end=369
+  _globals['_USERSERVICE']._serialized_start=372
+  _globals['_USERSERVICE']._serialized_end=610
 # @@protoc_insertion_point(module_scope)
@@ -29,6 +29,11 @@ class UserServiceStub(object):
                 request_serializer=protobufs_dot_user__pb2.GetUserRequest.SerializeToString,
                 response_deserializer=protobufs_dot_user__pb2.UserResponse.FromString,
                 )
+        self.WatchUsers = channel.unary_stream(
+                '/user.UserService/WatchUsers',
+                request_serializer=protobufs_dot_user__pb2.WatchUsersRequest.SerializeToString,
+                response_deserializer=protobufs_dot_user__pb2.UserChanges.FromString,
+                )
 
 
 class UserServiceServicer(object):
@@ -52,6 +57,13 @@ class UserServiceServicer(object):
         context.set_details('Method not implemented!')
         raise NotImplementedError('Method not implemented!')
 
+    def WatchUsers(self, request, context):
+        """Id пользователей, чьи данные изменились после курсора; поток открыт, пока клиент подключён
+        """
+        context.set_code(grpc.StatusCode.UNIMPLEMENTED)
+        context.set_details('Method not implemented!')
+        raise NotImplementedError('Method not implemented!')
+
 
 def add_UserServiceServicer_to_server(servicer, server):
     rpc_method_handlers = {
@@ -70,6 +82,11 @@ def add_UserServiceServicer_to_server(servicer, server):
                     request_deserializer=protobufs_dot_user__pb2.GetUserRequest.FromString,
                     response_serializer=protobufs_dot_user__pb2.UserResponse.SerializeToString,
             ),
+            'WatchUsers': grpc.unary_stream_rpc_method_handler(
+                    servicer.WatchUsers,
+                    request_deserializer=protobufs_dot_user__pb2.WatchUsersRequest.FromString,
+                    response_serializer=protobufs_dot_user__pb2.UserChanges.SerializeToString,
+            ),
     }
     generic_handler = grpc.method_handlers_generic_handler(
             'user.UserService', rpc_method_handlers)
@@ -130,3 +147,20 @@ class UserService(object):
             protobufs_dot_user__pb2.UserResponse.FromString,
             options, channel_credentials,
             insecure, call_credentials, compression, wait_for_ready, timeout, metadata)
+
+    @staticmethod
+    def WatchUsers(request,
+            target,
+            options=(),
+            channel_credentials=None,
+            call_credentials=None,
+            insecure=False,
+            compression=None,
+            wait_for_ready=None,
+            timeout=None,
+            metadata=None):
+        return grpc.experimental.unary_stream(request, target, '/user.UserService/WatchUsers',
+            protobufs_dot_user__pb2.WatchUsersRequest.SerializeToString,
+            protobufs_dot_user__pb2.UserChanges.FromString,
+            options, channel_credentials,
+            insecure, call_credentials, compression, wait_for_ready, timeout, metadata)
@@ -7,67 +7,91 @@ import time
 import json
 import io
 import csv
-from generated import user_pb2, user_pb2_grpc, transaction_pb2, transaction_pb2_grpc, report_pb2, report_pb2_grpc
+from generated import user_pb2, transaction_pb2, report_pb2
+from common import config
+from common.clients import UserClient, TransactionClient, ReportClient
+from common.serialization import GRAPHQL_TRANSACTION, report_to_graphql
+from .event_bus import EventBus
+from .export_jobs import ArtifactStore, ExportJobManager, DONE, FAILED
+from .user_cache import UserCache
 from collections import defaultdict
 import asyncio
 
-# Настройка gRPC соединений
-user_channel = grpc.insecure_channel('localhost:50051')
-transaction_channel = grpc.insecure_channel('localhost:50052')
-report_channel = grpc.insecure_channel('localhost:50053')
-
-user_stub = user_pb2_grpc.UserServiceStub(user_channel)
-transaction_stub = transaction_pb2_grpc.TransactionServiceStub(transaction_channel)
-report_stub = report_pb2_grpc.ReportServiceStub(report_channel)
+# Настройка gRPC клиентов (дедлайны, повторы и circuit breaker - в common.resilience)
+user_client = UserClient("graphql_api")
+# Профили почти не меняются: GetUser идёт в UserService только при промахе
+user_cache = UserCache(user_client)
+# TransactionService шардирован по user_id
+transaction_client = TransactionClient("graphql_api")
+report_client = ReportClient("graphql_api")
 
 # Инициализация типов Ariadne
 query = QueryType()
 mutation = MutationType()
 subscription = SubscriptionType()
 
-# Хранилище для подписок
+# Хранилище для подписок (очереди подписчиков этого процесса)
 transaction_subscribers = defaultdict(list)
 
+# События между воркерами шлюза: транзакция, добавленная в одном воркере,
+# доходит до подписчиков во всех остальных
+event_bus = EventBus(config.GATEWAY_EVENT_BUS)
+
+@event_bus.subscribe
+async def deliver_transaction_added(topic, transaction):
+    if topic != "transactionAdded":
+        return
+    for queue in transaction_subscribers.get(transaction["userId"], []):
+        await queue.put(transaction)
+
+# Фоновые выгрузки: файл собирается в пуле потоков и ждёт скачивания на диске
+export_jobs = ExportJobManager(
+    report_client,
+    ArtifactStore(config.EXPORT_DIR, config.EXPORT_TTL_SECONDS),
+    event_bus,
+    max_workers=config.EXPORT_WORKERS,
+    max_pending=config.EXPORT_MAX_PENDING
+)
+export_job_subscribers = defaultdict(list)
+
+@event_bus.subscribe
+async def deliver_export_job_updated(topic, job):
+    if topic != "exportJobUpdated":
+        return
+    for queue in export_job_subscribers.get(job["id"], []):
+        await queue.put(job)
+
+def _export_job_to_graphql(job):
+    return {
+        **job,
+        "downloadUrl": f"/exports/{job['id']}" if job["status"] == DONE else None
+    }
+
 @query.field("generateMonthlyReport")
-def resolve_generate_monthly_report(_, info, userId, month):
+async def resolve_generate_monthly_report(_, info, userId, month):
     try:
-        response = report_stub.GenerateMonthlyReport(
+        response = await asyncio.to_thread(
+            report_client.generate_monthly_report,
             report_pb2.MonthlyReportRequest(
                 user_id=userId,
                 month=month
             )
         )
         
-        return {
-            "userId": response.user_id,
-            "month": response.month,
-            "totalIncome": response.total_income,
-            "totalExpenses": response.total_expenses,
-            "balance": response.balance,
-            "transactions": [
-                {
-                    "id": t.transaction_id,
-                    "userId": t.user_id,
-                    "amount": t.amount,
-                    "category": t.category,
-                    "type": t.type,
-                    "date": t.date,
-                    "description": t.description
-                }
-                for t in response.transactions
-            ]
-        }
+        return report_to_graphql(response)
     except grpc.RpcError as e:
         raise GraphQLError(f"Ошибка генерации отчета: {e.details()}")
 
 @mutation.field("exportReport")
-def resolve_export_report(_, info, userId, month, format):
+async def resolve_export_report(_, info, userId, month, format, pretty=False):
     try:
-        response = report_stub.ExportReport(
+        response = await asyncio.to_thread(
+            report_client.export_report,
             report_pb2.ExportReportRequest(
                 user_id=userId,
                 month=month,
-                format=format.lower()
+                format=format.lower(),
+                pretty=bool(pretty)
             )
         )
         
@@ -78,6 +102,43 @@ def resolve_export_report(_, info, userId, month, format):
     except grpc.RpcError as e:
         raise GraphQLError(f"Ошибка экспорта отчета: {e.details()}")
 
+@mutation.field("requestExport")
+async def resolve_request_export(_, info, userId, month, format, pretty=False):
+    try:
+        job = export_jobs.submit(userId, month, format.lower(), bool(pretty))
+    except RuntimeError as e:
+        raise GraphQLError(str(e))
+    return _export_job_to_graphql(job)
+
+@query.field("exportJob")
+def resolve_export_job(_, info, id):
+    job = export_jobs.get(id)
+    return _export_job_to_graphql(job) if job else None
+
+@subscription.source("exportJobUpdated")
+async def source_export_job_updated(_, info, jobId):
+    queue = asyncio.Queue()
+    export_job_subscribers[jobId].append(queue)
+    try:
+        # Задача могла завершиться до подписки
+        job = export_jobs.get(jobId)
+        if job is None:
+            raise GraphQLError("Export job not found")
+        if job["status"] in (DONE, FAILED):
+            yield job
+            return
+        while True:
+            job = await queue.get()
+            yield job
+            if job["status"] in (DONE, FAILED):
+                return
+    finally:
+        export_job_subscribers[jobId].remove(queue)
+
+@subscription.field("exportJobUpdated")
+def resolve_export_job_updated(job, info, jobId):
+    return _export_job_to_graphql(job)
+
 @subscription.source("transactionAdded")
 async def source_transaction_added(_, info, userId):
     # Создаем очередь для данного пользователя
@@ -102,9 +163,11 @@ def resolve_transaction_added(transaction, info, userId):
 
 # Реализация резолверов
 @query.field("getUser")
-def resolve_get_user(_, info, id):
+async def resolve_get_user(_, info, id):
     try:
-        response = user_stub.GetUser(user_pb2.GetUserRequest(user_id=id))
+        response = await asyncio.to_thread(user_cache.get, id)
+        if response is None:
+            raise GraphQLError("Ошибка сервиса пользователей: User not found")
         return {
             "id": response.user_id,
             "username": response.username,
@@ -114,41 +177,59 @@ def resolve_get_user(_, info, id):
     except grpc.RpcError as e:
         raise GraphQLError(f"Ошибка сервиса пользователей: {e.details()}")
 
+def _get_transactions(userId, startDate=None, endDate=None, filter=None, sort=None, limit=None, cursor=None):
+    # Фильтрация, сортировка и пагинация выполняются в TransactionService
+    filter = filter or {}
+    sort = sort or {}
+    request = transaction_pb2.GetTransactionsRequest(
+        user_id=userId,
+        start_date=startDate or "",
+        end_date=endDate or "",
+        category=filter.get("category") or "",
+        type=filter.get("type") or "",
+        sort_by=(sort.get("field") or "DATE").lower(),
+        descending=bool(sort.get("descending")),
+        limit=limit or 0,
+        cursor=cursor or ""
+    )
+    if filter.get("minAmount") is not None:
+        request.min_amount = filter["minAmount"]
+    if filter.get("maxAmount") is not None:
+        request.max_amount = filter["maxAmount"]
+    return transaction_client.get_transactions(request)
+
 @query.field("getTransactions")
-def resolve_get_transactions(_, info, userId, startDate=None, endDate=None):
+async def resolve_get_transactions(_, info, userId, **kwargs):
     try:
-        response = transaction_stub.GetTransactions(
-            transaction_pb2.GetTransactionsRequest(
-                user_id=userId,
-                start_date=startDate or "",
-                end_date=endDate or ""
-            )
-        )
-        return [
-            {
-                "id": t.transaction_id,
-                "userId": t.user_id,
-                "amount": t.amount,
-                "category": t.category,
-                "type": t.type,
-                "date": t.date,
-                "description": t.description
-            }
-            for t in response.transactions
-        ]
+        response = await asyncio.to_thread(_get_transactions, userId, **kwargs)
+        return GRAPHQL_TRANSACTION.many(response.transactions)
+    except grpc.RpcError as e:
+        raise GraphQLError(f"Ошибка сервиса транзакций: {e.details()}")
+
+@query.field("getTransactionsPage")
+async def resolve_get_transactions_page(_, info, userId, **kwargs):
+    try:
+        response = await asyncio.to_thread(_get_transactions, userId, **kwargs)
+        return {
+            "transactions": GRAPHQL_TRANSACTION.many(response.transactions),
+            "nextCursor": response.next_cursor or None
+        }
     except grpc.RpcError as e:
         raise GraphQLError(f"Ошибка сервиса транзакций: {e.details()}")
 
 @mutation.field("registerUser")
-def resolve_register_user(_, info, username, email, password):
+async def resolve_register_user(_, info, username, email, password):
     try:
-        response = user_stub.RegisterUser(
+        response = await asyncio.to_thread(
+            user_client.register_user,
             user_pb2.RegisterRequest(
                 username=username,
                 email=email,
                 password=password
             )
         )
+        # Id мог быть закеширован как неизвестный; остальные воркеры узнают из WatchUsers
+        user_cache.invalidate([response.user_id])
         return {
             "id": response.user_id,
             "username": response.username,
@@ -160,33 +241,27 @@ def resolve_register_user(_, info, username, email, password):
 
 # Модифицируем мутацию addTransaction для поддержки подписок
 @mutation.field("addTransaction")
-async def resolve_add_transaction(_, info, userId, amount, category, type, description=None):
+async def resolve_add_transaction(_, info, userId, amount, category, type, description=None, idempotencyKey=None):
     try:
-        # Создаем запрос к gRPC сервису транзакций
-        response = transaction_stub.AddTransaction(
+        # Создаем запрос к gRPC сервису транзакций; вызов с повторами и паузами
+        # между ними идёт в потоке, чтобы не останавливать цикл событий
+        response = await asyncio.to_thread(
+            transaction_client.add_transaction,
             transaction_pb2.AddTransactionRequest(
                 user_id=userId,
                 amount=float(amount),
                 category=category,
                 type=type,
-                description=description or ""
+                description=description or "",
+                idempotency_key=idempotencyKey or ""
             )
         )
         
         # Преобразуем ответ gRPC в формат GraphQL
-        transaction_data = {
-            "id": response.transaction.transaction_id,
-            "userId": response.transaction.user_id,
-            "amount": float(response.transaction.amount),
-            "category": response.transaction.category,
-            "type": response.transaction.type,
-            "date": response.transaction.date,
-            "description": response.transaction.description
-        }
+        transaction_data = GRAPHQL_TRANSACTION(response.transaction)
         
-        # Уведомляем подписчиков
-        for queue in transaction_subscribers.get(userId, []):
-            await queue.put(transaction_data)
+        # Уведомляем подписчиков во всех воркерах
+        await event_bus.publish("transactionAdded", transaction_data)
         
         return transaction_data
         
@@ -0,0 +1,94 @@
+import json
+import hashlib
+
+import grpc
+from graphql import FieldNode, OperationType, get_operation_ast
+from graphql.utilities import value_from_ast_untyped
+
+from generated import transaction_pb2
+
+
+def _month_key(args):
+    return args.get('userId'), args.get('month')
+
+
+def _range_key(args):
+    # Период внутри одного месяца зависит только от версии этого месяца,
+    # любой другой - от версии всех данных пользователя
+    start, end = args.get('startDate') or '', args.get('endDate') or ''
+    return args.get('userId'), start[:7] if start and end and start[:7] == end[:7] else ''
+
+
+# Поля запроса, результат которых определяется версией (user_id, месяц) в TransactionService
+VERSIONED_FIELDS = {
+    'generateMonthlyReport': _month_key,
+    'getTransactions': _range_key,
+    'getTransactionsPage': _range_key,
+}
+
+
+def etag_matches(if_none_match, etag):
+    """Слабое сравнение из RFC 9110: W/ не учитывается."""
+    if not if_none_match:
+        return False
+    if if_none_match.strip() == '*':
+        return True
+    weak = etag.removeprefix('W/')
+    return any(tag.strip().removeprefix('W/') == weak for tag in if_none_match.split(','))
+
+
+class QueryVersions:
+    """ETag запроса из версий данных, от которых зависит его результат.
+
+    Тег считается только для query, все корневые поля которой есть в
+    VERSIONED_FIELDS, без фрагментов и директив на верхнем уровне. В тег
+    входят хеш запроса, операция, переменные и версии всех затронутых
+    (user_id, месяц), поэтому ответ на тот же запрос меняет тег, как только
+    меняются данные. Версии читаются до выполнения запроса: если запись
+    придёт между ними, тег окажется старше ответа, и следующий запрос
+    просто получит ответ целиком.
+    """
+
+    def __init__(self, transaction_client):
+        self.transaction_client = transaction_client
+
+    @staticmethod
+    def keys(document, operation_name, variables):
+        """Список (user_id, месяц) для запроса или None, если тег не считается."""
+        operation = get_operation_ast(document, operation_name)
+        if operation is None or operation.operation != OperationType.QUERY:
+            return None
+        values = {definition.variable.name.value: value_from_ast_untyped(definition.default_value)
+                  for definition in operation.variable_definitions or () if definition.default_value}
+        values.update(variables or {})
+
+        keys = []
+        for selection in operation.selection_set.selections:
+            if not isinstance(selection, FieldNode) or selection.directives:
+                return None
+            key = VERSIONED_FIELDS.get(selection.name.value)
+            if key is None:
+                return None
+            user_id, month = key({argument.name.value: value_from_ast_untyped(argument.value, values)
+                                  for argument in selection.arguments})
+            if not isinstance(user_id, str) or not isinstance(month, str):
+                return None
+            keys.append((user_id, month))
+        return list(dict.fromkeys(keys))
+
+    def etag(self, query_hash, document, data):
+        keys = self.keys(document, data.get('operationName'), data.get('variables'))
+        if not keys:
+            return None
+        try:
+            versions = [self.transaction_client.get_data_version(
+                transaction_pb2.DataVersionRequest(user_id=user_id, month=month)).version
+                for user_id, month in keys]
+        except grpc.RpcError:
+            # Без версии запрос выполняется как обычно, ошибку покажет резолвер
+            return None
+        digest = hashlib.sha256(json.dumps(
+            [query_hash, data.get('operationName'), data.get('variables'), versions],
+            sort_keys=True, default=str).encode('utf-8')).hexdigest()
+        # Слабый тег: GZipMiddleware меняет байты ответа, но не его смысл
+        return f'W/"{digest[:32]}"'
@@ -0,0 +1,98 @@
+import os
+import json
+import asyncio
+import logging
+
+logger = logging.getLogger(__name__)
+
+# Строки событий - JSON до нескольких килобайт, но запас не помешает
+_LINE_LIMIT = 1024 * 1024
+
+
+class EventBroker:
+    """Локальный pub/sub для воркеров шлюза: пересылает каждое событие всем подключённым.
+
+    Работает в отдельном процессе рядом с воркерами uvicorn, поверх unix-сокета.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self.clients = set()
+
+    async def serve_forever(self):
+        if os.path.exists(self.path):
+            os.unlink(self.path)
+        server = await asyncio.start_unix_server(self._handle, self.path, limit=_LINE_LIMIT)
+        async with server:
+            await server.serve_forever()
+
+    async def _handle(self, reader, writer):
+        self.clients.add(writer)
+        try:
+            while line := await reader.readline():
+                for client in list(self.clients):
+                    try:
+                        client.write(line)
+                        await client.drain()
+                    except ConnectionError:
+                        self.clients.discard(client)
+        finally:
+            self.clients.discard(writer)
+            writer.close()
+
+
+def run_broker(path):
+    asyncio.run(EventBroker(path).serve_forever())
+
+
+class EventBus:
+    """Публикация событий между воркерами шлюза.
+
+    Без адреса брокера (один процесс) события доставляются локально. С брокером
+    событие доходит до всех воркеров, включая отправителя, поэтому локальная
+    доставка не дублируется.
+    """
+
+    def __init__(self, path=None):
+        self.path = path
+        self.handlers = []
+        self._writer = None
+        self._listener = None
+
+    def subscribe(self, handler):
+        self.handlers.append(handler)
+        return handler
+
+    async def start(self):
+        if not self.path:
+            return
+        reader, self._writer = await asyncio.open_unix_connection(self.path, limit=_LINE_LIMIT)
+        self._listener = asyncio.create_task(self._listen(reader))
+
+    async def stop(self):
+        if self._listener:
+            self._listener.cancel()
+        if self._writer:
+            self._writer.close()
+            self._writer = None
+
+    async def publish(self, topic, payload):
+        if self._writer is None:
+            await self._dispatch(topic, payload)
+            return
+        message = json.dumps({"topic": topic, "payload": payload}, ensure_ascii=False)
+        self._writer.write(message.encode('utf-8') + b"\n")
+        await self._writer.drain()
+
+    async def _listen(self, reader):
+        while line := await reader.readline():
+            message = json.loads(line)
+            await self._dispatch(message["topic"], message["payload"])
+        logger.error("Event broker connection closed, cross-worker events are no longer delivered")
+
+    async def _dispatch(self, topic, payload):
+        for handler in self.handlers:
+            try:
+                await handler(topic, payload)
+            except Exception:
+                logger.exception("Event handler failed for %s", topic)
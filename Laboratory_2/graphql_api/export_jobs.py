@@ -0,0 +1,136 @@
+import os
+import json
+import time
+import uuid
+import asyncio
+import logging
+import threading
+from concurrent import futures
+
+import grpc
+
+from common.files import write_atomic
+from generated import report_pb2
+
+logger = logging.getLogger(__name__)
+
+PENDING, RUNNING, DONE, FAILED = "PENDING", "RUNNING", "DONE", "FAILED"
+
+
+class ArtifactStore:
+    """Готовые выгрузки на локальном диске с удалением по TTL.
+
+    Рядом с файлом лежит <job_id>.json с состоянием задачи, поэтому статус и
+    файл доступны любому воркеру шлюза на этом хосте.
+    """
+
+    def __init__(self, root, ttl_seconds):
+        self.root = root
+        self.ttl_seconds = ttl_seconds
+        os.makedirs(root, exist_ok=True)
+
+    def _path(self, job_id, suffix):
+        # job_id приходит от клиента, поэтому принимаем только uuid
+        return os.path.join(self.root, f"{uuid.UUID(job_id).hex}{suffix}")
+
+    def save_job(self, job):
+        write_atomic(self._path(job["id"], ".json"), json.dumps(job).encode('utf-8'))
+
+    def load_job(self, job_id):
+        try:
+            with open(self._path(job_id, ".json"), 'rb') as f:
+                return json.load(f)
+        except (ValueError, FileNotFoundError):
+            return None
+
+    def save_file(self, job_id, content):
+        write_atomic(self._path(job_id, ".data"), content)
+
+    def file_path(self, job_id):
+        try:
+            path = self._path(job_id, ".data")
+        except ValueError:
+            return None
+        return path if os.path.exists(path) else None
+
+    def cleanup(self):
+        expires_before = time.time() - self.ttl_seconds
+        removed = 0
+        for name in os.listdir(self.root):
+            path = os.path.join(self.root, name)
+            try:
+                if os.path.getmtime(path) < expires_before:
+                    os.unlink(path)
+                    removed += 1
+            except FileNotFoundError:
+                pass
+        return removed
+
+
+class ExportJobManager:
+    """Очередь фоновых выгрузок с ограниченным пулом потоков.
+
+    HTTP-запрос получает id задачи сразу; клиент опрашивает exportJob или
+    подписывается на exportJobUpdated и скачивает файл с /exports/{id}.
+    """
+
+    def __init__(self, report_client, store, event_bus, max_workers=2, max_pending=100):
+        self.report_client = report_client
+        self.store = store
+        self.event_bus = event_bus
+        self.max_pending = max_pending
+        self.executor = futures.ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix='export')
+        self._pending = 0
+        self._lock = threading.Lock()
+
+    def submit(self, user_id, month, format, pretty=False):
+        with self._lock:
+            if self._pending >= self.max_pending:
+                raise RuntimeError("Too many export jobs in progress, try again later")
+            self._pending += 1
+
+        job = {
+            "id": str(uuid.uuid4()),
+            "userId": user_id,
+            "month": month,
+            "format": format,
+            "status": PENDING,
+            "fileName": None,
+            "error": None,
+            "createdAt": time.strftime("%Y-%m-%d %H:%M:%S", time.gmtime()),
+        }
+        self.store.save_job(job)
+        snapshot = dict(job)
+        loop = asyncio.get_running_loop()
+        self.executor.submit(self._run, job, pretty, loop)
+        return snapshot
+
+    def get(self, job_id):
+        return self.store.load_job(job_id)
+
+    def _update(self, job, loop, **changes):
+        job.update(changes)
+        self.store.save_job(job)
+        asyncio.run_coroutine_threadsafe(self.event_bus.publish("exportJobUpdated", dict(job)), loop)
+
+    def _run(self, job, pretty, loop):
+        try:
+            self._update(job, loop, status=RUNNING)
+            response = self.report_client.export_report(
+                report_pb2.ExportReportRequest(
+                    user_id=job["userId"],
+                    month=job["month"],
+                    format=job["format"],
+                    pretty=pretty
+                )
+            )
+            self.store.save_file(job["id"], response.file_content)
+            self._update(job, loop, status=DONE, fileName=response.file_name)
+        except grpc.RpcError as e:
+            self._update(job, loop, status=FAILED, error=e.details())
+        except Exception as e:
+            logger.exception("Export job %s failed", job["id"])
+            self._update(job, loop, status=FAILED, error=str(e))
+        finally:
+            with self._lock:
+                self._pending -= 1
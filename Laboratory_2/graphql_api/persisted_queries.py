@@ -0,0 +1,190 @@
+import json
+import os
+import asyncio
+import hashlib
+import threading
+from collections import OrderedDict
+
+from ariadne.asgi.handlers import GraphQLHTTPHandler
+from ariadne.exceptions import HttpBadRequestError
+from graphql import GraphQLError, parse, specified_rules, validate
+from starlette.responses import Response
+
+from common import config
+from common.serialization import dumps
+
+from .etags import etag_matches
+
+
+class PersistedQuery:
+    def __init__(self, query, document):
+        self.query = query
+        self.document = document
+        self.validated = False
+        # validate() получает от Ariadne только AST, по нему находит запись
+        document.persisted_query = self
+
+
+class PersistedQueryRegistry:
+    """Реестр sha256 -> запрос с заранее разобранным и проверенным AST.
+
+    Клиент присылает только хеш (extensions.persistedQuery.sha256Hash, как в
+    Apollo APQ), и сервер не разбирает и не валидирует текст запроса повторно.
+    Запросы из файла (load) хранятся всегда, зарегистрированные клиентами -
+    не больше max_registered, вытесняются давно не использованные: иначе
+    клиент мог бы бесконечно растить память шлюза уникальными запросами.
+    """
+
+    def __init__(self, schema, validation_rules=(), allow_registration=True, max_registered=None):
+        self.schema = schema
+        self.rules = specified_rules + tuple(validation_rules)
+        self.allow_registration = allow_registration
+        self.max_registered = config.GRAPHQL_APQ_MAX_QUERIES if max_registered is None else max_registered
+        self._queries = {}  # из файла
+        self._registered = OrderedDict()  # от клиентов, LRU
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def query_hash(query):
+        return hashlib.sha256(query.encode('utf-8')).hexdigest()
+
+    def load(self, path):
+        # Файл - JSON-список текстов запросов, хеши считаются при загрузке
+        if not os.path.exists(path):
+            return
+        with open(path, 'r', encoding='utf-8') as f:
+            for query in json.load(f):
+                self.register(query, pinned=True)
+
+    def register(self, query, expected_hash=None, pinned=False):
+        query_hash = self.query_hash(query)
+        if expected_hash and expected_hash != query_hash:
+            raise GraphQLError("provided sha does not match query",
+                               extensions={"code": "PERSISTED_QUERY_HASH_MISMATCH"})
+
+        document = parse(query)
+        errors = validate(self.schema, document, self.rules)
+        if errors:
+            # Сохраняем только корректные запросы, укладывающиеся в бюджет стоимости
+            raise errors[0]
+
+        entry = PersistedQuery(query, document)
+        entry.validated = True
+        with self._lock:
+            if query_hash in self._queries:
+                return self._queries[query_hash]
+            if pinned:
+                self._registered.pop(query_hash, None)
+                self._queries[query_hash] = entry
+                return entry
+            entry = self._registered.setdefault(query_hash, entry)
+            self._registered.move_to_end(query_hash)
+            while len(self._registered) > self.max_registered:
+                self._registered.popitem(last=False)
+        return entry
+
+    def lookup(self, query_hash, query=None):
+        entry = self._queries.get(query_hash)
+        if entry is not None:
+            return entry
+        with self._lock:
+            entry = self._registered.get(query_hash)
+            if entry is not None:
+                self._registered.move_to_end(query_hash)
+                return entry
+        if query and self.allow_registration:
+            return self.register(query, query_hash)
+        raise GraphQLError("PersistedQueryNotFound", extensions={"code": "PERSISTED_QUERY_NOT_FOUND"})
+
+    def validate(self, schema, document, rules=None, max_errors=None, type_info=None):
+        # query_validator для Ariadne: AST из реестра уже проверен при регистрации
+        entry = getattr(document, 'persisted_query', None)
+        if entry is not None and entry.validated:
+            return []
+        return validate(schema, document, rules=rules, max_errors=max_errors, type_info=type_info)
+
+
+class PersistedQueryHTTPHandler(GraphQLHTTPHandler):
+    """HTTP-обработчик, понимающий persisted queries в POST и GET запросах.
+
+    Если задан versions (etags.QueryVersions), GET-запросы получают ETag, а
+    запрос с совпавшим If-None-Match получает 304 без обращения к сервисам.
+    """
+
+    def __init__(self, registry, versions=None, **kwargs):
+        super().__init__(**kwargs)
+        self.registry = registry
+        self.versions = versions
+
+    @staticmethod
+    def _persisted_query(data):
+        if not isinstance(data, dict):
+            return None
+        return (data.get("extensions") or {}).get("persistedQuery")
+
+    async def handle_request_override(self, request):
+        if request.method == "GET" and request.query_params.get("extensions"):
+            etag = await self.etag(request) if self.versions is not None else None
+            if etag is not None and etag_matches(request.headers.get("if-none-match"), etag):
+                return Response(status_code=304, headers=self._cache_headers(etag))
+            request.state.etag = etag
+            return await self.graphql_http_server(request)
+        return None
+
+    async def etag(self, request):
+        # Некорректный запрос получит свою ошибку при обычном выполнении
+        try:
+            data = self.extract_data_from_persisted_get_request(request)
+            persisted = self._persisted_query(data) or {}
+            entry = self.registry.lookup(persisted.get("sha256Hash"), data.get("query"))
+        except (HttpBadRequestError, GraphQLError):
+            return None
+        return await asyncio.to_thread(self.versions.etag, persisted["sha256Hash"], entry.document, data)
+
+    @staticmethod
+    def _cache_headers(etag):
+        # Кеш клиента хранит ответ, но перепроверяет его при каждом запросе
+        return {"ETag": etag, "Cache-Control": "private, no-cache"}
+
+    async def extract_data_from_request(self, request):
+        if request.method == "GET" and request.query_params.get("extensions"):
+            return self.extract_data_from_persisted_get_request(request)
+        return await super().extract_data_from_request(request)
+
+    def extract_data_from_persisted_get_request(self, request):
+        # GET /graphql/?extensions={"persistedQuery":{...}}&variables={...}
+        try:
+            extensions = json.loads(request.query_params["extensions"])
+            variables = json.loads(request.query_params.get("variables") or "null")
+        except (TypeError, ValueError) as ex:
+            raise HttpBadRequestError("extensions and variables must be valid JSON") from ex
+
+        return {
+            "query": request.query_params.get("query") or None,
+            "operationName": request.query_params.get("operationName") or None,
+            "variables": variables,
+            "extensions": extensions,
+        }
+
+    async def create_json_response(self, request, result, success):
+        # Тот же кодировщик, что и у выгрузок отчётов (orjson, если установлен)
+        response = Response(dumps(result), status_code=200 if success else 400, media_type="application/json")
+        # Ответ с ошибками не кешируется: повтор может пройти успешно
+        etag = getattr(request.state, "etag", None)
+        if etag is not None and success and not result.get("errors"):
+            response.headers.update(self._cache_headers(etag))
+        return response
+
+    async def execute_graphql_query(self, request, data, *, context_value=None, query_document=None):
+        persisted = self._persisted_query(data)
+        if persisted and query_document is None:
+            try:
+                entry = self.registry.lookup(persisted.get("sha256Hash"), data.get("query"))
+            except GraphQLError as error:
+                return False, {"errors": [error.formatted]}
+            data = {**data, "query": entry.query}
+            query_document = entry.document
+
+        return await super().execute_graphql_query(
+            request, data, context_value=context_value, query_document=query_document
+        )
@@ -0,0 +1,60 @@
+from graphql import GraphQLError
+from graphql.language import FieldNode, FragmentSpreadNode, InlineFragmentNode
+from graphql.validation import ValidationRule
+
+from common import config
+
+# Стоимость поля = число gRPC-вызовов к бэкендам, которое оно порождает.
+# Вложенные поля бесплатны: они берутся из уже полученного ответа.
+COST_MAP = {
+    "Query": {
+        "getUser": 1,
+        "getTransactions": 1,
+        "getTransactionsPage": 1,
+        "generateMonthlyReport": 2,
+    },
+    "Mutation": {
+        "registerUser": 1,
+        "loginUser": 1,
+        "addTransaction": 1,
+        "exportReport": 2,
+        "requestExport": 2,
+    },
+}
+
+
+def query_cost_rule(maximum_cost=None):
+    """Правило валидации, отклоняющее запросы с числом обращений к бэкендам выше бюджета.
+
+    Оценка не зависит от переменных, поэтому её результат можно кешировать
+    вместе с разобранным запросом.
+    """
+    budget = config.GRAPHQL_MAX_COST if maximum_cost is None else maximum_cost
+
+    class QueryCostRule(ValidationRule):
+        def enter_operation_definition(self, node, *_):
+            root_type = self.context.schema.get_root_type(node.operation)
+            cost = self._cost(node.selection_set, root_type.name if root_type else "", set())
+            if cost > budget:
+                self.report_error(GraphQLError(
+                    f"The query exceeds the maximum cost of {budget}. Actual cost is {cost}",
+                    node,
+                    extensions={"cost": {"requestedQueryCost": cost, "maximumAvailable": budget}}
+                ))
+
+        def _cost(self, selection_set, type_name, visited):
+            total = 0
+            for selection in selection_set.selections:
+                if isinstance(selection, FieldNode):
+                    total += COST_MAP.get(type_name, {}).get(selection.name.value, 0)
+                elif isinstance(selection, InlineFragmentNode):
+                    total += self._cost(selection.selection_set, type_name, visited)
+                elif isinstance(selection, FragmentSpreadNode):
+                    name = selection.name.value
+                    fragment = self.context.get_fragment(name)
+                    if fragment and name not in visited:
+                        visited.add(name)
+                        total += self._cost(fragment.selection_set, type_name, visited)
+            return total
+
+    return QueryCostRule
@@ -1,14 +1,29 @@
 from ariadne.asgi import GraphQL
-from ariadne.asgi.handlers import GraphQLTransportWSHandler, GraphQLHTTPHandler
+from ariadne.asgi.handlers import GraphQLTransportWSHandler
 from starlette.applications import Starlette
 from starlette.middleware import Middleware
 from starlette.middleware.cors import CORSMiddleware
 from starlette.middleware.base import BaseHTTPMiddleware
+from starlette.middleware.gzip import GZipMiddleware
 from graphql_api.auth import AuthService
 from fastapi import FastAPI, Request, HTTPException
+from fastapi.responses import JSONResponse, FileResponse
+from common import config
+from common.admission import RateLimiter
 import uvicorn
+import os
+import time
+import asyncio
+import argparse
+import tempfile
+import multiprocessing
 
-from .app import schema
+from .app import schema, event_bus, export_jobs, transaction_client, user_cache
+from .etags import QueryVersions
+from .event_bus import run_broker
+from .export_jobs import DONE
+from .persisted_queries import PersistedQueryRegistry, PersistedQueryHTTPHandler
+from .query_cost import query_cost_rule
 
 class JWTMiddleware(BaseHTTPMiddleware):
     async def dispatch(self, request: Request, call_next):
@@ -23,18 +38,103 @@ class JWTMiddleware(BaseHTTPMiddleware):
         
         return await call_next(request)
 
+class RateLimitMiddleware(BaseHTTPMiddleware):
+    """Token bucket на вызывающего (claim sub из JWT, иначе IP клиента)."""
+
+    def __init__(self, app):
+        super().__init__(app)
+        self.limiter = RateLimiter(config.RATE_LIMIT_USER_RPS, config.RATE_LIMIT_USER_BURST)
+
+    async def dispatch(self, request: Request, call_next):
+        if request.url.path.startswith('/graphql'):
+            auth = request.headers.get('Authorization', '')
+            payload = AuthService.verify_token(auth[len('Bearer '):], "user_service") if auth.startswith('Bearer ') else None
+            key = payload.get('sub') if payload else (request.client.host if request.client else 'anonymous')
+            if not self.limiter.allow(key):
+                return JSONResponse({"detail": "Too many requests"}, status_code=429)
+
+        return await call_next(request)
+
 app = FastAPI()
+app.add_middleware(RateLimitMiddleware)
+# Отчёты и списки транзакций в JSON хорошо сжимаются
+app.add_middleware(GZipMiddleware, minimum_size=1024)
+# Persisted queries: по сети передаётся только хеш, AST разобран и проверен заранее
+validation_rules = [query_cost_rule()]
+persisted_queries = PersistedQueryRegistry(
+    schema,
+    validation_rules=validation_rules,
+    allow_registration=config.GRAPHQL_APQ_REGISTER
+)
+persisted_queries.load(config.GRAPHQL_PERSISTED_QUERIES)
+
 # Настройка GraphQL эндпоинта
 app.mount("/graphql", GraphQL(
     schema,
     debug=True,
-    http_handler=GraphQLHTTPHandler(),
+    query_validator=persisted_queries.validate,
+    validation_rules=validation_rules,
+    # GET persisted queries отвечают 304, пока версия данных в TransactionService не изменилась
+    http_handler=PersistedQueryHTTPHandler(persisted_queries, versions=QueryVersions(transaction_client)),
     websocket_handler=GraphQLTransportWSHandler()
 ))
 
+app.add_event_handler("startup", event_bus.start)
+app.add_event_handler("shutdown", event_bus.stop)
+app.add_event_handler("startup", user_cache.start)
+app.add_event_handler("shutdown", user_cache.stop)
+
+async def cleanup_exports():
+    # Удаляем выгрузки старше EXPORT_TTL_SECONDS
+    while True:
+        await asyncio.to_thread(export_jobs.store.cleanup)
+        await asyncio.sleep(60)
+
+async def start_export_cleanup():
+    asyncio.create_task(cleanup_exports())
+
+app.add_event_handler("startup", start_export_cleanup)
+
+@app.get("/exports/{job_id}")
+async def download_export(job_id: str, request: Request):
+    auth = request.headers.get('Authorization', '')
+    if not auth.startswith('Bearer ') or not AuthService.verify_token(auth.split(' ')[1], "user_service"):
+        raise HTTPException(status_code=401, detail="Unauthorized")
+
+    job = export_jobs.get(job_id)
+    path = export_jobs.store.file_path(job_id) if job else None
+    if not job or job["status"] != DONE or not path:
+        raise HTTPException(status_code=404, detail="Export not found or not ready")
+    # Файл отдаётся потоково, без загрузки в память целиком
+    return FileResponse(path, filename=job["fileName"])
+
 @app.get("/health")
 async def health():
-    return {"status": "ok"}
+    return {"status": "ok", "pid": os.getpid()}
+
+def serve_workers(workers, host, port):
+    # Брокер событий запускается до воркеров; адрес они получают через окружение
+    path = config.GATEWAY_EVENT_BUS or os.path.join(tempfile.gettempdir(), f"finance_gateway_{os.getpid()}.sock")
+    broker = multiprocessing.Process(target=run_broker, args=(path,), daemon=True)
+    broker.start()
+    for _ in range(50):
+        if os.path.exists(path):
+            break
+        time.sleep(0.1)
+    os.environ['GATEWAY_EVENT_BUS'] = path
+    try:
+        uvicorn.run("graphql_api.server:app", host=host, port=port, workers=workers)
+    finally:
+        broker.terminate()
 
 if __name__ == "__main__":
-    uvicorn.run(app, host="0.0.0.0", port=8000)
\ No newline at end of file
+    parser = argparse.ArgumentParser(description="GraphQL gateway")
+    parser.add_argument('--host', default="0.0.0.0")
+    parser.add_argument('--port', type=int, default=8000)
+    parser.add_argument('--workers', type=int, default=1)
+    args = parser.parse_args()
+
+    if args.workers > 1:
+        serve_workers(args.workers, args.host, args.port)
+    else:
+        uvicorn.run(app, host=args.host, port=args.port)
\ No newline at end of file
@@ -0,0 +1,96 @@
+import time
+import random
+import threading
+from collections import OrderedDict
+
+import grpc
+
+from generated import user_pb2
+from common import config
+
+
+class UserCache:
+    """Кеш UserResponse по user_id в процессе шлюза (read-through).
+
+    Найденный профиль живёт ttl_seconds, неизвестный id - negative_ttl_seconds:
+    повторные запросы несуществующего id не доходят до UserService. Записей
+    не больше max_size, вытесняются давно не читанные. Фоновый поток держит
+    UserService.WatchUsers и удаляет изменившихся пользователей; пока поток
+    не подключён, записи устаревают только по времени. Ответ, загруженный
+    во время инвалидации, не кешируется: он мог быть прочитан до изменения.
+    """
+
+    def __init__(self, user_client, ttl_seconds=None, negative_ttl_seconds=None, max_size=None):
+        self.user_client = user_client
+        self.ttl_seconds = config.USER_CACHE_TTL_SECONDS if ttl_seconds is None else ttl_seconds
+        self.negative_ttl_seconds = (config.USER_CACHE_NEGATIVE_TTL_SECONDS
+                                     if negative_ttl_seconds is None else negative_ttl_seconds)
+        self.max_size = config.USER_CACHE_MAX_SIZE if max_size is None else max_size
+        self.lock = threading.Lock()
+        self._entries = OrderedDict()  # user_id -> (expires_at, UserResponse или None)
+        self._invalidations = 0
+        self._stop = threading.Event()
+        self.hits = self.misses = 0
+
+    def get(self, user_id):
+        """UserResponse или None, если пользователя нет; ошибки UserService пробрасываются."""
+        with self.lock:
+            entry = self._entries.get(user_id)
+            if entry is not None and entry[0] >= time.monotonic():
+                self._entries.move_to_end(user_id)
+                self.hits += 1
+                return entry[1]
+            self.misses += 1
+            invalidations = self._invalidations
+
+        try:
+            response, ttl = self.user_client.get_user(user_pb2.GetUserRequest(user_id=user_id)), self.ttl_seconds
+        except grpc.RpcError as e:
+            if e.code() != grpc.StatusCode.NOT_FOUND:
+                raise
+            response, ttl = None, self.negative_ttl_seconds
+
+        with self.lock:
+            if invalidations == self._invalidations and ttl > 0:
+                self._entries[user_id] = (time.monotonic() + ttl, response)
+                self._entries.move_to_end(user_id)
+                while len(self._entries) > self.max_size:
+                    self._entries.popitem(last=False)
+        return response
+
+    def invalidate(self, user_ids):
+        with self.lock:
+            self._invalidations += 1
+            for user_id in user_ids:
+                self._entries.pop(user_id, None)
+
+    def clear(self):
+        with self.lock:
+            self._invalidations += 1
+            self._entries.clear()
+
+    def start(self):
+        threading.Thread(target=self._watch, name='user-cache-watch', daemon=True).start()
+
+    def stop(self):
+        self._stop.set()
+
+    def _watch(self):
+        cursor, attempt = '', 0
+        while not self._stop.is_set():
+            try:
+                for changes in self.user_client.watch_users(user_pb2.WatchUsersRequest(cursor=cursor)):
+                    if changes.reset:
+                        # UserService перезапустился: что изменилось за это время, неизвестно
+                        self.clear()
+                    elif changes.user_ids:
+                        self.invalidate(changes.user_ids)
+                    cursor, attempt = changes.cursor, 0
+                    if self._stop.is_set():
+                        return
+            except grpc.RpcError as e:
+                if e.code() == grpc.StatusCode.UNIMPLEMENTED:
+                    # UserService без WatchUsers: остаётся только время жизни записей
+                    return
+            attempt += 1
+            self._stop.wait(random.uniform(0, min(5.0, 0.1 * 2 ** attempt)))
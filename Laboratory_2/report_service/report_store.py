@@ -0,0 +1,95 @@
+import os
+import json
+import hashlib
+import threading
+
+from common.files import write_atomic
+
+
+class ReportFileStore:
+    """Готовые файлы выгрузок на диске, адресуемые по хешу содержимого.
+
+    objects/<sha256> - содержимое файла, refs/<sha1 ключа> - хеш содержимого для
+    ключа (user_id, month, format, pretty, версия данных). Одинаковые выгрузки
+    хранятся один раз. Время изменения объекта обновляется при чтении, и при
+    превышении max_bytes удаляются давно не читанные объекты.
+    """
+
+    def __init__(self, root, max_bytes):
+        self.objects_dir = os.path.join(root, 'objects')
+        self.refs_dir = os.path.join(root, 'refs')
+        self.max_bytes = max_bytes
+        os.makedirs(self.objects_dir, exist_ok=True)
+        os.makedirs(self.refs_dir, exist_ok=True)
+        self._lock = threading.Lock()
+        self._size = sum(entry.stat().st_size for entry in self._objects())
+
+    def _objects(self):
+        # Временные файлы незаконченных записей начинаются с точки
+        return [entry for entry in os.scandir(self.objects_dir)
+                if entry.is_file() and not entry.name.startswith('.')]
+
+    def _ref_path(self, key):
+        name = hashlib.sha1(json.dumps(key).encode('utf-8')).hexdigest()
+        return os.path.join(self.refs_dir, name)
+
+    def get(self, key):
+        """Путь к файлу для ключа или None."""
+        try:
+            with open(self._ref_path(key), 'r') as f:
+                digest = f.read()
+            path = os.path.join(self.objects_dir, digest)
+            os.utime(path)
+        except FileNotFoundError:
+            return None
+        return path
+
+    def put(self, key, chunks):
+        """chunks - bytes или итератор частей файла; хеш считается по мере записи."""
+        if isinstance(chunks, bytes):
+            chunks = [chunks]
+        tmp_path = os.path.join(self.objects_dir, f".{os.getpid()}.{threading.get_ident()}.tmp")
+        hasher = hashlib.sha256()
+        size = 0
+        with open(tmp_path, 'wb') as f:
+            for chunk in chunks:
+                hasher.update(chunk)
+                f.write(chunk)
+                size += len(chunk)
+
+        digest = hasher.hexdigest()
+        path = os.path.join(self.objects_dir, digest)
+        with self._lock:
+            if os.path.exists(path):
+                os.unlink(tmp_path)
+                os.utime(path)
+            else:
+                os.replace(tmp_path, path)
+                self._size += size
+            write_atomic(self._ref_path(key), digest.encode('ascii'))
+            if self._size > self.max_bytes:
+                self._evict(keep=digest)
+        return path
+
+    def _evict(self, keep):
+        # Удаляем до 90% лимита, чтобы не чистить каталог на каждой записи
+        entries = sorted(self._objects(), key=lambda entry: entry.stat().st_mtime)
+        removed = set()
+        for entry in entries:
+            if self._size <= self.max_bytes * 0.9:
+                break
+            if entry.name == keep:
+                continue
+            size = entry.stat().st_size
+            os.unlink(entry.path)
+            self._size -= size
+            removed.add(entry.name)
+
+        if removed:
+            for entry in os.scandir(self.refs_dir):
+                try:
+                    with open(entry.path, 'r') as f:
+                        if f.read() in removed:
+                            os.unlink(entry.path)
+                except FileNotFoundError:
+                    pass
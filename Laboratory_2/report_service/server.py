@@ -1,24 +1,43 @@
 import io
 import csv
-import json
 import time
+import argparse
+import threading
 from concurrent import futures
 from datetime import datetime
 
 import grpc
-from generated import report_pb2, report_pb2_grpc, transaction_pb2, transaction_pb2_grpc
+from generated import report_pb2, report_pb2_grpc, transaction_pb2
 import msgpack
 from graphql_api.auth import AuthService
-from fastapi import FastAPI
+from common import config
+from common import money
+from common import serialization
+from common.admission import AdmissionInterceptor
+from common.channels import add_unix_port
+from common.compression import CompressionInterceptor, message_size_options
+from common.health import add_health, stop_on_signal
+from common.profiling import add_debug_routes, debug_port, serve_http
+from common.clients import TransactionClient
+from common.resilience import DeadlinePropagationInterceptor
+from common.serialization import EXPORT_REPORT, EXPORT_TRANSACTION
+from fastapi import FastAPI, Request, HTTPException
+from fastapi.responses import FileResponse
+import uvicorn
 from .auth_middleware import jwt_middleware
+from .report_store import ReportFileStore
 
 app = FastAPI()
 app.middleware('http')(jwt_middleware)
+add_debug_routes(app)
+
+EXPORT_FORMATS = ('json', 'csv')
 
 class ReportService(report_pb2_grpc.ReportServiceServicer):
     def __init__(self):
-        self.transaction_channel = grpc.insecure_channel('localhost:50052')
-        self.transaction_stub = transaction_pb2_grpc.TransactionServiceStub(self.transaction_channel)
+        # Транзакции шардированы по user_id, маршрутизацию делает клиент
+        self.transaction_client = TransactionClient("report_service", identity="report_service")
+        self.report_store = ReportFileStore(config.REPORT_STORE_DIR, config.REPORT_STORE_MAX_MB * 1024 * 1024)
 
     def GenerateMonthlyReport(self, request, context):
         try:
@@ -36,50 +55,55 @@ class ReportService(report_pb2_grpc.ReportServiceServicer):
                 context.set_details("Month format should be YYYY-MM")
                 return report_pb2.MonthlyReportResponse()
             
-            request_data = {
-                'user_id': user_id,
-                'start_date': f"{month}-01",
-                'end_date': f"{month}-31"
-            }
-            
-            msgpack_request = msgpack.packb(request_data)
-            
-
-            unpacked = msgpack.unpackb(msgpack_request, raw=False) 
-            
-            # Получаем транзакции через gRPC
-            transactions_response = self.transaction_service_stub.GetTransactions(
-                transaction_pb2.GetTransactionsRequest(
-                    user_id=str(unpacked['user_id']),  # Преобразуем в str
-                    start_date=str(unpacked['start_date']),
-                    end_date=str(unpacked['end_date'])
-                )
-            )
-            
-            # Рассчитываем итоги
-            total_income = sum(t.amount for t in transactions_response.transactions if t.type == 'income')
-            total_expenses = sum(t.amount for t in transactions_response.transactions if t.type == 'expense')
-            balance = total_income - total_expenses
-            
-            # Формируем ответ
-            response = report_pb2.MonthlyReportResponse(
-                user_id=user_id,
-                month=month,
-                total_income=total_income,
-                total_expenses=total_expenses,
-                balance=balance
-            )
-            
-            # Добавляем транзакции
-            response.transactions.extend(transactions_response.transactions)
-            
-            return response
+            return self._build_report(user_id, month)
             
         except Exception as e:
             context.set_code(grpc.StatusCode.INTERNAL)
             context.set_details(f"Error generating report: {str(e)}")
             return report_pb2.MonthlyReportResponse()
 
+    def _build_report(self, user_id, month):
+        request_data = {
+            'user_id': user_id,
+            'start_date': f"{month}-01",
+            'end_date': f"{month}-31"
+        }
+        
+        msgpack_request = msgpack.packb(request_data)
+        
+
+        unpacked = msgpack.unpackb(msgpack_request, raw=False) 
+        
+        # Получаем транзакции через gRPC
+        transactions_response = self.transaction_client.get_transactions(
+            transaction_pb2.GetTransactionsRequest(
+                user_id=str(unpacked['user_id']),  # Преобразуем в str
+                start_date=str(unpacked['start_date']),
+                end_date=str(unpacked['end_date'])
+            )
+        )
+        
+        # Рассчитываем итоги в копейках: сумма целых не накапливает ошибку округления
+        total_income, total_expenses = money.totals(transactions_response.transactions)
+        balance = total_income - total_expenses
+        
+        # Формируем ответ
+        response = report_pb2.MonthlyReportResponse(
+            user_id=user_id,
+            month=month,
+            total_income=money.from_minor(total_income),
+            total_expenses=money.from_minor(total_expenses),
+            balance=money.from_minor(balance),
+            total_income_minor=total_income,
+            total_expenses_minor=total_expenses,
+            balance_minor=balance
+        )
+        
+        # Добавляем транзакции
+        response.transactions.extend(transactions_response.transactions)
+        
+        return response
+
     def ExportReport(self, request, context):
         try:
             metadata = dict(context.invocation_metadata())
@@ -87,71 +111,18 @@ class ReportService(report_pb2_grpc.ReportServiceServicer):
             
             if not AuthService.verify_token(token, "report_service"):
                 context.abort(grpc.StatusCode.UNAUTHENTICATED, "Invalid token")
-            # Генерируем отчет
-            report = self.GenerateMonthlyReport(
-                report_pb2.MonthlyReportRequest(
-                    user_id=request.user_id,
-                    month=request.month
-                ),
-                context
-            )
-            
-            # Экспорт в разных форматах
-            if request.format == 'json':
-                report_dict = {
-                    'user_id': report.user_id,
-                    'month': report.month,
-                    'total_income': report.total_income,
-                    'total_expenses': report.total_expenses,
-                    'balance': report.balance,
-                    'transactions': [
-                        {
-                            'transaction_id': t.transaction_id,
-                            'amount': t.amount,
-                            'category': t.category,
-                            'type': t.type,
-                            'date': t.date,
-                            'description': t.description
-                        } for t in report.transactions
-                    ]
-                }
-                file_content = json.dumps(report_dict, indent=2).encode('utf-8')
-                file_name = f"report_{report.user_id}_{report.month}.json"
-                
-            elif request.format == 'csv':
-                output = io.StringIO()
-                writer = csv.writer(output)
-                
-                # Заголовки
-                writer.writerow([
-                    "Transaction ID", "Amount", "Category", 
-                    "Type", "Date", "Description"
-                ])
-                
-                # Данные
-                for t in report.transactions:
-                    writer.writerow([
-                        t.transaction_id, t.amount, t.category,
-                        t.type, t.date, t.description
-                    ])
-                
-                # Итоги
-                writer.writerow([])
-                writer.writerow(["Total Income", report.total_income])
-                writer.writerow(["Total Expenses", report.total_expenses])
-                writer.writerow(["Balance", report.balance])
-                
-                file_content = output.getvalue().encode('utf-8')
-                file_name = f"report_{report.user_id}_{report.month}.csv"
-                
-            else:
+
+            if request.format not in EXPORT_FORMATS:
                 context.set_code(grpc.StatusCode.INVALID_ARGUMENT)
                 context.set_details('Unsupported export format')
                 return report_pb2.ExportReportResponse()
+
+            with open(self.export_file(request), 'rb') as f:
+                file_content = f.read()
             
             return report_pb2.ExportReportResponse(
                 file_content=file_content,
-                file_name=file_name
+                file_name=export_file_name(request)
             )
             
         except Exception as e:
@@ -159,7 +130,76 @@ class ReportService(report_pb2_grpc.ReportServiceServicer):
             context.set_details(f'Export error: {str(e)}')
             return report_pb2.ExportReportResponse()
 
-def serve():
+    def export_file(self, request):
+        """Путь к готовому файлу выгрузки; файл собирается заново, только если данные изменились."""
+        # Версию читаем до данных: если запись придёт между ними, файл окажется
+        # новее своего ключа, и следующий запрос просто соберёт его ещё раз
+        version = self.transaction_client.get_data_version(
+            transaction_pb2.DataVersionRequest(user_id=request.user_id, month=request.month)
+        ).version
+        key = [request.user_id, request.month, request.format, request.pretty, version]
+
+        path = self.report_store.get(key)
+        if path is None:
+            report = self._build_report(request.user_id, request.month)
+            path = self.report_store.put(key, render_export(report, request.format, request.pretty))
+        return path
+
+def export_file_name(request):
+    return f"report_{request.user_id}_{request.month}.{request.format}"
+
+def render_export(report, format, pretty=False):
+    # Экспорт в разных форматах
+    if format == 'json':
+        # Отступы только по запросу: на больших выгрузках они заметно увеличивают объём
+        if pretty:
+            report_dict = EXPORT_REPORT(report)
+            report_dict['transactions'] = EXPORT_TRANSACTION.many(report.transactions)
+            return serialization.dumps(report_dict, pretty=True)
+        # Компактный JSON пишется в файл частями, массив транзакций не собирается целиком
+        return serialization.iter_report_json(report)
+
+    output = io.StringIO()
+    writer = csv.writer(output)
+    
+    # Заголовки
+    writer.writerow([
+        "Transaction ID", "Amount", "Category", 
+        "Type", "Date", "Description"
+    ])
+    
+    # Данные
+    for t in report.transactions:
+        writer.writerow([
+            t.transaction_id, t.amount, t.category,
+            t.type, t.date, t.description
+        ])
+    
+    # Итоги
+    writer.writerow([])
+    writer.writerow(["Total Income", report.total_income])
+    writer.writerow(["Total Expenses", report.total_expenses])
+    writer.writerow(["Balance", report.balance])
+    
+    return output.getvalue().encode('utf-8')
+
+@app.get("/reports/{user_id}/{month}")
+def download_report(user_id: str, month: str, request: Request, format: str = 'json', pretty: bool = False):
+    # Файл уходит с диска как есть, без повторной сериализации в protobuf
+    auth = request.headers.get('Authorization', '')
+    if not auth.startswith('Bearer ') or not AuthService.verify_token(auth.split(' ')[1], "report_service"):
+        raise HTTPException(status_code=401, detail="Unauthorized")
+    if format not in EXPORT_FORMATS:
+        raise HTTPException(status_code=400, detail="Unsupported export format")
+
+    export_request = report_pb2.ExportReportRequest(user_id=user_id, month=month, format=format, pretty=pretty)
+    try:
+        path = request.app.state.report_service.export_file(export_request)
+    except grpc.RpcError as e:
+        raise HTTPException(status_code=502, detail=e.details())
+    return FileResponse(path, filename=export_file_name(export_request))
+
+def serve(port=50052, http_port=config.REPORT_HTTP_PORT):
     with open('finance_pki/certs/report_service/report_service.key', 'rb') as f:
         private_key = f.read()
     with open('finance_pki/certs/report_service/report_service.crt', 'rb') as f:
@@ -173,11 +213,46 @@ def serve():
         require_client_auth=True
     )
     
-    server = grpc.server(futures.ThreadPoolExecutor(max_workers=10))
-    report_pb2_grpc.add_ReportServiceServicer_to_server(ReportService(), server)
-    server.add_secure_port('[::]:50052', server_credentials)
+    # Лимиты на пользователя/сервис и на метод; дедлайн входящего вызова
+    # ограничивает запросы к TransactionService
+    workers = 10
+    server = grpc.server(
+        futures.ThreadPoolExecutor(max_workers=workers, thread_name_prefix='grpc-worker'),
+        # A call that would wait for a free thread is rejected with RESOURCE_EXHAUSTED instead
+        maximum_concurrent_rpcs=workers,
+        interceptors=[
+            AdmissionInterceptor("report_service"),
+            DeadlinePropagationInterceptor(),
+            CompressionInterceptor()
+        ],
+        options=message_size_options()
+    )
+    service = ReportService()
+    report_pb2_grpc.add_ReportServiceServicer_to_server(service, server)
+    # Сервис без состояния: реплик может быть несколько, клиенты выбирают по Health
+    health = add_health(server, ["report.ReportService"])
+    server.add_secure_port(f'[::]:{port}', server_credentials)
+    add_unix_port(server, "report_service" if port == 50052 else f"report_service_{port}", server_credentials)
     server.start()
+    stop_on_signal(server, health)
+
+    # HTTP-отдача готовых файлов живёт в том же процессе и делит с gRPC хранилище
+    if http_port:
+        app.state.report_service = service
+        threading.Thread(
+            target=uvicorn.run,
+            args=(app,),
+            kwargs={'host': '0.0.0.0', 'port': http_port},
+            daemon=True
+        ).start()
+    elif debug_port(port):
+        # Без отдачи файлов приложение нужно только для /debug
+        serve_http(app, debug_port(port))
     server.wait_for_termination()
 
 if __name__ == '__main__':
-    serve()
\ No newline at end of file
+    parser = argparse.ArgumentParser(description="Report Service")
+    parser.add_argument('--port', type=int, default=50052)
+    parser.add_argument('--http-port', type=int, default=config.REPORT_HTTP_PORT, help="0 disables the HTTP file endpoint")
+    args = parser.parse_args()
+    serve(args.port, args.http_port)
\ No newline at end of file
@@ -177,5 +177,25 @@ class TestFinanceServices(unittest.TestCase):
         
         self.assertIsNotNone(response.transaction.transaction_id)
 
+    def test_add_transaction_idempotency(self):
+        token = AuthService.create_service_token(
+            "test_client",
+            "transaction_service",
+            ["write"]
+        )
+        request = transaction_pb2.AddTransactionRequest(
+            user_id=self.test_user_id,
+            amount=25.0,
+            category="test",
+            type="test",
+            description="Retried transaction",
+            idempotency_key=f"retry-{self.test_transaction_id}"
+        )
+
+        first = self.transaction_stub.AddTransaction(request, metadata=[('authorization', f'Bearer {token}')])
+        replay = self.transaction_stub.AddTransaction(request, metadata=[('authorization', f'Bearer {token}')])
+
+        self.assertEqual(first.transaction.transaction_id, replay.transaction.transaction_id)
+
 if __name__ == '__main__':
     unittest.main()
\ No newline at end of file
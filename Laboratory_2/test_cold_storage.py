@@ -0,0 +1,118 @@
+import os
+import shutil
+import tempfile
+import unittest
+
+from benchmarks.data import make_transactions
+from generated import transaction_pb2
+from transaction_service.query import query_transactions
+from transaction_service.segments import Segment, write_segment
+from transaction_service.store import TransactionStore
+from transaction_service.wire import FIELDS
+
+MONTHS = ('2025-01', '2025-02', '2025-03', '2025-04')
+
+
+def fields(transaction):
+    return {field: transaction[field] for field in (*FIELDS, 'wire')}
+
+
+class TestColdStorage(unittest.TestCase):
+    def setUp(self):
+        self.cold_dir = tempfile.mkdtemp(prefix='finance_cold_test_')
+        self.store = TransactionStore(cold_dir=self.cold_dir)
+        for seed, month in enumerate(MONTHS):
+            self.store.add_many(make_transactions(30, user_id='u1', month=month, seed=seed))
+            self.store.add_many(make_transactions(10, user_id='u2', month=month, seed=seed + 100))
+        # Поздняя запись в уже закрытый месяц
+        self.store.add_many(make_transactions(3, user_id='u1', month='2025-01', seed=999))
+
+    def tearDown(self):
+        shutil.rmtree(self.cold_dir, ignore_errors=True)
+
+    def snapshot(self, user_id):
+        """Всё, что читатели видят по пользователю: выборки, GetChanges, журнал реплик."""
+        queries = [
+            {},
+            {'category': 'rent'},
+            {'start_date': '2025-02-10', 'end_date': '2025-03-20'},
+            {'sort_by': 'amount', 'descending': True, 'limit': 7},
+            {'type': 'income', 'min_amount': 1000},
+        ]
+        results = []
+        for query in queries:
+            request = transaction_pb2.GetTransactionsRequest(user_id=user_id, **query)
+            rows = self.store.get(user_id, request.category, request.start_date, request.end_date)
+            page, cursor = query_transactions(rows, request)
+            results.append(([fields(t) for t in page], cursor))
+        transactions, cursor, reset, has_more = self.store.changes_since(user_id, '')
+        results.append(([fields(t) for t in transactions], cursor, reset, has_more))
+        middle = f"{self.store.epoch}:{self.store.seq // 2}"
+        transactions, cursor, reset, has_more = self.store.changes_since(user_id, middle, limit=5)
+        results.append(([fields(t) for t in transactions], cursor, reset, has_more))
+        return results
+
+    def log(self):
+        changes, head = self.store.log_since(0, len(self.store.log) + 1, 0)
+        return [(seq, fields(t) if t is not None else None, deleted) for seq, t, deleted in changes], head
+
+    def test_compact_keeps_reads_unchanged(self):
+        before = {user_id: self.snapshot(user_id) for user_id in ('u1', 'u2')}
+        log_before = self.log()
+        versions_before = dict(self.store.versions)
+
+        moved = self.store.compact('2025-03')
+        self.assertEqual(moved, 2 * 30 + 3 + 2 * 10)
+        self.assertTrue(self.store.cold['u1'])
+        self.assertTrue(all(t['date'] >= '2025-03' for t in self.store.transactions['u1']))
+
+        for user_id in ('u1', 'u2'):
+            self.assertEqual(self.snapshot(user_id), before[user_id])
+        self.assertEqual(self.log(), log_before)
+        self.assertEqual(self.store.versions, versions_before)
+
+    def test_delete_user_after_compaction(self):
+        self.store.compact('2025-03')
+        paths = [segment.path for segment in self.store.cold['u1']]
+        other = self.snapshot('u2')
+        _, old_cursor, _, _ = self.store.changes_since('u1', '')
+
+        self.assertEqual(self.store.delete_user('u1'), 4 * 30 + 3)
+        self.assertEqual(self.store.get('u1'), [])
+        self.assertEqual(self.store.get('u1', 'rent'), [])
+        self.assertNotIn('u1', self.store.users())
+        self.assertFalse(any(os.path.exists(path) for path in paths))
+        # Курсор, выданный до удаления, недействителен
+        transactions, _, reset, _ = self.store.changes_since('u1', old_cursor)
+        self.assertEqual((transactions, reset), ([], True))
+        changes, _ = self.store.log_since(self.store.seq - 1, 10, 0)
+        self.assertEqual([(t, deleted) for _, t, deleted in changes], [(None, 'u1')])
+        self.assertEqual(self.snapshot('u2'), other)
+
+    def test_segment_reopens_from_file(self):
+        rows = make_transactions(20, user_id='u1', month='2025-01')
+        reference = TransactionStore()
+        reference.add_many(rows)
+        rows = reference.get('u1')
+        path = os.path.join(self.cold_dir, 'reopen.seg')
+        write_segment(path, 'u1', '2025-01', rows, list(range(1, len(rows) + 1)))
+
+        segment = Segment(path)
+        self.assertEqual((segment.user_id, segment.month, len(segment)), ('u1', '2025-01', len(rows)))
+        self.assertEqual([fields(t) for t in segment.date_range()], [fields(t) for t in rows])
+        self.assertEqual([fields(t) for t in segment.date_range(category='rent')],
+                         [fields(t) for t in rows if t['category'] == 'rent'])
+        self.assertEqual([seq for seq, _ in segment.changes_since(15)], [16, 17, 18, 19, 20])
+        # Повторное открытие того же файла видит те же строки
+        self.assertEqual([fields(t) for t in Segment(path).date_range()], [fields(t) for t in rows])
+
+    def test_segment_rejects_foreign_file(self):
+        path = os.path.join(self.cold_dir, 'foreign.seg')
+        with open(path, 'wb') as f:
+            f.write(b'NOTASEG\0' + bytes(64))
+        with self.assertRaises(ValueError):
+            Segment(path)
+
+
+if __name__ == '__main__':
+    unittest.main()
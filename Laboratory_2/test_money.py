@@ -0,0 +1,32 @@
+import unittest
+
+from common.money import MAX_MINOR, from_minor, to_minor
+
+
+class TestToMinor(unittest.TestCase):
+    def test_half_kopeck_rounds_away_from_zero(self):
+        self.assertEqual(to_minor(0.125), 13)
+        self.assertEqual(to_minor(-0.125), -13)
+        self.assertEqual(to_minor(0.005), 1)
+
+    def test_shortest_decimal_form_is_used(self):
+        # 1.005 хранится как 1.00499999999999989..., но записывается как 1.005
+        self.assertEqual(to_minor(1.005), 101)
+        self.assertEqual(to_minor(0.1), 10)
+        self.assertEqual(to_minor(0.1 + 0.2), 30)
+
+    def test_int64_bounds(self):
+        self.assertEqual(to_minor(from_minor(10 ** 15)), 10 ** 15)
+        for amount in (2 ** 63 / 100, -2 ** 63 / 100, 1e30, -1e30):
+            with self.assertRaisesRegex(ValueError, "out of range"):
+                to_minor(amount)
+        self.assertEqual(MAX_MINOR, 2 ** 63 - 1)
+
+    def test_non_finite_is_rejected(self):
+        for amount in (float('inf'), float('-inf'), float('nan')):
+            with self.assertRaisesRegex(ValueError, "finite"):
+                to_minor(amount)
+
+
+if __name__ == '__main__':
+    unittest.main()
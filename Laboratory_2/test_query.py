@@ -0,0 +1,115 @@
+import json
+import base64
+import unittest
+from concurrent import futures
+
+import grpc
+
+from common.clients import ServiceToken
+from generated import transaction_pb2, transaction_pb2_grpc
+from transaction_service.query import query_transactions
+from transaction_service.server import TransactionService
+from transaction_service.wire import add_servicer_to_server
+
+
+def make_rows():
+    # Суммы повторяются, поэтому порядок внутри одинаковых сумм задаёт id
+    rows = []
+    for i in range(20):
+        rows.append({
+            'transaction_id': f"t{i:02d}",
+            'user_id': 'u',
+            'amount': float(i % 4 * 100),
+            'amount_minor': i % 4 * 10000,
+            'category': 'rent' if i % 2 else 'food',
+            'type': 'expense',
+            'date': f"2025-04-{i + 1:02d} 12:00:00",
+            'description': ''
+        })
+    return rows
+
+
+def raw_cursor(key):
+    return base64.urlsafe_b64encode(json.dumps(key).encode('utf-8')).decode('ascii')
+
+
+class TestQueryPaging(unittest.TestCase):
+    def setUp(self):
+        self.rows = make_rows()
+
+    def pages(self, **fields):
+        request = transaction_pb2.GetTransactionsRequest(user_id='u', **fields)
+        result = []
+        while True:
+            page, cursor = query_transactions(self.rows, request)
+            result.append(page)
+            if not cursor:
+                return result
+            request.cursor = cursor
+
+    def test_descending_by_amount_with_ties(self):
+        pages = self.pages(sort_by='amount', descending=True, limit=3)
+        rows = [t for page in pages for t in page]
+        expected = sorted(self.rows, key=lambda t: (t['amount'], t['transaction_id']), reverse=True)
+        self.assertEqual([t['transaction_id'] for t in rows], [t['transaction_id'] for t in expected])
+        self.assertTrue(all(len(page) == 3 for page in pages[:-1]))
+
+    def test_ascending_by_date(self):
+        rows = [t for page in self.pages(limit=7) for t in page]
+        self.assertEqual(rows, self.rows)
+
+    def test_cursor_with_other_sort_is_rejected(self):
+        _, cursor = query_transactions(
+            self.rows, transaction_pb2.GetTransactionsRequest(user_id='u', limit=5))
+        for fields in ({'sort_by': 'amount'}, {'descending': True}):
+            with self.assertRaisesRegex(ValueError, "Invalid cursor"):
+                query_transactions(self.rows, transaction_pb2.GetTransactionsRequest(
+                    user_id='u', limit=5, cursor=cursor, **fields))
+
+    def test_tampered_cursor_is_rejected(self):
+        for cursor in ('not base64!', raw_cursor([1, 2]), raw_cursor(['amount', False, 'x', 't01']),
+                       raw_cursor(['amount', False, True, 't01']), raw_cursor(['amount', False, 100.0, 5])):
+            with self.assertRaisesRegex(ValueError, "Invalid cursor"):
+                query_transactions(self.rows, transaction_pb2.GetTransactionsRequest(
+                    user_id='u', sort_by='amount', cursor=cursor))
+
+    def test_non_finite_cursor_is_rejected(self):
+        for value in ('NaN', 'Infinity', '-Infinity'):
+            cursor = base64.urlsafe_b64encode(f'["amount", false, {value}, "t01"]'.encode()).decode()
+            with self.assertRaisesRegex(ValueError, "Invalid cursor"):
+                query_transactions(self.rows, transaction_pb2.GetTransactionsRequest(
+                    user_id='u', sort_by='amount', cursor=cursor))
+
+
+class TestGetTransactionsCursor(unittest.TestCase):
+    """Ошибка курсора доходит до клиента как INVALID_ARGUMENT (сервер без TLS, в этом процессе)."""
+
+    def setUp(self):
+        service = TransactionService(cold_dir=None)
+        service.store.add_many(make_rows())
+        self.server = grpc.server(futures.ThreadPoolExecutor(max_workers=2))
+        add_servicer_to_server(service, self.server)
+        port = self.server.add_insecure_port('localhost:0')
+        self.server.start()
+        self.channel = grpc.insecure_channel(f'localhost:{port}')
+        self.stub = transaction_pb2_grpc.TransactionServiceStub(self.channel)
+        self.metadata = ServiceToken('test', 'transaction_service', ['read', 'write']).metadata()
+
+    def tearDown(self):
+        self.channel.close()
+        self.server.stop(None)
+
+    def test_bad_cursors_are_invalid_argument(self):
+        first = self.stub.GetTransactions(
+            transaction_pb2.GetTransactionsRequest(user_id='u', limit=5), metadata=self.metadata)
+        self.assertEqual(len(first.transactions), 5)
+        nan = base64.urlsafe_b64encode(b'["amount", false, NaN, "t01"]').decode()
+        for sort_by, cursor in (('amount', first.next_cursor), ('amount', nan), ('date', 'garbage')):
+            with self.assertRaises(grpc.RpcError) as raised:
+                self.stub.GetTransactions(transaction_pb2.GetTransactionsRequest(
+                    user_id='u', sort_by=sort_by, limit=5, cursor=cursor), metadata=self.metadata)
+            self.assertEqual(raised.exception.code(), grpc.StatusCode.INVALID_ARGUMENT)
+
+
+if __name__ == '__main__':
+    unittest.main()
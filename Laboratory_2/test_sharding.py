@@ -0,0 +1,53 @@
+import hashlib
+import unittest
+from collections import Counter
+
+from common.sharding import HashRing
+
+SHARDS = ['localhost:50053', 'localhost:50063', 'localhost:50073', 'localhost:50083']
+# id пользователей такие же, как в UserService: sha256(email)[:16]
+KEYS = [hashlib.sha256(f"user{i}@example.com".encode()).hexdigest()[:16] for i in range(20000)]
+
+
+class TestHashRing(unittest.TestCase):
+    def test_same_key_same_shard(self):
+        ring = HashRing(SHARDS)
+        # Другой экземпляр и другой порядок шардов дают то же размещение
+        other = HashRing(list(reversed(SHARDS)))
+        for key in KEYS[:1000]:
+            self.assertEqual(ring.get_node(key), ring.get_node(key))
+            self.assertEqual(ring.get_node(key), other.get_node(key))
+
+    def test_distribution_is_even(self):
+        ring = HashRing(SHARDS)
+        counts = Counter(ring.get_node(key) for key in KEYS)
+        self.assertEqual(set(counts), set(SHARDS))
+        expected = len(KEYS) / len(SHARDS)
+        for shard, count in counts.items():
+            self.assertLess(abs(count - expected) / expected, 0.2, f"{shard}: {count}")
+
+    def test_adding_shard_moves_about_one_nth(self):
+        old = HashRing(SHARDS)
+        new = HashRing(SHARDS + ['localhost:50093'])
+        moved = [key for key in KEYS if old.get_node(key) != new.get_node(key)]
+        # Ключи переезжают только на новый шард, и их около 1/5
+        self.assertTrue(all(new.get_node(key) == 'localhost:50093' for key in moved))
+        share = len(moved) / len(KEYS)
+        self.assertGreater(share, 0.2 * 0.7)
+        self.assertLess(share, 0.2 * 1.3)
+
+    def test_removing_shard_moves_only_its_keys(self):
+        ring = HashRing(SHARDS)
+        before = {key: ring.get_node(key) for key in KEYS}
+        ring.remove_node('localhost:50063')
+        for key, shard in before.items():
+            if shard != 'localhost:50063':
+                self.assertEqual(ring.get_node(key), shard)
+
+    def test_empty_ring(self):
+        with self.assertRaises(LookupError):
+            HashRing().get_node('u')
+
+
+if __name__ == '__main__':
+    unittest.main()
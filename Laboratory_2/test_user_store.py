@@ -0,0 +1,55 @@
+import unittest
+
+from user_service.store import UserStore
+
+
+def make_user(email):
+    return {
+        'user_id': f"id-{email}",
+        'username': email.split('@')[0],
+        'email': email,
+        'password_hash': 'hash',
+        'created_at': '2025-01-01 00:00:00'
+    }
+
+
+class TestUserStoreBloomFilter(unittest.TestCase):
+    def setUp(self):
+        self.store = UserStore()
+
+    def test_added_user_is_found(self):
+        user = make_user('a@example.com')
+        self.assertTrue(self.store.add(user))
+        self.assertEqual(self.store.lookup(user['email'], lambda: self.store.get_by_email(user['email'])), user)
+        self.assertEqual(self.store.lookup(user['user_id'], lambda: self.store.get(user['user_id'])), user)
+
+    def test_user_loaded_before_rebuild_is_found(self):
+        # Пользователь попал в хранилище в обход add, фильтр о нём не знает
+        user = make_user('loaded@example.com')
+        self.store.users[user['user_id']] = user
+        self.store.emails[user['email']] = user['user_id']
+        self.assertFalse(self.store.known.might_contain(user['email']))
+
+        self.store.rebuild()
+        self.assertEqual(self.store.lookup(user['email'], lambda: self.store.get_by_email(user['email'])), user)
+        self.assertEqual(self.store.lookup(user['user_id'], lambda: self.store.get(user['user_id'])), user)
+        # Перестроенный фильтр отсекает и повторную регистрацию
+        self.assertFalse(self.store.add(make_user('loaded@example.com')))
+
+    def test_unknown_key_is_definite_miss(self):
+        self.store.add(make_user('a@example.com'))
+        misses = self.store.lookups['definite_miss']
+        reads = []
+        self.assertIsNone(self.store.lookup('missing@example.com', lambda: reads.append(1)))
+        self.assertEqual(reads, [])
+        self.assertEqual(self.store.lookups['definite_miss'], misses + 1)
+
+    def test_duplicate_registration_goes_through_filter(self):
+        self.assertTrue(self.store.add(make_user('a@example.com')))
+        self.assertFalse(self.store.add(make_user('a@example.com')))
+        self.assertEqual(self.store.lookups['definite_miss'], 1)
+        self.assertEqual(self.store.lookups['maybe_hit'], 1)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,40 @@
+import time
+import threading
+from collections import OrderedDict
+
+
+class IdempotencyCache:
+    """Ограниченная по размеру и времени жизни таблица ответов по ключу идемпотентности.
+
+    get/put потокобезопасны. Атомарность "проверить и записать" обеспечивает
+    вызывающий код блокировкой пользователя в TransactionStore.
+    """
+
+    def __init__(self, ttl_seconds=24 * 3600, max_size=100_000):
+        self.ttl_seconds = ttl_seconds
+        self.max_size = max_size
+        self.lock = threading.Lock()
+        self._entries = OrderedDict()  # key -> (expires_at, response)
+
+    def get(self, key):
+        with self.lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            expires_at, response = entry
+            if expires_at < time.monotonic():
+                del self._entries[key]
+                return None
+            return response
+
+    def put(self, key, response):
+        now = time.monotonic()
+        with self.lock:
+            self._entries[key] = (now + self.ttl_seconds, response)
+            self._entries.move_to_end(key)
+            # Ключи вставляются по времени, поэтому самые старые - в начале
+            while self._entries:
+                oldest_key, (expires_at, _) = next(iter(self._entries.items()))
+                if len(self._entries) <= self.max_size and expires_at >= now:
+                    break
+                del self._entries[oldest_key]
@@ -0,0 +1,83 @@
+import json
+import math
+import base64
+import bisect
+
+# Тип значения ключа сортировки в курсоре
+SORT_FIELDS = {'date': (str,), 'amount': (int, float)}
+
+
+def encode_cursor(transaction, sort_by, descending):
+    key = [sort_by, descending, transaction[sort_by], transaction['transaction_id']]
+    return base64.urlsafe_b64encode(json.dumps(key).encode('utf-8')).decode('ascii')
+
+
+def decode_cursor(cursor, sort_by, descending):
+    """(значение, id) из курсора; курсор другого порядка сортировки не принимается."""
+    try:
+        cursor_sort_by, cursor_descending, value, transaction_id = json.loads(
+            base64.urlsafe_b64decode(cursor.encode('ascii')))
+    except (ValueError, TypeError):
+        raise ValueError("Invalid cursor")
+    # bool - подкласс int, поэтому True не должен сойти за сумму
+    if (cursor_sort_by != sort_by or cursor_descending is not descending
+            or isinstance(value, bool) or not isinstance(value, SORT_FIELDS[sort_by])
+            or not isinstance(transaction_id, str)):
+        raise ValueError("Invalid cursor")
+    # json.loads принимает NaN и Infinity, а с ними сравнения в bisect теряют смысл
+    if isinstance(value, float) and not math.isfinite(value):
+        raise ValueError("Invalid cursor")
+    return value, transaction_id
+
+
+def date_range(transactions, start_date, end_date):
+    """Срез списка, отсортированного по дате, через бинарный поиск вместо полного прохода."""
+    start = bisect.bisect_left(transactions, start_date, key=lambda t: t['date']) if start_date else 0
+    end = bisect.bisect_right(transactions, end_date, key=lambda t: t['date']) if end_date else len(transactions)
+    return transactions[start:end]
+
+
+def query_transactions(transactions, request):
+    """Фильтрация, сортировка и постраничная выдача транзакций одного пользователя.
+
+    transactions должны быть отсортированы по дате. Возвращает (страница, next_cursor).
+    Курсор - ключ сортировки последней выданной записи вместе с порядком
+    сортировки, поэтому страницы не сдвигаются при добавлении новых
+    транзакций, а курсор с другим sort_by или descending отклоняется.
+    """
+    sort_by = request.sort_by or 'date'
+    if sort_by not in SORT_FIELDS:
+        raise ValueError(f"Unsupported sort field: {sort_by}")
+
+    rows = date_range(transactions, request.start_date, request.end_date)
+
+    has_min = request.HasField('min_amount')
+    has_max = request.HasField('max_amount')
+    if request.category or request.type or has_min or has_max:
+        rows = [
+            t for t in rows
+            if (not request.category or t['category'] == request.category)
+            and (not request.type or t['type'] == request.type)
+            and (not has_min or t['amount'] >= request.min_amount)
+            and (not has_max or t['amount'] <= request.max_amount)
+        ]
+
+    # Записи уже упорядочены по дате; для постраничной выдачи нужен однозначный
+    # порядок по (значение, id), иначе курсор на одинаковых датах теряет записи
+    if sort_by != 'date' or request.descending or request.limit or request.cursor:
+        rows = sorted(rows, key=lambda t: (t[sort_by], t['transaction_id']), reverse=request.descending)
+
+    if request.cursor:
+        after = decode_cursor(request.cursor, sort_by, request.descending)
+        keys = [(t[sort_by], t['transaction_id']) for t in rows]
+        if request.descending:
+            # Для убывающего порядка ищем по инвертированному списку
+            position = len(keys) - bisect.bisect_left(keys[::-1], tuple(after))
+        else:
+            position = bisect.bisect_right(keys, tuple(after))
+        rows = rows[position:]
+
+    if request.limit and len(rows) > request.limit:
+        page = rows[:request.limit]
+        return page, encode_cursor(page[-1], sort_by, request.descending)
+    return rows, ''
@@ -0,0 +1,105 @@
+import time
+import random
+import threading
+
+import grpc
+
+from generated import transaction_pb2, transaction_pb2_grpc
+from common import config
+from common.channels import create_channel
+from common.clients import ServiceToken
+from common.money import minor_amount
+from .store import TransactionStore
+
+
+class ReplicaFollower:
+    """Копия данных primary, которая обновляется потоком StreamChanges.
+
+    Реплика применяет изменения в порядке журнала. Если primary перезапустился
+    (reset), новая копия собирается в отдельном TransactionStore и подменяет
+    service.store, только когда догонит primary, поэтому читатели не видят
+    наполовину собранных данных. Отставание считается от последнего пакета,
+    после которого реплика знала всё, что было на primary, без учёта сетевой
+    задержки.
+    """
+
+    def __init__(self, service, primary_target, max_staleness=None):
+        self.service = service
+        self.primary_target = primary_target
+        self.max_staleness = config.REPLICA_MAX_STALENESS_SECONDS if max_staleness is None else max_staleness
+        self.token = ServiceToken("transaction_replica", "transaction_service", ["read", "write"])
+        self.cursor = ''
+        self.caught_up_at = None  # time.monotonic()
+        self._pending = None  # копия, которая собирается после reset
+        self._stop = threading.Event()
+
+    def staleness(self):
+        if self.caught_up_at is None:
+            return float('inf')
+        return time.monotonic() - self.caught_up_at
+
+    def is_fresh(self):
+        return self.staleness() <= self.max_staleness
+
+    def start(self):
+        thread = threading.Thread(target=self._run, name='replica-follower', daemon=True)
+        thread.start()
+        return thread
+
+    def stop(self):
+        self._stop.set()
+
+    def _run(self):
+        channel = create_channel(self.primary_target, "transaction_service", identity="transaction_service")
+        stub = transaction_pb2_grpc.TransactionServiceStub(channel)
+        attempt = 0
+        while not self._stop.is_set():
+            try:
+                for batch in stub.StreamChanges(
+                        transaction_pb2.StreamChangesRequest(
+                            cursor=self.cursor, batch_size=config.REPLICA_BATCH_SIZE),
+                        metadata=self.token.metadata()):
+                    self.apply(batch)
+                    attempt = 0
+                    if self._stop.is_set():
+                        break
+            except grpc.RpcError:
+                # Primary недоступен: продолжаем с того же курсора, пока
+                # отставание не превысит порог, реплика ещё отвечает
+                pass
+            attempt += 1
+            self._stop.wait(random.uniform(0, min(5.0, 0.1 * 2 ** attempt)))
+        channel.close()
+
+    def apply(self, batch):
+        if batch.reset:
+            self._pending = TransactionStore(cold_dir=self.service.store.cold_dir)
+        store = self._pending or self.service.store
+
+        # Подряд идущие добавления пишутся одним пакетом
+        added = []
+        for change in batch.changes:
+            if change.HasField('transaction'):
+                t = change.transaction
+                added.append({
+                    'transaction_id': t.transaction_id,
+                    'user_id': t.user_id,
+                    'amount_minor': minor_amount(t),
+                    'category': t.category,
+                    'type': t.type,
+                    'date': t.date,
+                    'description': t.description
+                })
+            else:
+                store.add_many(added)
+                added = []
+                store.delete_user(change.deleted_user_id)
+        store.add_many(added)
+
+        self.cursor = batch.cursor
+        if int(batch.cursor.rpartition(':')[2]) >= batch.head:
+            if self._pending is not None:
+                previous, self.service.store = self.service.store, self._pending
+                self._pending = None
+                previous.close()
+            self.caught_up_at = time.monotonic()
@@ -0,0 +1,177 @@
+import os
+import json
+import mmap
+import array
+import struct
+import bisect
+
+from common.files import write_atomic
+from common.money import from_minor
+
+MAGIC = b'FINSEG2\0'
+_HEADER = struct.Struct('<8sQ')
+STRING_COLUMNS = ('transaction_id', 'date', 'description', 'wire')
+
+
+def _align(buffer):
+    # Числовые столбцы выровнены по 8 байт, чтобы читать их через memoryview.cast
+    buffer.extend(b'\0' * (-len(buffer) % 8))
+
+
+def write_segment(path, user_id, month, rows, seqs):
+    """Неизменяемый столбцовый файл с транзакциями пользователя за месяц.
+
+    rows отсортированы по дате, seqs - их номера в журнале изменений.
+    Заголовок (JSON) хранит диапазон дат и seq, словари категорий и типов и
+    смещения столбцов. Строки лежат как смещения uint64 плюс байты, категория
+    и тип - коды uint16 в словаре, для каждой категории есть список номеров
+    строк. Числа записаны в порядке байтов этой машины: файлы живут, пока
+    жив процесс, и на другие машины не переносятся.
+    """
+    categories = sorted({t['category'] for t in rows})
+    types = sorted({t['type'] for t in rows})
+    category_codes = {category: code for code, category in enumerate(categories)}
+    type_codes = {kind: code for code, kind in enumerate(types)}
+
+    data = bytearray()
+    columns = {}
+
+    def add_column(name, values):
+        _align(data)
+        columns[name] = [len(data), len(values)]
+        data.extend(values)
+
+    add_column('seq', array.array('Q', seqs).tobytes())
+    add_column('amount_minor', array.array('q', [t['amount_minor'] for t in rows]).tobytes())
+    add_column('category', array.array('H', [category_codes[t['category']] for t in rows]).tobytes())
+    add_column('type', array.array('H', [type_codes[t['type']] for t in rows]).tobytes())
+    for name in STRING_COLUMNS:
+        values = [t[name] if name == 'wire' else t[name].encode('utf-8') for t in rows]
+        offsets = array.array('Q', [0])
+        for value in values:
+            offsets.append(offsets[-1] + len(value))
+        add_column(f'{name}.offsets', offsets.tobytes())
+        add_column(name, b''.join(values))
+    by_category = {}
+    for index, t in enumerate(rows):
+        by_category.setdefault(t['category'], array.array('I')).append(index)
+    for category, indexes in by_category.items():
+        add_column(f'rows:{category}', indexes.tobytes())
+
+    header = json.dumps({
+        'user_id': user_id,
+        'month': month,
+        'count': len(rows),
+        'min_date': rows[0]['date'],
+        'max_date': rows[-1]['date'],
+        'max_seq': max(seqs),
+        'categories': categories,
+        'types': types,
+        'columns': columns,
+    }).encode('utf-8')
+    prefix = bytearray(_HEADER.pack(MAGIC, len(header)) + header)
+    _align(prefix)
+    write_atomic(path, bytes(prefix + data))
+
+
+class Segment:
+    """Сегмент, отображённый в память: в RAM только заголовок, страницы
+    столбцов подгружает ОС при обращении к ним."""
+
+    def __init__(self, path):
+        self.path = path
+        with open(path, 'rb') as f:
+            self._mmap = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        magic, header_size = _HEADER.unpack_from(self._mmap)
+        if magic != MAGIC:
+            raise ValueError(f"Not a transaction segment: {path}")
+        header = json.loads(self._mmap[_HEADER.size:_HEADER.size + header_size])
+        base = _HEADER.size + header_size + (-(_HEADER.size + header_size) % 8)
+
+        self.user_id = header['user_id']
+        self.month = header['month']
+        self.count = header['count']
+        self.min_date = header['min_date']
+        self.max_date = header['max_date']
+        self.max_seq = header['max_seq']
+        self.categories = header['categories']
+        self.types = header['types']
+
+        view = memoryview(self._mmap)
+        self._columns = {name: view[base + offset:base + offset + size]
+                         for name, (offset, size) in header['columns'].items()}
+        self._seq = self._columns['seq'].cast('Q')
+        self._amount_minor = self._columns['amount_minor'].cast('q')
+        self._category = self._columns['category'].cast('H')
+        self._type = self._columns['type'].cast('H')
+        self._offsets = {name: self._columns[f'{name}.offsets'].cast('Q') for name in STRING_COLUMNS}
+
+        # Чтение поля строки по номеру; столбцы декодируются только при обращении
+        category, kind, amount_minor = self._category, self._type, self._amount_minor
+        self.getters = {
+            'user_id': lambda index: self.user_id,
+            'amount': lambda index: from_minor(amount_minor[index]),
+            'amount_minor': amount_minor.__getitem__,
+            'category': lambda index: self.categories[category[index]],
+            'type': lambda index: self.types[kind[index]],
+        }
+        for name in STRING_COLUMNS:
+            self.getters[name] = self._string_getter(name)
+
+    def _string_getter(self, name):
+        offsets, data = self._offsets[name], self._columns[name]
+        if name == 'wire':
+            return lambda index: bytes(data[offsets[index]:offsets[index + 1]])
+        return lambda index: str(data[offsets[index]:offsets[index + 1]], 'utf-8')
+
+    def __len__(self):
+        return self.count
+
+    def ref(self, index):
+        return ColdRow(self, index)
+
+    def date_range(self, start_date='', end_date='', category=''):
+        """Строки за период (и категорию) как ColdRow; без обращения к столбцам,
+        если период или категория не пересекаются с сегментом."""
+        if (start_date and self.max_date < start_date) or (end_date and self.min_date > end_date):
+            return []
+        if category:
+            if category not in self.categories:
+                return []
+            indexes = self._columns[f'rows:{category}'].cast('I')
+        else:
+            indexes = range(self.count)
+        # Бинарный поиск читает только даты нужных строк, без сборки dict
+        date = self.getters['date']
+        start = bisect.bisect_left(indexes, start_date, key=date) if start_date else 0
+        end = bisect.bisect_right(indexes, end_date, key=date) if end_date else len(indexes)
+        return [ColdRow(self, index) for index in indexes[start:end]]
+
+    def changes_since(self, after):
+        """(seq, строка) с seq больше after, для клиентов GetChanges со старым курсором."""
+        if self.max_seq <= after:
+            return []
+        return [(seq, ColdRow(self, index)) for index, seq in enumerate(self._seq) if seq > after]
+
+    def unlink(self):
+        # Ссылки из журнала изменений могут пережить файл: отображение
+        # остаётся читаемым и закроется вместе с последним объектом
+        try:
+            os.unlink(self.path)
+        except FileNotFoundError:
+            pass
+
+
+class ColdRow:
+    """Строка сегмента с доступом как к dict транзакции. Выборки и журнал
+    изменений держат её вместо dict; поля читаются из столбцов по запросу,
+    поэтому запрос без фильтров трогает только 'wire'."""
+
+    __slots__ = ('segment', 'index')
+
+    def __init__(self, segment, index):
+        self.segment = segment
+        self.index = index
+
+    def __getitem__(self, field):
+        return self.segment.getters[field](self.index)
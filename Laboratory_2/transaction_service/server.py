@@ -1,4 +1,7 @@
 import os
+import argparse
+import shutil
+import threading
 import time
 import uuid
 from concurrent import futures
@@ -7,15 +10,37 @@ import grpc
 from generated import transaction_pb2_grpc, transaction_pb2
 import msgpack
 from graphql_api.auth import AuthService
+from common import config
+from common.admission import AdmissionInterceptor
+from common.channels import add_unix_port
+from common.compression import CompressionInterceptor, message_size_options
+from common.health import add_health, stop_on_signal
+from common.money import from_minor, minor_amount
+from common.profiling import add_debug_routes, debug_port, serve_http
 from .auth_middleware import jwt_middleware
+from .idempotency import IdempotencyCache
+from .query import query_transactions
+from .replica import ReplicaFollower
+from .store import TransactionStore
+from .wire import add_servicer_to_server, encode_response
 from fastapi import FastAPI
 
 app = FastAPI()
 app.middleware('http')(jwt_middleware)
+add_debug_routes(app)
 
 class TransactionService(transaction_pb2_grpc.TransactionServiceServicer):
-    def __init__(self):
-        self.transactions = {}  # user_id -> list of transactions
+    def __init__(self, replica_of=None, cold_dir=None):
+        # user_id -> transactions, plus a per-category index; closed months go to cold_dir
+        self.store = TransactionStore(cold_dir=cold_dir)
+        # A replica follows the primary's change log and only serves reads
+        self.follower = ReplicaFollower(self, replica_of) if replica_of else None
+        self.idempotency = IdempotencyCache(
+            ttl_seconds=int(os.environ.get('IDEMPOTENCY_TTL_SECONDS', 24 * 3600)),
+            max_size=int(os.environ.get('IDEMPOTENCY_MAX_KEYS', 100_000))
+        )
+        # Each StreamChanges holds a pool thread for as long as its replica is connected
+        self.streams = threading.BoundedSemaphore(config.REPLICA_MAX_STREAMS)
 
     def AddTransaction(self, request, context):
         metadata = dict(context.invocation_metadata())
@@ -24,30 +49,49 @@ class TransactionService(transaction_pb2_grpc.TransactionServiceServicer):
         payload = AuthService.verify_token(token, "transaction_service")
         if not payload or 'write' not in payload.get('scope', []):
             context.abort(grpc.StatusCode.PERMISSION_DENIED, "Permission denied")
+        self._check_primary(context)
+        self._check_amounts([request], context)
+
+        if not request.idempotency_key:
+            return self._add_transaction(request)
 
+        # Повтор после таймаута отдаёт исходный ответ, а не создаёт дубликат.
+        # Проверка и запись идут под блокировкой пользователя: другие
+        # пользователи в это время пишут параллельно
+        key = (request.user_id, request.idempotency_key)
+        with self.store.lock(request.user_id):
+            response = self.idempotency.get(key)
+            if response is None:
+                response = self._add_transaction(request)
+                self.idempotency.put(key, response)
+            return response
+
+    def _add_transaction(self, request):
         transaction_id = str(uuid.uuid4())
-        transaction_date = time.strftime("%Y-%m-%d %H:%M:%S", time.gmtime())
-        
-        transaction = {
-            'transaction_id': transaction_id,
-            'user_id': request.user_id,
-            'amount': request.amount,
-            'category': request.category,
-            'type': request.type,
-            'date': transaction_date,
-            'description': request.description
-        }
         
-        if request.user_id not in self.transactions:
-            self.transactions[request.user_id] = []
-        
-        self.transactions[request.user_id].append(transaction)
+        # Дата берётся под блокировкой пользователя: его записи приходят в порядке
+        # дат и дописываются в конец списков, без копирования при вставке в середину
+        with self.store.lock(request.user_id):
+            transaction_date = time.strftime("%Y-%m-%d %H:%M:%S", time.gmtime())
+            
+            transaction = {
+                'transaction_id': transaction_id,
+                'user_id': request.user_id,
+                'amount_minor': minor_amount(request),
+                'category': request.category,
+                'type': request.type,
+                'date': transaction_date,
+                'description': request.description
+            }
+            
+            self.store.add(transaction)
         
         return transaction_pb2.TransactionResponse(
             transaction=transaction_pb2.Transaction(
                 transaction_id=transaction_id,
                 user_id=request.user_id,
-                amount=request.amount,
+                amount=from_minor(transaction['amount_minor']),
+                amount_minor=transaction['amount_minor'],
                 category=request.category,
                 type=request.type,
                 date=transaction_date,
@@ -62,28 +106,149 @@ class TransactionService(transaction_pb2_grpc.TransactionServiceServicer):
         payload = AuthService.verify_token(token, "transaction_service")
         if not payload or 'write' not in payload.get('scope', []):
             context.abort(grpc.StatusCode.PERMISSION_DENIED, "Permission denied")
-        user_transactions = self.transactions.get(request.user_id, [])
+        self._check_fresh(context)
+        # The category index already holds only the requested category, sorted by date
+        user_transactions = self.store.get(
+            request.user_id, request.category, request.start_date, request.end_date)
         
-        # Filter by date range if provided
-        filtered_transactions = []
-        for t in user_transactions:
-            if (not request.start_date or t['date'] >= request.start_date) and \
-               (not request.end_date or t['date'] <= request.end_date):
-                filtered_transactions.append(t)
+        # Filter, sort and paginate next to the data
+        try:
+            filtered_transactions, next_cursor = query_transactions(user_transactions, request)
+        except ValueError as e:
+            context.abort(grpc.StatusCode.INVALID_ARGUMENT, str(e))
         
-        return transaction_pb2.TransactionsResponse(
-            transactions=[transaction_pb2.Transaction(
-                transaction_id=t['transaction_id'],
-                user_id=t['user_id'],
-                amount=t['amount'],
-                category=t['category'],
-                type=t['type'],
-                date=t['date'],
-                description=t['description']
-            ) for t in filtered_transactions]
+        # Ответ склеивается из закодированных при записи транзакций
+        return encode_response(
+            transaction_pb2.TransactionsResponse(next_cursor=next_cursor),
+            filtered_transactions
         )
 
-def serve():
+    def _check_write_access(self, context):
+        metadata = dict(context.invocation_metadata())
+        token = metadata.get('authorization', '').replace('Bearer ', '')
+
+        payload = AuthService.verify_token(token, "transaction_service")
+        if not payload or 'write' not in payload.get('scope', []):
+            context.abort(grpc.StatusCode.PERMISSION_DENIED, "Permission denied")
+
+    def _check_amounts(self, messages, context):
+        # inf, nan and amounts beyond int64 kopecks cannot be stored
+        for message in messages:
+            try:
+                minor_amount(message)
+            except ValueError as e:
+                context.abort(grpc.StatusCode.INVALID_ARGUMENT, str(e))
+
+    def _check_primary(self, context):
+        if self.follower is not None:
+            context.abort(grpc.StatusCode.FAILED_PRECONDITION, "Read-only replica")
+
+    def _check_fresh(self, context):
+        # A lagging replica refuses, and the client reads from the primary
+        if self.follower is not None and not self.follower.is_fresh():
+            context.abort(grpc.StatusCode.FAILED_PRECONDITION,
+                          f"Replica is {self.follower.staleness():.1f}s behind the primary")
+
+    def ListUsers(self, request, context):
+        self._check_write_access(context)
+        self._check_fresh(context)
+        return transaction_pb2.ListUsersResponse(user_ids=self.store.users())
+
+    def ImportTransactions(self, request, context):
+        # Принимаем транзакции с другого шарда как есть, сохраняя id и даты
+        self._check_write_access(context)
+        self._check_primary(context)
+        self._check_amounts(request.transactions, context)
+        self.store.add_many([{
+            'transaction_id': t.transaction_id,
+            'user_id': t.user_id,
+            'amount_minor': minor_amount(t),
+            'category': t.category,
+            'type': t.type,
+            'date': t.date,
+            'description': t.description
+        } for t in request.transactions])
+        return transaction_pb2.ImportTransactionsResponse(imported=len(request.transactions))
+
+    def DeleteUserTransactions(self, request, context):
+        self._check_write_access(context)
+        self._check_primary(context)
+        deleted = self.store.delete_user(request.user_id)
+        return transaction_pb2.DeleteUserTransactionsResponse(deleted=deleted)
+
+    def GetDataVersion(self, request, context):
+        self._check_write_access(context)
+        self._check_fresh(context)
+        return transaction_pb2.DataVersionResponse(version=self.store.version(request.user_id, request.month))
+
+    def GetChanges(self, request, context):
+        self._check_write_access(context)
+        self._check_fresh(context)
+        transactions, cursor, reset, has_more = self.store.changes_since(
+            request.user_id, request.cursor, request.limit)
+        return encode_response(
+            transaction_pb2.ChangesResponse(cursor=cursor, reset=reset, has_more=has_more),
+            transactions
+        )
+
+    def StreamChanges(self, request, context):
+        self._check_write_access(context)
+        # Replicas follow the primary directly, not each other
+        self._check_primary(context)
+        store = self.store
+        epoch, _, seq = request.cursor.partition(':')
+        after, reset = 0, True
+        if epoch == store.epoch and seq.isdigit() and int(seq) <= store.seq:
+            after, reset = int(seq), False
+        batch_size = request.batch_size or config.REPLICA_BATCH_SIZE
+        if not self.streams.acquire(blocking=False):
+            context.abort(grpc.StatusCode.RESOURCE_EXHAUSTED,
+                          f"Too many replica streams (REPLICA_MAX_STREAMS={config.REPLICA_MAX_STREAMS})")
+        try:
+            yield from self._stream_changes(store, after, reset, batch_size, context)
+        finally:
+            self.streams.release()
+
+    def _stream_changes(self, store, after, reset, batch_size, context):
+        while context.is_active():
+            # An empty batch after the wait is the heartbeat
+            changes, head = store.log_since(after, batch_size, config.REPLICA_HEARTBEAT_SECONDS)
+            if changes:
+                after = changes[-1][0]
+            yield transaction_pb2.ChangeBatch(
+                changes=[
+                    transaction_pb2.Change(deleted_user_id=user_id) if t is None
+                    else transaction_pb2.Change(transaction=transaction_pb2.Transaction(
+                        transaction_id=t['transaction_id'],
+                        user_id=t['user_id'],
+                        amount=t['amount'],
+                        amount_minor=t['amount_minor'],
+                        category=t['category'],
+                        type=t['type'],
+                        date=t['date'],
+                        description=t['description']
+                    ))
+                    for _, t, user_id in changes
+                ],
+                cursor=f"{store.epoch}:{after}",
+                reset=reset,
+                head=head
+            )
+            reset = False
+
+def closed_before(months_hot, now=None):
+    """First month that stays in memory: the current one and months_hot - 1 before it."""
+    year, month = map(int, time.strftime("%Y %m", time.gmtime(now)).split())
+    index = year * 12 + month - 1 - (months_hot - 1)
+    return f"{index // 12:04d}-{index % 12 + 1:02d}"
+
+def compact_closed_months(service):
+    while True:
+        time.sleep(config.COLD_COMPACT_INTERVAL_SECONDS)
+        # A replica may have swapped in a rebuilt store
+        service.store.compact(closed_before(config.COLD_HOT_MONTHS))
+
+def serve(port=50053, replica_of=None):
     with open('finance_pki/certs/transaction_service/transaction_service.key', 'rb') as f:
         private_key = f.read()
     with open('finance_pki/certs/transaction_service/transaction_service.crt', 'rb') as f:
@@ -97,11 +262,46 @@ def serve():
         require_client_auth=True
     )
     
-    server = grpc.server(futures.ThreadPoolExecutor(max_workers=10))
-    transaction_pb2_grpc.add_TransactionServiceServicer_to_server(TransactionService(), server)
-    server.add_secure_port('[::]:50053', server_credentials)
+    # Replica streams get their own threads on top of the ones for regular calls
+    workers = 10 + config.REPLICA_MAX_STREAMS
+    server = grpc.server(
+        futures.ThreadPoolExecutor(max_workers=workers, thread_name_prefix='grpc-worker'),
+        # A call that would wait for a free thread is rejected with RESOURCE_EXHAUSTED instead
+        maximum_concurrent_rpcs=workers,
+        interceptors=[
+            AdmissionInterceptor("transaction_service"),
+            CompressionInterceptor()
+        ],
+        options=message_size_options()
+    )
+    cold_dir = None
+    if config.COLD_STORAGE_DIR:
+        # Segments from a previous run are useless without its in-memory part
+        cold_dir = os.path.join(config.COLD_STORAGE_DIR, f"transaction_service_{port}")
+        shutil.rmtree(cold_dir, ignore_errors=True)
+        os.makedirs(cold_dir)
+    service = TransactionService(replica_of, cold_dir)
+    add_servicer_to_server(service, server)
+    # A replica is ready only while it keeps up with the primary
+    health = add_health(server, ["transaction.TransactionService"],
+                        probe=service.follower.is_fresh if service.follower else None)
+    server.add_secure_port(f'[::]:{port}', server_credentials)
+    add_unix_port(server, f"transaction_service_{port}", server_credentials)
     server.start()
+    if service.follower is not None:
+        service.follower.start()
+    if cold_dir:
+        threading.Thread(target=compact_closed_months, args=(service,), daemon=True).start()
+    stop_on_signal(server, health)
+    if debug_port(port):
+        serve_http(app, debug_port(port))
     server.wait_for_termination()
 
 if __name__ == '__main__':
-    serve()
\ No newline at end of file
+    # Каждый шард - отдельный процесс на своём порту
+    parser = argparse.ArgumentParser(description="Transaction Service shard")
+    parser.add_argument('--port', type=int, default=50053)
+    parser.add_argument('--replica-of', metavar='TARGET',
+                        help="Run as a read replica of the primary at TARGET, e.g. localhost:50053")
+    args = parser.parse_args()
+    serve(args.port, args.replica_of)
\ No newline at end of file
@@ -0,0 +1,285 @@
+import os
+import uuid
+import heapq
+import bisect
+import itertools
+import threading
+
+from common.locks import StripedLock
+from common.money import from_minor, to_minor
+from .query import date_range
+from .segments import Segment, write_segment
+from .wire import encode_transaction
+
+
+def _date(transaction):
+    return transaction['date']
+
+
+def _seq(change):
+    return change[0]
+
+
+def _insert(index, key, batch):
+    # batch отсортирован по дате
+    rows = index.get(key)
+    if rows is None:
+        index[key] = list(batch)
+    elif rows[-1]['date'] <= batch[0]['date']:
+        # Новые записи почти всегда самые поздние, тогда это просто дописывание в конец
+        rows.extend(batch)
+    else:
+        # Сдвиг элементов под читателем сломал бы его бинарный поиск,
+        # поэтому публикуем новый список
+        index[key] = list(heapq.merge(rows, batch, key=_date))
+
+
+class TransactionStore:
+    """Транзакции в памяти с вторичным индексом по категории.
+
+    transactions: user_id -> список, отсортированный по дате
+    by_category: (user_id, category) -> список тех же записей, отсортированный по дате
+    Оба индекса обновляются при каждой записи, поэтому выборка по категории
+    за период стоит O(log n + k) вместо прохода по всем транзакциям пользователя.
+    versions: (user_id, "YYYY-MM") -> счётчик изменений, по нему кешируются отчёты;
+    (user_id, "") - счётчик всех изменений пользователя.
+    changes: user_id -> [(seq, транзакция)] в порядке записи, для синхронизации клиентов.
+    log: все изменения по порядку seq, (seq, транзакция, None) или (seq, None,
+    user_id) для удаления; по нему реплики чтения повторяют запись.
+    Каждая транзакция хранит в 'wire' свою protobuf-кодировку: ответы собираются
+    склейкой байтов, см. transaction_service.wire. Сумма хранится в
+    'amount_minor' (копейки), 'amount' выводится из неё, см. common.money.
+    cold: user_id -> сегменты закрытых месяцев на диске (transaction_service.segments),
+    если задан cold_dir; compact() переносит туда старые записи из памяти.
+
+    Записи одного пользователя идут под его блокировкой из lock(user_id), разных
+    пользователей - параллельно. Читатели блокировок не берут: списки только
+    дополняются в конец, а вставка в середину публикует новую копию списка,
+    поэтому читатель всегда видит целый отсортированный список. Перенос в
+    сегменты меняет сразу несколько словарей и отмечается счётчиком в
+    generations: читатель, попавший на перенос, повторяет чтение.
+    """
+
+    def __init__(self, stripes=64, cold_dir=None):
+        self.lock = StripedLock(stripes)
+        self._seq_lock = threading.Lock()
+        self._appended = threading.Condition(self._seq_lock)
+        self.transactions = {}
+        self.by_category = {}
+        self.versions = {}
+        # Счётчики живут в памяти; эпоха не даёт версиям совпасть после перезапуска
+        self.epoch = uuid.uuid4().hex[:12]
+        self.seq = 0
+        self.changes = {}
+        self.resets = {}  # user_id -> seq последнего удаления данных пользователя
+        # Растёт вместе с данными, как и changes: новая реплика читает его с начала
+        self.log = []
+        self.cold_dir = cold_dir
+        self.cold = {}
+        self.generations = {}  # user_id -> нечётное, пока идёт перенос в сегменты
+
+    def _touch(self, user_id, month):
+        for key in ((user_id, month), (user_id, '')):
+            self.versions[key] = self.versions.get(key, 0) + 1
+
+    def version(self, user_id, month):
+        return f"{self.epoch}.{self.versions.get((user_id, month), 0)}"
+
+    def _next_seq(self, transaction=None, deleted_user_id=None):
+        # seq выдаются подряд, поэтому запись с seq N лежит в log[N - 1]
+        with self._appended:
+            self.seq += 1
+            self.log.append((self.seq, transaction, deleted_user_id))
+            self._appended.notify_all()
+            return self.seq
+
+    def add(self, transaction):
+        self.add_many([transaction])
+
+    def add_many(self, transactions):
+        """Пакетная запись (например, перенос с другого шарда): каждый список
+        пересобирается не больше одного раза на пакет."""
+        by_user = {}
+        for transaction in transactions:
+            # Копия: словари вызывающего не получают служебных полей
+            transaction = dict(transaction)
+            # Записи из времени до amount_minor переводятся в копейки здесь;
+            # amount всегда выводится из копеек, чтобы поля не расходились
+            if 'amount_minor' not in transaction:
+                transaction['amount_minor'] = to_minor(transaction['amount'])
+            transaction['amount'] = from_minor(transaction['amount_minor'])
+            # Кодируем один раз при записи, а не при каждом чтении
+            transaction['wire'] = encode_transaction(transaction)
+            by_user.setdefault(transaction['user_id'], []).append(transaction)
+
+        for user_id, batch in by_user.items():
+            batch.sort(key=_date)
+            by_category = {}
+            for transaction in batch:
+                by_category.setdefault(transaction['category'], []).append(transaction)
+
+            with self.lock(user_id):
+                log = self.changes.setdefault(user_id, [])
+                for transaction in batch:
+                    self._touch(user_id, transaction['date'][:7])
+                    log.append((self._next_seq(transaction), transaction))
+                _insert(self.transactions, user_id, batch)
+                for category, rows in by_category.items():
+                    _insert(self.by_category, (user_id, category), rows)
+
+    def users(self):
+        return list(dict.fromkeys([*self.transactions, *self.cold]))
+
+    def _consistent(self, user_id, read):
+        while True:
+            generation = self.generations.get(user_id, 0)
+            result = read()
+            if generation % 2 == 0 and self.generations.get(user_id, 0) == generation:
+                return result
+
+    def get(self, user_id, category='', start_date='', end_date=''):
+        """Транзакции пользователя (или его категории), отсортированные по дате.
+
+        Без сегментов это горячий список целиком, период отрезает
+        query_transactions. С сегментами - записи за период из тех сегментов,
+        чей диапазон дат и словарь категорий подходят, слитые с горячими.
+        """
+        def read():
+            if category:
+                hot = self.by_category.get((user_id, category), [])
+            else:
+                hot = self.transactions.get(user_id, [])
+            return hot, self.cold.get(user_id, ())
+
+        hot, segments = self._consistent(user_id, read)
+        if not segments:
+            return hot
+        parts = [segment.date_range(start_date, end_date, category) for segment in segments]
+        parts.append(date_range(hot, start_date, end_date))
+        parts = [part for part in parts if part]
+        # Сегменты идут по месяцам, поэтому обычно части просто стыкуются;
+        # слияние нужно, только если поздние записи дали пересекающиеся сегменты
+        if all(_date(a[-1]) <= _date(b[0]) for a, b in zip(parts, parts[1:])):
+            return list(itertools.chain.from_iterable(parts))
+        return list(heapq.merge(*parts, key=_date))
+
+    def compact(self, before_month):
+        """Переносит транзакции месяцев раньше before_month ("YYYY-MM") в сегменты.
+
+        Горячие списки и журнал пользователя пересобираются без перенесённых
+        записей, общий журнал для реплик ссылается на строки сегментов.
+        Возвращает число перенесённых транзакций.
+        """
+        if not self.cold_dir:
+            return 0
+        moved = 0
+        for user_id in list(self.transactions):
+            with self.lock(user_id):
+                moved += self._compact_user(user_id, before_month)
+        return moved
+
+    def _compact_user(self, user_id, before_month):
+        rows = self.transactions.get(user_id, [])
+        split = bisect.bisect_left(rows, before_month, key=_date)
+        if not split:
+            return 0
+        moved_rows = rows[:split]
+        changes = self.changes.get(user_id, [])
+        seqs = {id(t): seq for seq, t in changes}
+
+        # Файлы пишутся до публикации: читатели в это время работают как обычно
+        segments, refs = [], {}
+        for month, group in itertools.groupby(moved_rows, key=lambda t: t['date'][:7]):
+            group = list(group)
+            path = os.path.join(self.cold_dir, f"{uuid.uuid4().hex}.seg")
+            write_segment(path, user_id, month, group, [seqs[id(t)] for t in group])
+            segment = Segment(path)
+            segments.append(segment)
+            for index, t in enumerate(group):
+                refs[id(t)] = segment.ref(index)
+
+        generation = self.generations.get(user_id, 0)
+        self.generations[user_id] = generation + 1
+        # Поздние записи в закрытый месяц дают ещё один сегмент того же месяца
+        self.cold[user_id] = sorted([*self.cold.get(user_id, ()), *segments], key=lambda s: s.month)
+        if split < len(rows):
+            self.transactions[user_id] = rows[split:]
+        else:
+            del self.transactions[user_id]
+        for category in {t['category'] for t in moved_rows}:
+            key = (user_id, category)
+            category_rows = self.by_category[key]
+            rest = category_rows[bisect.bisect_left(category_rows, before_month, key=_date):]
+            if rest:
+                self.by_category[key] = rest
+            else:
+                del self.by_category[key]
+        self.changes[user_id] = [(seq, t) for seq, t in changes if id(t) not in refs]
+        self.generations[user_id] = generation + 2
+
+        for t in moved_rows:
+            seq = seqs[id(t)]
+            self.log[seq - 1] = (seq, refs[id(t)], None)
+        return split
+
+    def close(self):
+        """Удаляет файлы сегментов, например у копии, которую заменила новая."""
+        for segments in self.cold.values():
+            for segment in segments:
+                segment.unlink()
+
+    def delete_user(self, user_id):
+        with self.lock(user_id):
+            generation = self.generations.get(user_id, 0)
+            self.generations[user_id] = generation + 1
+            rows = self.transactions.pop(user_id, [])
+            segments = self.cold.pop(user_id, [])
+            for category in {t['category'] for t in rows} | {c for s in segments for c in s.categories}:
+                self.by_category.pop((user_id, category), None)
+            self.generations[user_id] = generation + 2
+            # Счётчики не сбрасываем, иначе старая версия снова станет актуальной
+            for month in {t['date'][:7] for t in rows} | {s.month for s in segments}:
+                self._touch(user_id, month)
+            for segment in segments:
+                segment.unlink()
+            self.changes.pop(user_id, None)
+            self.resets[user_id] = self._next_seq(deleted_user_id=user_id)
+            return len(rows) + sum(len(segment) for segment in segments)
+
+    def changes_since(self, user_id, cursor, limit=0):
+        """Транзакции после курсора: (транзакции, новый курсор, reset, has_more).
+
+        Курсор - "эпоха:seq". Курсор другой эпохи или выданный до удаления данных
+        пользователя недействителен, тогда история отдаётся с начала и reset=True.
+        """
+        after, reset = 0, True
+        epoch, _, seq = cursor.partition(':')
+        if epoch == self.epoch and seq.isdigit() and int(seq) >= self.resets.get(user_id, 0):
+            after, reset = int(seq), False
+
+        log, segments = self._consistent(
+            user_id, lambda: (self.changes.get(user_id, []), self.cold.get(user_id, ())))
+        start = bisect.bisect_right(log, after, key=_seq)
+        # Курсор старше переноса в сегменты: перенесённые записи читаются с диска
+        cold = sorted((change for segment in segments for change in segment.changes_since(after)), key=_seq)
+        if cold:
+            log, start = list(heapq.merge(cold, log[start:], key=_seq)), 0
+        end = start + limit if limit else len(log)
+        page = log[start:end]
+        # Курсор - seq последней отданной записи, а не общий счётчик: запись,
+        # получившая seq, но ещё не попавшая в журнал, не будет пропущена
+        last = page[-1][0] if page else max(after, self.resets.get(user_id, 0))
+        return [t for _, t in page], f"{self.epoch}:{last}", reset, end < len(log)
+
+    def log_since(self, after, limit, timeout):
+        """Изменения после seq after, не больше limit: (изменения, head).
+
+        Если новых изменений нет, ждёт их до timeout секунд. head - последний
+        seq на момент чтения; пакет, дошедший до head, значит, что читатель
+        догнал запись.
+        """
+        with self._appended:
+            if self.seq <= after:
+                self._appended.wait(timeout)
+            head = self.seq
+        return self.log[after:min(head, after + limit)], head
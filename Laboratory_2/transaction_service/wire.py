@@ -0,0 +1,82 @@
+import grpc
+
+from generated import transaction_pb2, transaction_pb2_grpc
+
+FIELDS = ('transaction_id', 'user_id', 'amount', 'amount_minor', 'category', 'type', 'date', 'description')
+
+# Поле 1 (transactions) в TransactionsResponse и ChangesResponse, тип length-delimited
+_TRANSACTIONS_TAG = b'\x0a'
+
+
+def _varint(value):
+    out = bytearray()
+    while value > 0x7f:
+        out.append((value & 0x7f) | 0x80)
+        value >>= 7
+    out.append(value)
+    return bytes(out)
+
+
+def encode_transaction(transaction):
+    """Транзакция в том виде, в каком она лежит в ответе: тег поля 1, длина, Transaction."""
+    payload = transaction_pb2.Transaction(**{field: transaction[field] for field in FIELDS}).SerializeToString()
+    return _TRANSACTIONS_TAG + _varint(len(payload)) + payload
+
+
+def encode_response(header, transactions):
+    """Готовые байты ответа: header без транзакций плюс сохранённые записи.
+
+    Склейка сериализованных сообщений protobuf равносильна их слиянию, а
+    элементы repeated-поля могут идти подряд в любом месте сообщения, поэтому
+    сообщения для каждой строки не создаются.
+    """
+    return header.SerializeToString() + b''.join(t['wire'] for t in transactions)
+
+
+def _raw_responses(handler):
+    """Обработчик, который отдаёт ответы-байты как есть, а остальные сериализует обычным образом."""
+    if handler is None or handler.unary_unary is None:
+        return handler
+
+    serialize = handler.response_serializer
+
+    def serialize_response(response):
+        return response if isinstance(response, bytes) else serialize(response)
+
+    return grpc.unary_unary_rpc_method_handler(
+        handler.unary_unary,
+        request_deserializer=handler.request_deserializer,
+        response_serializer=serialize_response
+    )
+
+
+class _RawResponseHandler(grpc.GenericRpcHandler):
+    def __init__(self, handler):
+        self._handler = handler
+
+    def service(self, handler_call_details):
+        return _raw_responses(self._handler.service(handler_call_details))
+
+
+class _RawResponseRegistrar:
+    """Сервер для сгенерированной регистрации: оборачивает каждый обработчик."""
+
+    def __init__(self, server):
+        self._server = server
+
+    def add_generic_rpc_handlers(self, handlers):
+        self._server.add_generic_rpc_handlers(tuple(_RawResponseHandler(handler) for handler in handlers))
+
+    def add_registered_method_handlers(self, service_name, method_handlers):
+        self._server.add_registered_method_handlers(
+            service_name, {name: _raw_responses(handler) for name, handler in method_handlers.items()})
+
+
+def add_servicer_to_server(servicer, server):
+    """Регистрирует TransactionService вместе с отдачей готовых байтов.
+
+    GetTransactions и GetChanges возвращают bytes из encode_response, и
+    обычный сериализатор protobuf их не примет, поэтому сервис нельзя
+    регистрировать через add_TransactionServiceServicer_to_server напрямую.
+    """
+    transaction_pb2_grpc.add_TransactionServiceServicer_to_server(servicer, _RawResponseRegistrar(server))
@@ -1,17 +1,19 @@
-from fastapi import Request, HTTPException
+from fastapi import Request
+from fastapi.responses import JSONResponse
 from graphql_api.auth import AuthService
 
 async def jwt_middleware(request: Request, call_next):
-    if request.url.path.startswith('/graphql'):
+    if request.url.path.startswith(('/graphql', '/debug')):
         auth_header = request.headers.get('Authorization')
         if not auth_header or not auth_header.startswith('Bearer '):
-            raise HTTPException(status_code=401, detail="Unauthorized")
+            # Исключение из middleware не доходит до обработчиков FastAPI
+            return JSONResponse({"detail": "Unauthorized"}, status_code=401)
         
         token = auth_header.split(' ')[1]
         # Для user_service ожидаем аудиторию 'user_service'
         payload = AuthService.verify_token(token, "user_service")
         if not payload:
-            raise HTTPException(status_code=403, detail="Invalid token")
+            return JSONResponse({"detail": "Invalid token"}, status_code=403)
         
         request.state.service_id = payload.get('service_id')
         request.state.scopes = payload.get('scope', [])
@@ -1,20 +1,33 @@
 import os
 import time
+import argparse
 import hashlib
+import threading
 from concurrent import futures
 
 import grpc
 from generated import user_pb2, user_pb2_grpc
 from graphql_api.auth import AuthService
-from fastapi import FastAPI
+from common import config
+from common.admission import AdmissionInterceptor
+from common.channels import add_unix_port
+from common.compression import CompressionInterceptor, message_size_options
+from common.health import add_health, stop_on_signal
+from common.profiling import add_debug_routes, debug_port, serve_http
+from fastapi import FastAPI, Request
+from fastapi.responses import PlainTextResponse
 from .auth_middleware import jwt_middleware
+from .store import UserStore
 
 app = FastAPI()
 app.middleware('http')(jwt_middleware)
+add_debug_routes(app)
 
 class UserService(user_pb2_grpc.UserServiceServicer):
     def __init__(self):
-        self.users = {}  # In-memory storage for demo purposes
+        self.store = UserStore()  # In-memory storage for demo purposes
+        # Each WatchUsers holds a pool thread for as long as its gateway worker is connected
+        self.watchers = threading.BoundedSemaphore(config.USER_WATCH_MAX_STREAMS)
 
     def RegisterUser(self, request, context):
         metadata = dict(context.invocation_metadata())
@@ -25,11 +38,6 @@ class UserService(user_pb2_grpc.UserServiceServicer):
         payload = AuthService.verify_token(token, "user_service")
         if not payload:
             context.abort(grpc.StatusCode.PERMISSION_DENIED, "Invalid token")
-        if request.email in [u['email'] for u in self.users.values()]:
-            context.set_code(grpc.StatusCode.ALREADY_EXISTS)
-            context.set_details('User with this email already exists')
-            return user_pb2.UserResponse()
-
         user_id = hashlib.sha256(request.email.encode()).hexdigest()[:16]
         password_hash = hashlib.sha256(request.password.encode()).hexdigest()
         
@@ -41,7 +49,11 @@ class UserService(user_pb2_grpc.UserServiceServicer):
             'created_at': time.strftime("%Y-%m-%d %H:%M:%S", time.gmtime())
         }
         
-        self.users[user_id] = user
+        # The email check and the insert are one step under the email's lock
+        if not self.store.add(user):
+            context.set_code(grpc.StatusCode.ALREADY_EXISTS)
+            context.set_details('User with this email already exists')
+            return user_pb2.UserResponse()
         
         return user_pb2.UserResponse(
             user_id=user_id,
@@ -59,7 +71,7 @@ class UserService(user_pb2_grpc.UserServiceServicer):
         payload = AuthService.verify_token(token, "user_service")
         if not payload:
             context.abort(grpc.StatusCode.PERMISSION_DENIED, "Invalid token")
-        user = next((u for u in self.users.values() if u['email'] == request.email), None)
+        user = self.store.lookup(request.email, lambda: self.store.get_by_email(request.email))
         
         if not user or user['password_hash'] != hashlib.sha256(request.password.encode()).hexdigest():
             context.set_code(grpc.StatusCode.UNAUTHENTICATED)
@@ -82,7 +94,7 @@ class UserService(user_pb2_grpc.UserServiceServicer):
         payload = AuthService.verify_token(token, "user_service")
         if not payload:
             context.abort(grpc.StatusCode.PERMISSION_DENIED, "Invalid token")
-        user = self.users.get(request.user_id)
+        user = self.store.lookup(request.user_id, lambda: self.store.get(request.user_id))
         if not user:
             context.set_code(grpc.StatusCode.NOT_FOUND)
             context.set_details('User not found')
@@ -95,7 +107,57 @@ class UserService(user_pb2_grpc.UserServiceServicer):
             created_at=user['created_at']
         )
 
-def serve():
+    def WatchUsers(self, request, context):
+        metadata = dict(context.invocation_metadata())
+        if 'authorization' not in metadata:
+            context.abort(grpc.StatusCode.UNAUTHENTICATED, "Token required")
+        
+        token = metadata['authorization'].replace('Bearer ', '')
+        payload = AuthService.verify_token(token, "user_service")
+        if not payload:
+            context.abort(grpc.StatusCode.PERMISSION_DENIED, "Invalid token")
+        if not self.watchers.acquire(blocking=False):
+            context.abort(grpc.StatusCode.RESOURCE_EXHAUSTED,
+                          f"Too many watchers (USER_WATCH_MAX_STREAMS={config.USER_WATCH_MAX_STREAMS})")
+        try:
+            # The first batch comes right away and gives the client a cursor to resume from;
+            # an empty batch after the wait is the heartbeat
+            cursor, timeout = request.cursor, 0
+            while context.is_active():
+                user_ids, cursor, reset = self.store.changes_since(cursor, timeout)
+                yield user_pb2.UserChanges(user_ids=user_ids, cursor=cursor, reset=reset)
+                timeout = config.USER_WATCH_HEARTBEAT_SECONDS
+        finally:
+            self.watchers.release()
+
+def bloom_metrics(service):
+    """Metrics of the filter in the Prometheus text format."""
+    known, lookups = service.store.known, dict(service.store.lookups)
+    absent = lookups.get('definite_miss', 0) + lookups.get('false_positive', 0)
+    gauges = [
+        ('user_bloom_filter_bytes', "Memory used by the filter bits", known.size_bytes()),
+        ('user_bloom_filter_bits', "Number of bits in the filter", known.size),
+        ('user_bloom_filter_hash_functions', "Bits set per key", known.number_hash_functions),
+        ('user_bloom_filter_keys', "Keys added (emails and ids)", known.count),
+        ('user_bloom_filter_fill_ratio', "Share of bits set", known.fill_ratio()),
+        ('user_bloom_filter_false_positive_rate', "Estimated from the fill ratio", known.false_positive_rate()),
+        ('user_bloom_filter_observed_false_positive_rate', "Share of absent keys the filter let through",
+         lookups.get('false_positive', 0) / absent if absent else 0.0),
+    ]
+    lines = []
+    for name, description, value in gauges:
+        lines += [f"# HELP {name} {description}", f"# TYPE {name} gauge", f"{name} {value}"]
+    lines += ["# HELP user_bloom_filter_lookups_total Lookups by filter answer",
+              "# TYPE user_bloom_filter_lookups_total counter"]
+    lines += [f'user_bloom_filter_lookups_total{{result="{result}"}} {lookups.get(result, 0)}'
+              for result in ('definite_miss', 'maybe_hit', 'false_positive')]
+    return '\n'.join(lines) + '\n'
+
+@app.get("/metrics", response_class=PlainTextResponse)
+def metrics(request: Request):
+    return bloom_metrics(request.app.state.user_service)
+
+def serve(port=50051):
     # Чтение сертификатов в бинарном режиме ('rb')
     with open('finance_pki/certs/user_service/user_service.key', 'rb') as f:
         private_key = f.read()
@@ -110,12 +172,32 @@ def serve():
         root_certificates=ca_cert,
         require_client_auth=True
     )
-    server = grpc.server(futures.ThreadPoolExecutor(max_workers=10))
-    user_pb2_grpc.add_UserServiceServicer_to_server(UserService(), server)
-    server.add_secure_port('[::]:50051', server_credentials)
+    # Watchers get their own threads on top of the ones for regular calls
+    workers = 10 + config.USER_WATCH_MAX_STREAMS
+    server = grpc.server(
+        futures.ThreadPoolExecutor(max_workers=workers, thread_name_prefix='grpc-worker'),
+        # A call that would wait for a free thread is rejected with RESOURCE_EXHAUSTED instead
+        maximum_concurrent_rpcs=workers,
+        interceptors=[AdmissionInterceptor("user_service"), CompressionInterceptor()],
+        options=message_size_options()
+    )
+    service = UserService()
+    # The filter must cover every stored user before the first lookup
+    service.store.rebuild()
+    app.state.user_service = service
+    user_pb2_grpc.add_UserServiceServicer_to_server(service, server)
+    health = add_health(server, ["user.UserService"])
+    server.add_secure_port(f'[::]:{port}', server_credentials)
+    add_unix_port(server, "user_service" if port == 50051 else f"user_service_{port}", server_credentials)
     server.start()
-    print("User Service running on port 50051")
+    stop_on_signal(server, health)
+    if debug_port(port):
+        serve_http(app, debug_port(port))
+    print(f"User Service running on port {port}")
     server.wait_for_termination()
 
 if __name__ == '__main__':
-    serve()
\ No newline at end of file
+    parser = argparse.ArgumentParser(description="User Service")
+    parser.add_argument('--port', type=int, default=50051)
+    args = parser.parse_args()
+    serve(args.port)
\ No newline at end of file
@@ -0,0 +1,116 @@
+import uuid
+import threading
+from collections import Counter
+
+from common import config
+from common.bloom import BloomFilter
+from common.locks import StripedLock
+
+
+class UserStore:
+    """Пользователи в памяти с индексом по email.
+
+    Регистрация идёт под блокировкой email из lock(email), поэтому два
+    одновременных RegisterUser с одним адресом не создадут двух записей.
+    Чтение по id и по email без блокировок: запись публикуется в словари
+    только целиком.
+    known: фильтр Блума по id и email всех пользователей; add кладёт ключи в
+    него до публикации записи, поэтому пользователь, которого уже можно
+    прочитать, никогда не получает "точно нет". Пользователей, записанных в
+    обход add, в фильтр возвращает rebuild. Фильтр не растёт, его размер -
+    на USER_BLOOM_CAPACITY пользователей (по два ключа на каждого). Исходы
+    проверок по фильтру (lookup) считаются в lookups.
+    changed: id изменённых пользователей по порядку seq, по нему клиенты
+    (кеш шлюза) узнают, что их копия устарела, см. changes_since.
+    """
+
+    def __init__(self, stripes=64):
+        self.lock = StripedLock(stripes)
+        self.users = {}  # user_id -> user
+        self.emails = {}  # email -> user_id
+        self.known = None
+        self.rebuild()
+        self.lookups = Counter()  # definite_miss / maybe_hit / false_positive
+        self._lookups_lock = threading.Lock()
+        self.epoch = uuid.uuid4().hex[:12]
+        self.changed = []
+        self._appended = threading.Condition()
+
+    def _touch(self, user_id):
+        # seq изменения - его номер в changed, начиная с 1
+        with self._appended:
+            self.changed.append(user_id)
+            self._appended.notify_all()
+
+    def rebuild(self):
+        """Заново строит фильтр по users, например после загрузки пользователей
+        в обход add. Вызывается до того, как сервис начнёт принимать запросы:
+        add, идущий во время перестройки, может не попасть в новый фильтр.
+        """
+        users = self.all()
+        # Фильтр не растёт, поэтому места в нём - минимум на вдвое больше пользователей
+        known = BloomFilter.for_capacity(
+            2 * max(config.USER_BLOOM_CAPACITY, 2 * len(users)), config.USER_BLOOM_FP_RATE)
+        for user in users:
+            known.add(user['user_id'])
+            known.add(user['email'])
+        self.known = known
+
+    def lookup(self, key, read):
+        """read() из хранилища, если фильтр не ответил "точно нет" по key."""
+        if not self.known.might_contain(key):
+            result, found = 'definite_miss', None
+        else:
+            found = read()
+            result = 'maybe_hit' if found else 'false_positive'
+        with self._lookups_lock:
+            self.lookups[result] += 1
+        return found
+
+    def add(self, user):
+        """Добавляет пользователя; False, если email уже занят."""
+        email = user['email']
+        with self.lock(email):
+            # Новый email обычно отсекается фильтром, индекс читается только на "возможно"
+            if self.lookup(email, lambda: self.emails.get(email)):
+                return False
+            self.known.add(user['user_id'])
+            self.known.add(email)
+            self.users[user['user_id']] = user
+            self.emails[email] = user['user_id']
+        # Id - хеш email, поэтому его могли запросить и закешировать как неизвестный
+        self._touch(user['user_id'])
+        return True
+
+    def get(self, user_id):
+        return self.users.get(user_id)
+
+    def all(self):
+        return list(self.users.values())
+
+    def get_by_email(self, email):
+        user_id = self.emails.get(email)
+        return self.users.get(user_id) if user_id else None
+
+    def cursor(self):
+        return f"{self.epoch}:{len(self.changed)}"
+
+    def changes_since(self, cursor, timeout):
+        """(id пользователей, новый курсор, reset) после курсора "эпоха:seq".
+
+        Пустой курсор - с текущего момента. Курсор другой эпохи выдан до
+        перезапуска: изменения за это время неизвестны, поэтому reset=True.
+        Если изменений нет, ждёт их до timeout секунд.
+        """
+        epoch, _, seq = cursor.partition(':')
+        if not cursor:
+            after, reset = len(self.changed), False
+        elif epoch == self.epoch and seq.isdigit() and int(seq) <= len(self.changed):
+            after, reset = int(seq), False
+        else:
+            after, reset = len(self.changed), True
+        with self._appended:
+            if len(self.changed) <= after and not reset:
+                self._appended.wait(timeout)
+            head = len(self.changed)
+        return list(dict.fromkeys(self.changed[after:head])), f"{self.epoch}:{head}", reset